@@ -0,0 +1 @@
+"""Performance benchmarks; each module runs with ``python -m benchmarks.<name>``."""
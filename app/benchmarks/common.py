@@ -0,0 +1,104 @@
+"""Helpers shared by the benchmarks: latency summaries and the benchmark database."""
+
+from __future__ import annotations
+
+import bisect
+import os
+import statistics
+from typing import Dict, List, Optional
+
+import sqlalchemy as sa
+from flask import Flask
+from sqlalchemy.engine import make_url
+
+from src.app_factory import create_app
+from src.config import Config, get_config
+from src.extensions import db
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(samples: List[float]) -> dict:
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(samples, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 2),
+        'max_ms': round(max(samples, default=0.0) * 1000, 2),
+        'mean_ms': round(statistics.fmean(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open.
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def histogram(samples: List[float]) -> Dict[str, int]:
+    """Count of samples per latency bucket, keyed ``<=<bound>ms`` and ``>5000ms``."""
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for sample in samples:
+        counts[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, sample * 1000)] += 1
+    labels = [f'<={bound}ms' for bound in HISTOGRAM_BOUNDS_MS] + [f'>{HISTOGRAM_BOUNDS_MS[-1]}ms']
+    return dict(zip(labels, counts))
+
+
+def bench_database_url() -> str:
+    """BENCH_DATABASE_URL, or DATABASE_URL with a ``_bench`` database so real data is never touched."""
+    explicit = os.getenv('BENCH_DATABASE_URL')
+    if explicit:
+        return explicit
+    url = make_url(get_config().SQLALCHEMY_DATABASE_URI)
+    if url.get_backend_name() == 'sqlite':
+        return str(url)
+    return url.set(database=f"{url.database or 'laf_portal'}_bench").render_as_string(hide_password=False)
+
+
+def ensure_database(url: str) -> None:
+    parsed = make_url(url)
+    if parsed.get_backend_name() != 'mysql':
+        return
+    engine = sa.create_engine(parsed.set(database=None), isolation_level='AUTOCOMMIT')
+    with engine.connect() as connection:
+        connection.execute(
+            sa.text(f'CREATE DATABASE IF NOT EXISTS `{parsed.database}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci')
+        )
+    engine.dispose()
+
+
+def create_bench_app(url: Optional[str] = None, **overrides) -> Flask:
+    """App on the benchmark database with the schema in place.
+
+    Response caches are off so every call reaches the services. A single
+    pooled connection keeps MySQL session counters (rows read) attributable
+    to the measured calls.
+    """
+    url = url or bench_database_url()
+    ensure_database(url)
+    options = {
+        'SQLALCHEMY_DATABASE_URI': url,
+        'DATABASE_REPLICA_URLS': [],
+        'CACHE_ENABLED': False,
+        'DB_POOL_SIZE': 1,
+        'DB_MAX_OVERFLOW': 0,
+    }
+    options.update(overrides)
+    app = create_app(config=Config(**options))
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+__all__ = [
+    'HISTOGRAM_BOUNDS_MS',
+    'bench_database_url',
+    'create_bench_app',
+    'ensure_database',
+    'histogram',
+    'percentile',
+    'summarize',
+]
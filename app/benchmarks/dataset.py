@@ -0,0 +1,238 @@
+"""Deterministic synthetic portal data for the benchmarks, bulk inserted.
+
+Posts are spread over categories (one restricted to the TJD role), authors
+and statuses with realistic dates. Rows go in through Core ``insert``
+executemany batches. Content is assembled from a pool of pre-rendered
+markdown blocks, so the stored HTML, text and word count cost nothing per
+row. The loaded size and seed are recorded in ``boot_state``, and an
+identical dataset is never loaded twice.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, List, Tuple
+
+import sqlalchemy as sa
+
+from src.extensions import db
+from src.models import BootState, Category, Post, PostStatus, User, UserRole
+from src.utils.clock import utcnow
+from src.utils.markdown import RENDER_VERSION, render_markdown
+from src.utils.passwords import password_hasher
+
+# Bump when the generated data changes shape, so stored datasets are rebuilt.
+DATASET_VERSION = 1
+DATASET_STATE = 'bench_dataset'
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+PASSWORD = 'benchmark'
+ADMIN_EMAIL = 'bench-admin@example.com'
+EDITOR_EMAIL = 'bench-editor@example.com'
+TJD_EMAIL = 'bench-tjd@example.com'
+# Appears in about 2% of the titles, for the search cases.
+SEARCH_TERM = 'assembleia'
+
+CATEGORY_COUNT = 20
+TJD_CATEGORY = 'categoria-tjd'
+_WORDS = (
+    'campeonato liga rodada clube atleta tribunal julgamento regulamento diretoria conselho '
+    'tabela calendario arbitragem estadio torcida inscricao transferencia sumula recurso '
+    'partida temporada comissao edital sorteio premiacao nota oficial reuniao pauta votacao '
+    'presidente secretaria tesouraria balanco contas relatorio treinador elenco base feminino '
+    'amador profissional final semifinal classificacao rebaixamento acesso punicao multa '
+    'suspensao denuncia audiencia sessao plenario decisao prazo documento registro'
+).split()
+_PARAGRAPHS = 240
+
+
+@dataclass(frozen=True)
+class DatasetInfo:
+    posts: int
+    seed: int
+    categories: List[str]
+    published_slugs: List[str]
+
+
+def parse_scale(value: str) -> int:
+    value = value.strip().lower()
+    if value in SCALES:
+        return SCALES[value]
+    return int(value.replace('_', ''))
+
+
+def load_dataset(posts: int, *, seed: int = 42, batch_size: int = 5000) -> DatasetInfo:
+    marker = f'{posts}:{seed}:{DATASET_VERSION}'
+    state = db.session.get(BootState, DATASET_STATE)
+    if state is None or state.value != marker:
+        started = time.perf_counter()
+        _clear()
+        _insert(posts, random.Random(seed), batch_size)
+        db.session.merge(BootState(name=DATASET_STATE, value=marker))
+        db.session.commit()
+        if db.engine.dialect.name == 'mysql':
+            db.session.execute(sa.text('ANALYZE TABLE posts, categories, users'))
+            db.session.commit()
+        print(f'Dataset com {posts} posts carregado em {time.perf_counter() - started:.1f}s')
+
+    categories = [row.slug for row in db.session.query(Category.slug).order_by(Category.slug)]
+    # A fixed sample of publicly visible slugs for the detail cases.
+    published = [
+        row.slug
+        for row in db.session.query(Post.slug)
+        .join(Category)
+        .filter(Post.status == PostStatus.PUBLISHED, Category.is_active.is_(True))
+        .order_by(Post.id)
+        .limit(200)
+    ]
+    db.session.remove()
+    return DatasetInfo(posts=posts, seed=seed, categories=categories, published_slugs=published)
+
+
+def bench_users() -> Dict[str, User]:
+    users = User.query.filter(User.email.in_([ADMIN_EMAIL, EDITOR_EMAIL, TJD_EMAIL])).all()
+    return {user.email: user for user in users}
+
+
+def _clear() -> None:
+    if db.engine.dialect.name == 'mysql':
+        db.session.execute(sa.text('TRUNCATE TABLE posts'))
+    else:
+        db.session.query(Post).delete()
+    db.session.query(User).delete()
+    db.session.query(Category).delete()
+    db.session.commit()
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _insert(posts: int, rng: random.Random, batch_size: int) -> None:
+    now = utcnow()
+    category_rows = []
+    for index in range(CATEGORY_COUNT):
+        slug = TJD_CATEGORY if index == 0 else f'categoria-{index:02d}'
+        category_rows.append(
+            {
+                'id': _uuid(rng),
+                'name': f'Categoria {index:02d}',
+                'slug': slug,
+                'description': None,
+                'is_active': index != CATEGORY_COUNT - 1,
+                'allowed_roles': ['tjd'] if slug == TJD_CATEGORY else None,
+                'created_at': now,
+                'updated_at': now,
+            }
+        )
+    db.session.execute(sa.insert(Category.__table__), category_rows)
+    category_ids = [row['id'] for row in category_rows]
+
+    # One hash for every account: PBKDF2 per row would dominate the load.
+    password_hash = password_hasher().hash(PASSWORD)
+    editor_slugs = [row['slug'] for row in category_rows[1:4]]
+    user_rows = [
+        (ADMIN_EMAIL, UserRole.ADMIN, None),
+        (EDITOR_EMAIL, UserRole.EDITOR, editor_slugs),
+        (TJD_EMAIL, UserRole.TJD, ['tjd']),
+    ]
+    user_rows += [(f'autor-{index}@example.com', UserRole.EDITOR, None) for index in range(max(10, posts // 1000))]
+    users = [
+        {
+            'id': _uuid(rng),
+            'name': email.split('@')[0].replace('-', ' ').title(),
+            'email': email,
+            'password_hash': password_hash,
+            'role': role,
+            'is_active': True,
+            'allowed_category_slugs': slugs,
+            'created_at': now,
+            'updated_at': now,
+        }
+        for email, role, slugs in user_rows
+    ]
+    db.session.execute(sa.insert(User.__table__), users)
+    author_ids = [row['id'] for row in users]
+
+    blocks = _content_blocks(rng)
+    statuses = [PostStatus.PUBLISHED] * 8 + [PostStatus.DRAFT, PostStatus.SCHEDULED]
+    table = Post.__table__
+    for start in range(0, posts, batch_size):
+        rows = []
+        for index in range(start, min(posts, start + batch_size)):
+            status = rng.choice(statuses)
+            if status == PostStatus.SCHEDULED:
+                published_at = now + timedelta(seconds=rng.randint(3600, 60 * 86400))
+                created_at = now - timedelta(seconds=rng.randint(0, 30 * 86400))
+            else:
+                created_at = now - timedelta(seconds=rng.randint(3600, 3 * 365 * 86400))
+                published_at = created_at + timedelta(seconds=rng.randint(0, 3600)) if status == PostStatus.PUBLISHED else None
+            markdown, html, text, words = _content(rng, blocks)
+            title_words = rng.sample(_WORDS, 5)
+            if rng.random() < 0.02:
+                title_words[0] = SEARCH_TERM
+            rows.append(
+                {
+                    'id': _uuid(rng),
+                    'slug': f'post-{index}',
+                    'title': ' '.join(title_words).capitalize(),
+                    'excerpt': text[:160] if rng.random() < 0.5 else None,
+                    'cover_image_url': None,
+                    'content_markdown': markdown,
+                    'content_html': html,
+                    'content_text': text,
+                    'word_count': words,
+                    'content_render_version': RENDER_VERSION,
+                    'status': status,
+                    'category_id': rng.choice(category_ids),
+                    'author_id': rng.choice(author_ids),
+                    'published_at': published_at,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                }
+            )
+        db.session.execute(sa.insert(table), rows)
+        db.session.commit()
+
+
+def _content_blocks(rng: random.Random) -> List[Tuple[str, str, str, int]]:
+    """Markdown blocks with their rendering; blocks join with blank lines, so renderings concatenate."""
+    blocks = []
+    for index in range(_PARAGRAPHS):
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(25, 70))]
+        words[rng.randrange(len(words))] = f'**{rng.choice(_WORDS)}**'
+        if index % 5 == 0:
+            markdown = f"## {' '.join(words[:4]).replace('**', '').capitalize()}"
+        else:
+            markdown = ' '.join(words).capitalize() + '.'
+        rendered = render_markdown(markdown)
+        blocks.append((markdown, rendered.html, rendered.text, rendered.word_count))
+    return blocks
+
+
+def _content(rng: random.Random, blocks) -> Tuple[str, str, str, int]:
+    chosen = [rng.choice(blocks) for _ in range(rng.randint(2, 6))]
+    return (
+        '\n\n'.join(block[0] for block in chosen),
+        ''.join(block[1] for block in chosen),
+        ' '.join(block[2] for block in chosen),
+        sum(block[3] for block in chosen),
+    )
+
+
+__all__ = [
+    'ADMIN_EMAIL',
+    'EDITOR_EMAIL',
+    'PASSWORD',
+    'SCALES',
+    'SEARCH_TERM',
+    'TJD_EMAIL',
+    'DatasetInfo',
+    'bench_users',
+    'load_dataset',
+    'parse_scale',
+]
@@ -0,0 +1,463 @@
+"""HTTP load test: replays a mix of portal traffic against gunicorn over a real socket.
+
+    python -m benchmarks.load --duration 30 --concurrency 32
+    python -m benchmarks.load --sweep 1x4,2x4,4x4 --concurrency 8,32,128 --output load.json
+    python -m benchmarks.load --mix feed=60,post=40 --scale 100k
+
+Each sweep point starts ``gunicorn -c gunicorn.conf.py src.wsgi:app`` with
+the given workers x threads on the benchmark database (see
+``benchmarks.common``). The dataset of ``benchmarks.dataset`` is loaded
+first if needed. Then ``--concurrency`` virtual users run on one asyncio
+loop, each with its own keep-alive connection (closed loop: a user sends its
+next request once the previous one is answered). Requests are drawn from the
+weighted ``--mix``:
+
+    feed        /public/feed, page 1 or the next page through the cursor
+    post        /public/posts/<slug>
+    category    /public/feed?category=<slug>
+    categories  /public/categories
+    admin       /posts as the admin or the scoped editor (JWT)
+    login       /auth/login (one full password verification)
+    upload      /uploads/image with a small PNG (deduplicated after the first)
+
+Each point reports throughput, error rate, latency percentiles and a
+histogram, overall and per request kind. After a sweep, the report shows
+where throughput stopped growing with more concurrency.
+
+The client is a single Python process. Above a few thousand requests per
+second it becomes the bottleneck. Run it on another machine, or start
+several instances, when the server can go further.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from PIL import Image
+
+from src.config import BASE_DIR
+from src.extensions import db
+
+from .common import HISTOGRAM_BOUNDS_MS, bench_database_url, create_bench_app, histogram, summarize
+from .dataset import ADMIN_EMAIL, EDITOR_EMAIL, PASSWORD, DatasetInfo, load_dataset, parse_scale
+
+DEFAULT_MIX = 'feed=40,post=25,category=10,categories=5,admin=10,login=3,upload=2'
+KINDS = ('feed', 'post', 'category', 'categories', 'admin', 'login', 'upload')
+API = '/api/v1'
+
+
+class HttpConnection:
+    """One keep-alive HTTP/1.1 connection; reconnects when the server closes it."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(
+        self, method: str, path: str, *, headers: Optional[Dict[str, str]] = None, body: bytes = b''
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        reused = self._writer is not None
+        try:
+            return await self._exchange(method, path, headers or {}, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.close()
+            if not reused:
+                raise
+            # The server dropped an idle keep-alive connection; retry once.
+            return await self._exchange(method, path, headers or {}, body)
+
+    async def _exchange(self, method, path, headers, body) -> Tuple[int, Dict[str, str], bytes]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}', f'Content-Length: {len(body)}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        self._writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readuntil(b'\r\n')
+        status = int(status_line.split(b' ', 2)[1])
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await self._reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            payload = await self._read_chunked()
+        elif 'content-length' in response_headers:
+            payload = await self._reader.readexactly(int(response_headers['content-length']))
+        elif status in (204, 304) or method == 'HEAD':
+            payload = b''
+        else:
+            payload = await self._reader.read()
+            response_headers['connection'] = 'close'
+        if response_headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, response_headers, payload
+
+    async def _read_chunked(self) -> bytes:
+        parts = []
+        while True:
+            size = int((await self._reader.readuntil(b'\r\n')).split(b';', 1)[0], 16)
+            if size == 0:
+                # Trailers, if any, end with an empty line.
+                while await self._reader.readuntil(b'\r\n') != b'\r\n':
+                    pass
+                return b''.join(parts)
+            parts.append(await self._reader.readexactly(size))
+            await self._reader.readexactly(2)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+@dataclass
+class Recorder:
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    statuses: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+    failures: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+
+    def add(self, kind: str, status: int, elapsed: float) -> None:
+        self.latencies[kind].append(elapsed)
+        self.statuses[kind][status] += 1
+
+    def fail(self, kind: str, exc: BaseException) -> None:
+        self.failures[kind][type(exc).__name__] += 1
+
+    def report(self, seconds: float) -> dict:
+        endpoints = {}
+        every: List[float] = []
+        requests = errors = 0
+        for kind in sorted(set(self.latencies) | set(self.failures)):
+            samples = self.latencies[kind]
+            failed = sum(self.failures[kind].values())
+            bad = sum(count for status, count in self.statuses[kind].items() if status >= 400) + failed
+            every += samples
+            requests += len(samples) + failed
+            errors += bad
+            endpoints[kind] = {
+                **summarize(samples),
+                'statuses': {str(status): count for status, count in sorted(self.statuses[kind].items())},
+                'failures': dict(self.failures[kind]),
+                'error_rate': round(bad / (len(samples) + failed), 4) if samples or failed else 0.0,
+            }
+        return {
+            'seconds': round(seconds, 2),
+            'requests': requests,
+            'throughput_rps': round(requests / seconds, 1) if seconds else 0.0,
+            'error_rate': round(errors / requests, 4) if requests else 0.0,
+            'latency': summarize(every),
+            'histogram': histogram(every),
+            'endpoints': endpoints,
+        }
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in KINDS:
+            raise SystemExit(f'Tipo de requisição desconhecido no --mix: {name} (use {", ".join(KINDS)})')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def parse_sweep(value: str) -> List[Tuple[int, int]]:
+    points = []
+    for item in value.split(','):
+        workers, _, threads = item.strip().lower().partition('x')
+        points.append((int(workers), int(threads or 1)))
+    return points
+
+
+def _png(color: Tuple[int, int, int]) -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class Traffic:
+    """Builds the requests of the mix; shared by every virtual user of a run."""
+
+    def __init__(self, info: DatasetInfo, tokens: Dict[str, str], mix: Dict[str, float]) -> None:
+        self.slugs = info.published_slugs or ['post-0']
+        # The last two sorted slugs are the inactive and the TJD category.
+        self.categories = info.categories[:-2] or info.categories
+        self.tokens = tokens
+        self.kinds = list(mix)
+        self.weights = list(mix.values())
+        self.boundary = 'laf-load-boundary'
+        self.uploads = [self._multipart(_png(color)) for color in ((200, 30, 30), (30, 200, 30), (30, 30, 200))]
+
+    def _multipart(self, data: bytes) -> bytes:
+        return (
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="file"; filename="load.png"\r\n'
+            'Content-Type: image/png\r\n\r\n'
+        ).encode() + data + f'\r\n--{self.boundary}--\r\n'.encode()
+
+    def build(self, kind: str, rng: random.Random, state: dict) -> Tuple[str, str, str, Dict[str, str], bytes]:
+        """``(label, method, path, headers, body)``; label splits feed pages by how they are reached."""
+        if kind == 'feed':
+            cursor = state.get('cursor')
+            if cursor and rng.random() < 0.5:
+                return 'feed_next', 'GET', f'{API}/public/feed?cursor={quote(cursor)}', {}, b''
+            return 'feed', 'GET', f'{API}/public/feed', {}, b''
+        if kind == 'post':
+            return kind, 'GET', f'{API}/public/posts/{rng.choice(self.slugs)}', {}, b''
+        if kind == 'category':
+            return kind, 'GET', f'{API}/public/feed?category={rng.choice(self.categories)}', {}, b''
+        if kind == 'categories':
+            return kind, 'GET', f'{API}/public/categories', {}, b''
+        if kind == 'admin':
+            role = rng.choice(('admin', 'editor'))
+            headers = {'Authorization': f'Bearer {self.tokens[role]}'}
+            return f'admin_{role}', 'GET', f'{API}/posts?page={rng.randint(1, 3)}', headers, b''
+        if kind == 'login':
+            body = json.dumps({'email': EDITOR_EMAIL, 'password': PASSWORD}).encode()
+            return kind, 'POST', f'{API}/auth/login', {'Content-Type': 'application/json'}, body
+        headers = {
+            'Authorization': f"Bearer {self.tokens['editor']}",
+            'Content-Type': f'multipart/form-data; boundary={self.boundary}',
+        }
+        return kind, 'POST', f'{API}/uploads/image', headers, rng.choice(self.uploads)
+
+
+async def virtual_user(
+    host: str, port: int, traffic: Traffic, recorder: Recorder, *, seed: int, start: float, stop: float, timeout: float
+) -> None:
+    rng = random.Random(seed)
+    connection = HttpConnection(host, port)
+    state: dict = {}
+    try:
+        while time.monotonic() < stop:
+            kind = rng.choices(traffic.kinds, traffic.weights)[0]
+            label, method, path, headers, body = traffic.build(kind, rng, state)
+            started = time.monotonic()
+            try:
+                status, _headers, payload = await asyncio.wait_for(
+                    connection.request(method, path, headers=headers, body=body), timeout
+                )
+            except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError) as exc:
+                connection.close()
+                if started >= start:
+                    recorder.fail(label, exc)
+                continue
+            # Requests sent during the warm-up are not measured.
+            if started >= start:
+                recorder.add(label, status, time.monotonic() - started)
+            if kind == 'feed' and status == 200:
+                state['cursor'] = json.loads(payload).get('next_cursor')
+    finally:
+        connection.close()
+
+
+async def run_load(
+    host: str, port: int, traffic: Traffic, *, concurrency: int, duration: float, warmup: float, timeout: float, seed: int
+) -> dict:
+    recorder = Recorder()
+    start = time.monotonic() + warmup
+    stop = start + duration
+    await asyncio.gather(
+        *(
+            virtual_user(host, port, traffic, recorder, seed=seed + index, start=start, stop=stop, timeout=timeout)
+            for index in range(concurrency)
+        )
+    )
+    return recorder.report(duration)
+
+
+async def fetch_tokens(host: str, port: int) -> Dict[str, str]:
+    tokens = {}
+    for role, email in (('admin', ADMIN_EMAIL), ('editor', EDITOR_EMAIL)):
+        connection = HttpConnection(host, port)
+        body = json.dumps({'email': email, 'password': PASSWORD}).encode()
+        status, _headers, payload = await connection.request(
+            'POST', f'{API}/auth/login', headers={'Content-Type': 'application/json'}, body=body
+        )
+        connection.close()
+        if status != 200:
+            raise SystemExit(f'Login de {email} falhou com HTTP {status}: {payload[:200]!r}')
+        tokens[role] = json.loads(payload)['data']['access_token']
+    return tokens
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+@contextmanager
+def gunicorn_server(url: str, workers: int, threads: int, *, ready_timeout: float = 60) -> Iterator[int]:
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=url,
+        DATABASE_REPLICA_URLS='',
+        WEB_WORKERS=str(workers),
+        WEB_THREADS=str(threads),
+        SCHEDULER_IN_PROCESS='false',
+    )
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}']
+    command += ['--access-logfile', os.devnull, 'src.wsgi:app']
+    with tempfile.TemporaryFile() as log:
+        process = subprocess.Popen(command, cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            deadline = time.monotonic() + ready_timeout
+            while not _healthy(port):
+                if process.poll() is not None or time.monotonic() > deadline:
+                    log.seek(0)
+                    raise SystemExit(f'gunicorn não ficou pronto:\n{log.read().decode(errors="replace")[-2000:]}')
+                time.sleep(0.2)
+            yield port
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def _healthy(port: int) -> bool:
+    try:
+        with socket.create_connection(('127.0.0.1', port), timeout=1) as connection:
+            connection.sendall(f'GET {API}/health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode())
+            return connection.recv(16).startswith(b'HTTP/1.1 200')
+    except OSError:
+        return False
+
+
+def saturation(points: List[dict]) -> List[dict]:
+    """Per server configuration, the lowest concurrency past which throughput grew less than 5%."""
+    by_server: Dict[Tuple[int, int], List[dict]] = defaultdict(list)
+    for point in points:
+        by_server[(point['workers'], point['threads'])].append(point)
+    summary = []
+    for (workers, threads), runs in by_server.items():
+        runs = sorted(runs, key=lambda run: run['concurrency'])
+        knee = runs[-1]
+        for previous, current in zip(runs, runs[1:]):
+            if current['throughput_rps'] < previous['throughput_rps'] * 1.05:
+                knee = previous
+                break
+        summary.append(
+            {
+                'workers': workers,
+                'threads': threads,
+                'saturated_at_concurrency': knee['concurrency'] if knee is not runs[-1] else None,
+                'peak_throughput_rps': max(run['throughput_rps'] for run in runs),
+                'p95_ms_at_knee': knee['latency']['p95_ms'],
+            }
+        )
+    return summary
+
+
+def _print_point(point: dict) -> None:
+    latency = point['latency']
+    print(
+        f"{point['workers']}x{point['threads']} c={point['concurrency']:<4} "
+        f"{point['throughput_rps']:>8} req/s  erros {point['error_rate'] * 100:5.2f}%  "
+        f"p50 {latency['p50_ms']} ms  p95 {latency['p95_ms']} ms  p99 {latency['p99_ms']} ms"
+    )
+    for kind, stats in point['endpoints'].items():
+        print(
+            f"    {kind:<12} {stats['count']:>7}  p50 {stats['p50_ms']:>8} ms  p95 {stats['p95_ms']:>8} ms  "
+            f"erros {stats['error_rate'] * 100:5.2f}%  {stats['statuses']} {stats['failures'] or ''}"
+        )
+    total = max(sum(point['histogram'].values()), 1)
+    for label, count in point['histogram'].items():
+        if count:
+            print(f"    {label:>9} {'#' * max(1, round(40 * count / total)):<40} {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga HTTP com tráfego misto do portal.')
+    parser.add_argument('--scale', default='10k', help='Volume do dataset sintético (10k, 100k, 1m ou um número)')
+    parser.add_argument('--seed', type=int, default=42, help='Semente do dataset e do sorteio das requisições')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Pesos por tipo de requisição (padrão {DEFAULT_MIX})')
+    parser.add_argument('--sweep', default='2x4', help='Configurações do gunicorn, workers x threads (ex. 1x4,2x4,4x8)')
+    parser.add_argument('--concurrency', default='32', help='Usuários virtuais simultâneos (ex. 8,32,128)')
+    parser.add_argument('--duration', type=float, default=20, help='Segundos medidos por ponto')
+    parser.add_argument('--warmup', type=float, default=3, help='Segundos de aquecimento não medidos')
+    parser.add_argument('--timeout', type=float, default=10, help='Tempo máximo por requisição')
+    parser.add_argument('--output', help='Grava o relatório neste arquivo JSON')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    url = bench_database_url()
+    app = create_bench_app(url)
+    with app.app_context():
+        info = load_dataset(parse_scale(args.scale), seed=args.seed)
+        # The server processes open their own connections.
+        db.engine.dispose()
+
+    points = []
+    for workers, threads in parse_sweep(args.sweep):
+        with gunicorn_server(url, workers, threads) as port:
+            tokens = asyncio.run(fetch_tokens('127.0.0.1', port))
+            traffic = Traffic(info, tokens, mix)
+            for concurrency in (int(value) for value in args.concurrency.split(',')):
+                report = asyncio.run(
+                    run_load(
+                        '127.0.0.1',
+                        port,
+                        traffic,
+                        concurrency=concurrency,
+                        duration=args.duration,
+                        warmup=args.warmup,
+                        timeout=args.timeout,
+                        seed=args.seed,
+                    )
+                )
+                point = {'workers': workers, 'threads': threads, 'concurrency': concurrency, **report}
+                points.append(point)
+                _print_point(point)
+
+    result = {
+        'meta': {
+            'posts': info.posts,
+            'mix': mix,
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'histogram_bounds_ms': list(HISTOGRAM_BOUNDS_MS),
+        },
+        'points': points,
+        'saturation': saturation(points),
+    }
+    if len(points) > 1:
+        print('\nSaturação por configuração:')
+        for item in result['saturation']:
+            knee = item['saturated_at_concurrency']
+            where = f'a partir de c={knee} (p95 {item["p95_ms_at_knee"]} ms)' if knee else 'não atingida'
+            print(f"  {item['workers']}x{item['threads']}: pico {item['peak_throughput_rps']} req/s, saturação {where}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(result, output, indent=2)
+            output.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Login throughput under concurrency, and what it costs every other request.
+
+Runs ``/api/v1/auth/login`` from ``--threads`` client threads through the WSGI
+app in this process (as a gthread worker would) while one more thread keeps
+calling ``/api/v1/health`` and records its latency. Runs on the benchmark
+database (see ``benchmarks.common``); a temporary user is created and removed.
+
+    python -m benchmarks.login --threads 16 --logins 200
+    python -m benchmarks.login --method pbkdf2:sha256:1000000 --unknown 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from src.extensions import db
+from src.models import User, UserRole
+from src.utils.passwords import password_hasher
+
+from .common import create_bench_app, summarize
+
+PASSWORD = 'benchmark-password'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede a vazão de login e o impacto nas demais requisições.')
+    parser.add_argument('--threads', type=int, default=8, help='Clientes de login simultâneos')
+    parser.add_argument('--logins', type=int, default=100, help='Total de logins')
+    parser.add_argument('--unknown', type=float, default=0.0, help='Fração de logins com e-mail inexistente')
+    parser.add_argument('--method', default=None, help='PASSWORD_HASH_METHOD a usar no benchmark')
+    parser.add_argument('--json', action='store_true', help='Imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    overrides = {'DB_POOL_SIZE': args.threads + 2, 'CACHE_ENABLED': True}
+    if args.method:
+        overrides['PASSWORD_HASH_METHOD'] = args.method
+    app = create_bench_app(**overrides)
+    client = app.test_client()
+    email = f'bench-{uuid.uuid4().hex[:12]}@example.com'
+
+    with app.app_context():
+        user = User(name='Benchmark', email=email, role=UserRole.EDITOR)
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    login_latency: List[float] = []
+    statuses: Counter = Counter()
+    health_latency: List[float] = []
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def login(index: int) -> None:
+        # Spread the unknown e-mails evenly over the run.
+        unknown = int((index + 1) * args.unknown) > int(index * args.unknown)
+        payload = {'email': f'missing-{index}@example.com' if unknown else email, 'password': PASSWORD}
+        started = time.perf_counter()
+        response = client.post('/api/v1/auth/login', json=payload)
+        elapsed = time.perf_counter() - started
+        with lock:
+            login_latency.append(elapsed)
+            statuses[response.status_code] += 1
+
+    def probe() -> None:
+        while not done.is_set():
+            started = time.perf_counter()
+            client.get('/api/v1/health')
+            health_latency.append(time.perf_counter() - started)
+            time.sleep(0.005)
+
+    prober = threading.Thread(target=probe, daemon=True)
+    prober.start()
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            list(pool.map(login, range(args.logins)))
+    finally:
+        wall = time.perf_counter() - started
+        done.set()
+        prober.join()
+        with app.app_context():
+            db.session.query(User).filter_by(id=user_id).delete()
+            db.session.commit()
+
+    with app.app_context():
+        hashing = password_hasher().stats()
+    report = {
+        'threads': args.threads,
+        'logins': args.logins,
+        'seconds': round(wall, 2),
+        'logins_per_second': round(args.logins / wall, 1) if wall else None,
+        'statuses': dict(sorted(statuses.items())),
+        'login': summarize(login_latency),
+        'health_during_logins': summarize(health_latency),
+        'hashing': hashing,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['logins']} logins em {report['seconds']}s ({report['logins_per_second']}/s), respostas {report['statuses']}")
+    print(f"login   p50 {report['login']['p50_ms']} ms  p95 {report['login']['p95_ms']} ms")
+    health = report['health_during_logins']
+    print(f"/health p50 {health['p50_ms']} ms  p95 {health['p95_ms']} ms  ({health['count']} chamadas)")
+    print(f"hash    {hashing['method']}  média {hashing['avg_verify_ms']} ms  recusados {hashing['rejected']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""Service-layer benchmarks over a synthetic dataset, compared against a baseline.
+
+    python -m benchmarks.services --scale 100k --output results.json
+    python -m benchmarks.services --scale 100k --baseline baseline.json
+
+Each case calls a PostService method directly, without HTTP or response
+caches. For every case the run records latency percentiles, SQL statements
+per call and, on MySQL, rows read by the storage engine per call. Rows read
+come from the ``Handler_read_*`` session counters of the single pooled
+connection. With ``--baseline`` the results are compared against an earlier
+run. The command exits non-zero when a case got slower than the tolerance,
+issued more queries, or read more rows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from src.extensions import db
+from src.models import Category
+from src.services.post_service import PostService
+from src.utils.clock import utcnow
+
+from .common import bench_database_url, create_bench_app, summarize
+from .dataset import ADMIN_EMAIL, EDITOR_EMAIL, SEARCH_TERM, TJD_EMAIL, DatasetInfo, bench_users, load_dataset, parse_scale
+
+# Latency differences below this are noise on any machine, whatever the ratio.
+NOISE_FLOOR_MS = 1.0
+
+
+@dataclass
+class Case:
+    name: str
+    call: Callable[[int], object]
+    # Writes skip the warm-up: it would consume the posts created for them.
+    write: bool = False
+
+
+class QueryCounter:
+    """Counts statements on the engine; on MySQL also rows read via session status."""
+
+    def __init__(self, engine) -> None:
+        self.engine = engine
+        self.statements = 0
+        self.mysql = engine.dialect.name == 'mysql'
+        event.listen(engine, 'before_cursor_execute', self._count)
+        # SHOW STATUS may touch the handler counters itself; measure it once.
+        self.overhead = 0
+        if self.mysql:
+            first = self.rows_read()
+            self.overhead = self.rows_read() - first
+
+    def _count(self, *_args) -> None:
+        self.statements += 1
+
+    def rows_read(self) -> Optional[int]:
+        if not self.mysql:
+            return None
+        # Checked out from the one-connection pool, so these are the counters
+        # of the connection the services use.
+        with self.engine.connect() as connection:
+            rows = connection.execute(sa.text("SHOW SESSION STATUS LIKE 'Handler_read%'")).all()
+        self.statements -= 1
+        return sum(int(value) for _name, value in rows)
+
+    def close(self) -> None:
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+
+def build_cases(info: DatasetInfo, users: dict, run_id: str) -> List[Case]:
+    admin, editor, tjd = users[ADMIN_EMAIL], users[EDITOR_EMAIL], users[TJD_EMAIL]
+    slugs = info.published_slugs or ['post-0']
+    # Sorted slugs: the last two are the inactive and the TJD category.
+    categories = info.categories
+    editor_category = Category.query.filter_by(slug=editor.allowed_category_slugs[0]).one().id
+    second_page = PostService.list_public_posts(page=1).next_cursor
+    db.session.remove()
+    created: List[str] = []
+
+    def create(index: int):
+        post = PostService.create_post(
+            {
+                'title': f'Benchmark {run_id} {index}',
+                'slug': f'bench-{run_id}-{index}',
+                'content_markdown': f'## Nota {index}\n\nTexto de **benchmark** da {SEARCH_TERM} {index}.',
+                'category_id': editor_category,
+                'author_id': editor.id,
+            },
+            editor,
+        )
+        created.append(post.id)
+
+    def update(index: int):
+        PostService.update_post(
+            created[index % len(created)],
+            {'title': f'Benchmark {run_id} {index} revisado', 'content_markdown': f'Conteúdo revisado {index}.'},
+            editor,
+        )
+
+    def publish(index: int):
+        PostService.publish_post(created[index % len(created)], editor)
+
+    def delete(index: int):
+        if created:
+            PostService.delete_post(created.pop(), editor)
+
+    return [
+        Case('public_feed_first_page', lambda i: PostService.list_public_posts(page=1)),
+        Case('public_feed_deep_page', lambda i: PostService.list_public_posts(page=200)),
+        Case('public_feed_cursor', lambda i: PostService.list_public_posts(cursor=second_page)),
+        Case(
+            'public_feed_category',
+            lambda i: PostService.list_public_posts(category_slug=categories[i % (len(categories) - 2)]),
+        ),
+        Case('public_search', lambda i: PostService.list_public_posts(query=SEARCH_TERM)),
+        Case('public_post', lambda i: PostService.get_public_post(slugs[i % len(slugs)])),
+        Case('admin_posts', lambda i: PostService.list_posts(requesting_user=admin)),
+        Case('admin_posts_search', lambda i: PostService.list_posts(requesting_user=admin, query=SEARCH_TERM)),
+        Case('admin_posts_drafts', lambda i: PostService.list_posts(requesting_user=admin, status='DRAFT')),
+        Case('editor_posts', lambda i: PostService.list_posts(requesting_user=editor)),
+        Case('tjd_posts', lambda i: PostService.list_posts(requesting_user=tjd)),
+        # The write cases run in order over the posts created by the first.
+        Case('create_post', create, write=True),
+        Case('update_post', update, write=True),
+        Case('publish_post', publish, write=True),
+        Case('delete_post', delete, write=True),
+    ]
+
+
+@contextmanager
+def _fresh_session() -> Iterator[None]:
+    try:
+        yield
+    finally:
+        db.session.remove()
+
+
+def measure(case: Case, counter: QueryCounter, *, repeat: int, warmup: int) -> dict:
+    if not case.write:
+        for index in range(warmup):
+            with _fresh_session():
+                case.call(index)
+
+    rows_before = counter.rows_read()
+    statements_before = counter.statements
+    samples = []
+    for index in range(repeat):
+        with _fresh_session():
+            started = time.perf_counter()
+            case.call(index)
+            samples.append(time.perf_counter() - started)
+    statements = counter.statements - statements_before
+    rows_after = counter.rows_read()
+
+    result = summarize(samples)
+    result['queries'] = round(statements / repeat, 2)
+    result['rows_read'] = None if rows_before is None else round((rows_after - rows_before - counter.overhead) / repeat, 1)
+    return result
+
+
+def compare(current: dict, baseline: dict, *, tolerance: float) -> List[str]:
+    regressions = []
+    for name, now in current['cases'].items():
+        before = baseline.get('cases', {}).get(name)
+        if before is None:
+            continue
+        if now['p95_ms'] > before['p95_ms'] * (1 + tolerance) and now['p95_ms'] - before['p95_ms'] > NOISE_FLOOR_MS:
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms")
+        if now['queries'] > before['queries']:
+            regressions.append(f"{name}: consultas {before['queries']} -> {now['queries']}")
+        if (
+            now.get('rows_read') is not None
+            and before.get('rows_read') is not None
+            and now['rows_read'] > before['rows_read'] * (1 + tolerance)
+        ):
+            regressions.append(f"{name}: linhas lidas {before['rows_read']} -> {now['rows_read']}")
+    return regressions
+
+
+def run(posts: int, *, seed: int, repeat: int, warmup: int, only: Optional[List[str]] = None) -> dict:
+    url = bench_database_url()
+    app = create_bench_app(url)
+    with app.app_context():
+        info = load_dataset(posts, seed=seed)
+        users = bench_users()
+        cases = build_cases(info, users, run_id=utcnow().strftime('%Y%m%d%H%M%S'))
+        counter = QueryCounter(db.engine)
+        selected = set(only or [case.name for case in cases])
+        if any(case.write and case.name in selected for case in cases):
+            # The other writes operate on the posts create_post leaves behind.
+            selected.add('create_post')
+        results: Dict[str, dict] = {}
+        try:
+            for case in cases:
+                if case.name not in selected:
+                    continue
+                results[case.name] = measure(case, counter, repeat=repeat, warmup=warmup)
+                print(f'{case.name:<26} {json.dumps(results[case.name])}')
+        finally:
+            counter.close()
+    return {
+        'meta': {
+            'posts': posts,
+            'seed': seed,
+            'repeat': repeat,
+            'dialect': make_url(url).get_backend_name(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'created_at': utcnow().isoformat(),
+        },
+        'cases': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos serviços de posts com dados sintéticos.')
+    parser.add_argument('--scale', default='10k', help='Quantidade de posts: 10k, 100k, 1m ou um número')
+    parser.add_argument('--seed', type=int, default=42, help='Semente dos dados sintéticos')
+    parser.add_argument('--repeat', type=int, default=50, help='Medições por caso')
+    parser.add_argument('--warmup', type=int, default=5, help='Chamadas descartadas antes de medir')
+    parser.add_argument('--case', action='append', dest='cases', help='Executa apenas este caso (repetível)')
+    parser.add_argument('--output', help='Grava os resultados neste arquivo JSON')
+    parser.add_argument('--baseline', help='Compara com os resultados deste arquivo JSON')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Piora relativa aceita no p95 e nas linhas lidas')
+    args = parser.parse_args()
+
+    results = run(parse_scale(args.scale), seed=args.seed, repeat=args.repeat, warmup=args.warmup, only=args.cases)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+            output.write('\n')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as source:
+            baseline = json.load(source)
+        if baseline.get('meta', {}).get('posts') != results['meta']['posts']:
+            print('Aviso: baseline gerado com outro volume de dados')
+        regressions = compare(results, baseline, tolerance=args.tolerance)
+        for line in regressions:
+            print(f'REGRESSÃO {line}')
+        if regressions:
+            sys.exit(1)
+        print('Nenhuma regressão em relação ao baseline')
+
+
+if __name__ == '__main__':
+    main()
@@ -11,56 +11,25 @@ if [ -z "${DATABASE_URL:-}" ]; then
   exit 1
 fi
 
-python <<'PY'
-import os
-import time
-from sqlalchemy.engine import make_url
-import pymysql
+# Reported by gunicorn and /health as time to ready / first healthy response.
+export BOOT_STARTED_AT=${BOOT_STARTED_AT:-$(date +%s.%N)}
 
-url = make_url(os.environ['DATABASE_URL'])
-
-host = url.host or 'localhost'
-port = url.port or 3306
-user = url.username
-password = url.password
-# Database may not exist yet; MySQL entrypoint creates it, so wait for server availability first.
-
-while True:
-    try:
-        conn = pymysql.connect(host=host, port=port, user=user, password=password, database=url.database, connect_timeout=5)
-        conn.close()
-        break
-    except Exception as exc:  # noqa: BLE001
-        print(f"Waiting for database {host}:{port}... {exc}")
-        time.sleep(2)
-PY
-
-python -m alembic upgrade head
-python -m src.seed
-
-python <<'PY'
-from src.app_factory import create_app
-from src.services.auth_service import AuthService
+if [ "$MODE" = "scheduler" ]; then
+  python -m src.boot --wait-only
+  exec python -m src.scheduler "$@"
+fi
 
-credentials = [
-    ("admin@organizacao.local", "123456"),
-    ("secretaria@organizacao.local", "123456"),
-    ("tjd@organizacao.local", "123456"),
-    ("editor@organizacao.local", "123456"),
-]
+if [ "$MODE" = "bootstrap" ]; then
+  # The login self-check costs one password hash per account; only here.
+  exec python -m src.boot --self-check
+fi
 
-app = create_app()
-with app.app_context():
-    for email, password in credentials:
-        try:
-            AuthService.login(email, password)
-            print(f"[seed-check] Login OK para {email}")
-        except Exception as exc:  # noqa: BLE001
-            print(f"[seed-check] Falha ao validar login para {email}: {exc}")
-PY
+# Waits for the database and reads the Alembic revision and seed fingerprint
+# in one query; migrations and seed run only when one of them changed.
+python -m src.boot
 
-if [ "$MODE" = "bootstrap" ]; then
-  exit 0
+if [ "${APP_RELOAD:-false}" = "true" ]; then
+  exec python -m src.wsgi
 fi
 
-exec python -m src.wsgi
+exec gunicorn -c gunicorn.conf.py src.wsgi:app
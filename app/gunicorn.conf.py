@@ -0,0 +1,82 @@
+"""Gunicorn settings for the production serve mode.
+
+The app is imported once in the master (``preload_app``) and the workers are
+forked from it. The heap built by that import is frozen out of the garbage
+collector, so collections in the workers do not touch and copy those pages.
+Sockets opened in the master are discarded after the fork.
+
+Workers record Prometheus metrics in a directory shared by the whole server
+(``METRICS_MULTIPROC_DIR``, a fresh temporary one unless set), so a scrape
+of ``/metrics`` reaching any worker reports the totals of all of them.
+"""
+
+import gc
+import os
+import tempfile
+import time
+
+# Before the config is read: its defaults are taken at import.
+if not os.environ.get('METRICS_MULTIPROC_DIR'):
+    os.environ['METRICS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='laf-metrics-')
+
+from src.config import get_config  # noqa: E402
+
+_config = get_config()
+
+bind = f"0.0.0.0:{_config.APP_PORT}"
+workers = _config.WEB_WORKERS
+threads = _config.WEB_THREADS
+# The gthread worker serves `threads` requests per process; sync when threads == 1.
+worker_class = 'gthread' if _config.WEB_THREADS > 1 else 'sync'
+timeout = _config.WEB_TIMEOUT
+graceful_timeout = _config.WEB_GRACEFUL_TIMEOUT
+# Recycle workers gradually (jitter avoids restarting all of them together).
+max_requests = _config.WEB_MAX_REQUESTS
+max_requests_jitter = _config.WEB_MAX_REQUESTS_JITTER
+preload_app = True
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):  # noqa: ARG001
+    # Values left by a previous server in a configured directory are stale.
+    if _config.METRICS_ENABLED:
+        from src.utils.metrics import clear_directory
+
+        os.makedirs(_config.METRICS_MULTIPROC_DIR, exist_ok=True)
+        clear_directory(_config.METRICS_MULTIPROC_DIR)
+
+
+def when_ready(server):
+    # Runs after the preload and before the first fork.
+    gc.collect()
+    gc.freeze()
+    if _config.BOOT_STARTED_AT:
+        server.log.info('Pronto para requisições %.2fs após o início do container', time.time() - _config.BOOT_STARTED_AT)
+
+
+def post_fork(server, worker):  # noqa: ARG001
+    from src.extensions import db
+    from src.wsgi import app
+
+    # Pooled connections were created by the master; let each worker open its
+    # own without closing the sockets the master still owns.
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    # Threads do not survive fork, so the in-process scheduler starts per
+    # worker; its advisory lock keeps the workers from promoting twice.
+    if app.config.get('SCHEDULER_IN_PROCESS'):
+        from src.services.scheduler_service import SchedulerService
+
+        SchedulerService.start_background(app)
+
+
+def child_exit(server, worker):  # noqa: ARG001
+    # A dead worker holds no connections; its counters move to the archive
+    # file so the totals keep them without one file per recycled worker.
+    if _config.METRICS_ENABLED:
+        from src.utils.metrics import mark_process_dead
+
+        mark_process_dead(_config.METRICS_MULTIPROC_DIR, worker.pid)
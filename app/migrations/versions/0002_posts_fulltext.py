@@ -0,0 +1,33 @@
+"""posts fulltext search index
+
+Revision ID: 0002_posts_fulltext
+Revises: 0001_initial
+Create Date: 2026-10-18 15:30:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_posts_fulltext'
+down_revision = '0001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # FULLTEXT is MySQL-only; other backends search through the in-memory index.
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.create_index(
+        'ft_posts_search',
+        'posts',
+        ['title', 'excerpt', 'content_markdown'],
+        mysql_prefix='FULLTEXT',
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.drop_index('ft_posts_search', table_name='posts')
@@ -0,0 +1,49 @@
+"""posts composite indexes for listing queries
+
+Revision ID: 0003_posts_composite_indexes
+Revises: 0002_posts_fulltext
+Create Date: 2026-10-18 16:10:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_posts_composite_indexes'
+down_revision = '0002_posts_fulltext'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Public feed: status + published_at, optionally narrowed to one category.
+    op.create_index('ix_posts_status_published_at', 'posts', ['status', 'published_at'], unique=False)
+    op.create_index(
+        'ix_posts_category_status_published_at',
+        'posts',
+        ['category_id', 'status', 'published_at'],
+        unique=False,
+    )
+    # Admin listing: created_at order, unfiltered or filtered by status, category or author.
+    op.create_index('ix_posts_created_at', 'posts', ['created_at'], unique=False)
+    op.create_index('ix_posts_status_created_at', 'posts', ['status', 'created_at'], unique=False)
+    op.create_index('ix_posts_category_created_at', 'posts', ['category_id', 'created_at'], unique=False)
+    op.create_index('ix_posts_author_created_at', 'posts', ['author_id', 'created_at'], unique=False)
+
+    # Left prefixes of the composites above; the foreign keys now use those.
+    op.drop_index('ix_posts_status', table_name='posts')
+    op.drop_index('ix_posts_category_id', table_name='posts')
+    op.drop_index('ix_posts_author_id', table_name='posts')
+
+
+def downgrade() -> None:
+    op.create_index('ix_posts_author_id', 'posts', ['author_id'], unique=False)
+    op.create_index('ix_posts_category_id', 'posts', ['category_id'], unique=False)
+    op.create_index('ix_posts_status', 'posts', ['status'], unique=False)
+
+    op.drop_index('ix_posts_author_created_at', table_name='posts')
+    op.drop_index('ix_posts_category_created_at', table_name='posts')
+    op.drop_index('ix_posts_status_created_at', table_name='posts')
+    op.drop_index('ix_posts_created_at', table_name='posts')
+    op.drop_index('ix_posts_category_status_published_at', table_name='posts')
+    op.drop_index('ix_posts_status_published_at', table_name='posts')
@@ -0,0 +1,47 @@
+"""published posts always carry a past published_at
+
+Revision ID: 0004_published_posts_in_past
+Revises: 0003_posts_composite_indexes
+Create Date: 2026-10-18 17:00:00.000000
+"""
+
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_published_posts_in_past'
+down_revision = '0003_posts_composite_indexes'
+branch_labels = None
+depends_on = None
+
+
+posts = sa.table(
+    'posts',
+    sa.column('status', sa.String(length=20)),
+    sa.column('published_at', sa.DateTime(timezone=True)),
+    sa.column('created_at', sa.DateTime(timezone=True)),
+)
+
+
+def upgrade() -> None:
+    # Public queries now only check status = PUBLISHED; future-dated rows wait
+    # as SCHEDULED for the scheduler, and undated rows take their creation time.
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    op.execute(
+        posts.update()
+        .where(posts.c.status == 'PUBLISHED', posts.c.published_at > now)
+        .values(status='SCHEDULED')
+    )
+    op.execute(
+        posts.update()
+        .where(posts.c.status == 'PUBLISHED', posts.c.published_at.is_(None))
+        .values(published_at=posts.c.created_at)
+    )
+
+
+def downgrade() -> None:
+    # Data-only normalization; the previous schema accepts the new rows as-is.
+    pass
@@ -0,0 +1,32 @@
+"""posts store rendered markdown
+
+Revision ID: 0005_posts_rendered_content
+Revises: 0004_published_posts_in_past
+Create Date: 2026-10-18 20:30:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_posts_rendered_content'
+down_revision = '0004_published_posts_in_past'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filled by PostService on write and by `python -m src.render_posts` for
+    # existing rows; readers render on the fly while a row is still NULL.
+    op.add_column('posts', sa.Column('content_html', sa.Text(), nullable=True))
+    op.add_column('posts', sa.Column('content_text', sa.Text(), nullable=True))
+    op.add_column('posts', sa.Column('word_count', sa.Integer(), nullable=True))
+    op.add_column('posts', sa.Column('content_render_version', sa.SmallInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('posts', 'content_render_version')
+    op.drop_column('posts', 'word_count')
+    op.drop_column('posts', 'content_text')
+    op.drop_column('posts', 'content_html')
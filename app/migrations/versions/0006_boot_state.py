@@ -0,0 +1,30 @@
+"""boot state markers for fast container starts
+
+Revision ID: 0006_boot_state
+Revises: 0005_posts_rendered_content
+Create Date: 2026-10-18 21:30:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_boot_state'
+down_revision = '0005_posts_rendered_content'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'boot_state',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('value', sa.String(length=128), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('boot_state')
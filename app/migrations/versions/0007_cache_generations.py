@@ -0,0 +1,29 @@
+"""cache generation counters shared by all processes
+
+Revision ID: 0007_cache_generations
+Revises: 0006_boot_state
+Create Date: 2026-10-19 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_cache_generations'
+down_revision = '0006_boot_state'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cache_generations',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cache_generations')
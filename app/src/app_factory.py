@@ -2,21 +2,33 @@ from __future__ import annotations
 
 import logging
 from logging import StreamHandler
-
-from flask import send_from_directory
+from typing import Optional
 
 from flask import Flask, jsonify
 
-from .config import get_config
+from .config import Config, get_config
 from .docs.swagger import build_template
-from .extensions import cors, db, jwt, swagger
+from .extensions import cors, db, jwt, response_cache, swagger
 from .routes import register_routes
+from .services.auth_service import AuthService
+from .services.cache_service import CacheService
+from .services.category_service import CategoryService
+from .services.search_service import SearchService
+from .utils.db_pool import configure_pool, register_pool_listeners
+from .utils.db_routing import init_replica_routing
+from .utils import generations
+from .utils.file_serving import send_stored_file
+from .utils.pagination import count_cache
+from .utils.metrics import init_metrics
+from .utils.request_timing import init_request_timing
 from .utils.responses import ApiError
+from .utils.uploads import UploadRequest, upload_cache_policy
 
 
-def create_app(testing: bool = False) -> Flask:
+def create_app(testing: bool = False, config: Optional[Config] = None) -> Flask:
     app = Flask(__name__)
-    config = get_config()
+    app.request_class = UploadRequest
+    config = config or get_config()
     app.config.from_object(config)
 
     if testing:
@@ -39,7 +51,12 @@ def create_app(testing: bool = False) -> Flask:
 
     @app.route('/static/uploads/<path:filename>')
     def serve_upload(filename):
-        return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+        return send_stored_file(
+            app.config['UPLOAD_FOLDER'],
+            filename,
+            accel_prefix=app.config['UPLOAD_ACCEL_PREFIX'],
+            cache_policy=upload_cache_policy(filename),
+        )
 
     return app
 
@@ -54,8 +71,25 @@ def configure_logging(app: Flask) -> None:
 
 
 def register_extensions(app: Flask) -> None:
+    configure_pool(app)
     db.init_app(app)
-    cors.init_app(app, resources={r"/api/*": {'origins': app.config.get('CORS_ORIGINS', ['*'])}})
+    register_pool_listeners(app)
+    response_cache.init_app(app, generations=generations.current)
+    count_cache.init_app(app)
+    init_replica_routing(app)
+    init_request_timing(app)
+    init_metrics(app)
+    generations.register_listeners()
+    AuthService.register_listeners()
+    CacheService.register_listeners()
+    SearchService.register_listeners()
+    CategoryService.register_listeners()
+    # Credentials carry the replica read-your-writes cookie (utils.db_routing).
+    cors.init_app(
+        app,
+        resources={r"/api/*": {'origins': app.config.get('CORS_ORIGINS', ['*'])}},
+        supports_credentials=True,
+    )
     jwt.init_app(app)
 
     @jwt.unauthorized_loader
@@ -84,7 +118,7 @@ def register_extensions(app: Flask) -> None:
 def register_error_handlers(app: Flask) -> None:
     @app.errorhandler(ApiError)
     def handle_api_error(error: ApiError):
-        return jsonify(error.to_response()), error.status
+        return jsonify(error.to_response()), error.status, error.headers
 
     @app.errorhandler(404)
     def handle_not_found(_):
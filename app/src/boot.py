@@ -0,0 +1,172 @@
+"""Container boot: wait for the database, then migrate and seed only when needed.
+
+``docker-entrypoint.sh`` runs this before every server start. The Alembic
+revision and the seed fingerprint are read in a single query on the first
+connection that succeeds; when both are current, the start skips straight
+to the server without building the app. Otherwise migrations, seed and pending post rendering run
+under a named lock, so replicas starting together do the work once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.pool import NullPool
+
+from .app_factory import create_app
+from .config import BASE_DIR, get_config
+from .extensions import db
+from .models import BootState
+from .seed import USERS, seed_all
+from .services.auth_service import AuthService
+from .services.post_service import PostService
+from .utils.locks import advisory_lock
+from .utils.markdown import RENDER_VERSION
+
+SEED_STATE = 'seed'
+BOOT_LOCK = 'laf:boot'
+
+State = Tuple[Optional[str], Optional[str]]
+
+
+@dataclass(frozen=True)
+class BootPlan:
+    migrate: bool
+    seed: bool
+
+    @property
+    def needed(self) -> bool:
+        return self.migrate or self.seed
+
+
+def plan_boot(state: State, head: str, fingerprint: str) -> BootPlan:
+    revision, seeded = state
+    return BootPlan(migrate=revision != head, seed=seeded != fingerprint)
+
+
+def seed_fingerprint() -> str:
+    """Changes whenever the seed data or the stored markdown rendering would."""
+    digest = hashlib.sha256()
+    with open(os.path.join(os.path.dirname(__file__), 'seed.py'), 'rb') as source:
+        digest.update(source.read())
+    digest.update(f'render:{RENDER_VERSION}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def alembic_config() -> AlembicConfig:
+    config = AlembicConfig(os.path.join(BASE_DIR, 'alembic.ini'))
+    # alembic.ini paths are relative to the working directory.
+    config.set_main_option('script_location', os.path.join(BASE_DIR, 'migrations'))
+    return config
+
+
+def alembic_head(config: AlembicConfig) -> str:
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def read_state(connection) -> State:
+    """Current Alembic revision and seed fingerprint; ``(None, None)`` before the first migration."""
+    try:
+        row = connection.execute(
+            text(
+                'SELECT (SELECT version_num FROM alembic_version LIMIT 1), '
+                '(SELECT value FROM boot_state WHERE name = :name)'
+            ),
+            {'name': SEED_STATE},
+        ).first()
+    except DBAPIError:
+        connection.rollback()
+        return None, None
+    return row[0], row[1]
+
+
+def wait_for_database(url: str, timeout: float) -> State:
+    engine = create_engine(url, poolclass=NullPool)
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                with engine.connect() as connection:
+                    return read_state(connection)
+            except OperationalError as exc:
+                if time.monotonic() > deadline:
+                    raise
+                print(f'[boot] Aguardando o banco de dados... {exc.orig}')
+                time.sleep(1)
+    finally:
+        engine.dispose()
+
+
+def run(plan: BootPlan, head: str, fingerprint: str, config: AlembicConfig, *, force: bool = False) -> None:
+    app = create_app()
+    with app.app_context(), advisory_lock(BOOT_LOCK, timeout=600) as acquired:
+        if not acquired:
+            raise SystemExit('[boot] Outro processo não liberou o lock de inicialização')
+        if not force:
+            # Another replica may have finished while this one waited for the lock.
+            with db.engine.connect() as connection:
+                plan = plan_boot(read_state(connection), head, fingerprint)
+        if plan.migrate:
+            started = time.perf_counter()
+            command.upgrade(config, 'head')
+            print(f'[boot] Migrações aplicadas em {time.perf_counter() - started:.2f}s')
+        if plan.seed:
+            started = time.perf_counter()
+            seed_all()
+            rendered = PostService.rerender_content()
+            db.session.merge(BootState(name=SEED_STATE, value=fingerprint))
+            db.session.commit()
+            print(f'[boot] Seed aplicado ({rendered} posts renderizados) em {time.perf_counter() - started:.2f}s')
+
+
+def self_check() -> None:
+    """Log in as each seeded account; slow by design (one password hash each)."""
+    app = create_app()
+    with app.app_context():
+        for _name, email, password, _role, _slugs in USERS:
+            try:
+                AuthService.login(email, password)
+                print(f'[seed-check] Login OK para {email}')
+            except Exception as exc:  # noqa: BLE001
+                print(f'[seed-check] Falha ao validar login para {email}: {exc}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prepara o banco antes de iniciar a API.')
+    parser.add_argument('--wait-only', action='store_true', help='Apenas aguarda o banco ficar disponível')
+    parser.add_argument('--self-check', action='store_true', help='Valida o login das contas do seed ao final')
+    parser.add_argument('--force', action='store_true', help='Executa migrações e seed mesmo sem mudanças')
+    parser.add_argument('--timeout', type=float, default=120, help='Segundos de espera pelo banco')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    state = wait_for_database(get_config().SQLALCHEMY_DATABASE_URI, args.timeout)
+    print(f'[boot] Banco disponível em {time.perf_counter() - started:.2f}s')
+    if args.wait_only:
+        return
+
+    config = alembic_config()
+    head = alembic_head(config)
+    fingerprint = seed_fingerprint()
+    plan = BootPlan(migrate=True, seed=True) if args.force else plan_boot(state, head, fingerprint)
+    if plan.needed:
+        run(plan, head, fingerprint, config, force=args.force)
+    else:
+        print(f'[boot] Revisão {head} e seed atuais; migrações e seed ignorados')
+    if args.self_check:
+        self_check()
+    print(f'[boot] Concluído em {time.perf_counter() - started:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -98,6 +98,8 @@ def build_template(config) -> Dict[str, Any]:
                     'excerpt': {'type': 'string'},
                     'cover_image_url': {'type': 'string'},
                     'content_markdown': {'type': 'string'},
+                    'content_html': {'type': 'string', 'description': 'HTML sanitizado renderizado no servidor'},
+                    'word_count': {'type': 'integer'},
                     'status': {
                         'type': 'string',
                         'enum': ['DRAFT', 'PUBLISHED', 'SCHEDULED'],
@@ -109,9 +111,58 @@ def build_template(config) -> Dict[str, Any]:
                     'updated_at': {'type': 'string'},
                 },
             },
+            'PostSummary': {
+                'type': 'object',
+                'description': 'Post sem `content_markdown`; `excerpt` é gerado do conteúdo quando ausente',
+                'properties': {
+                    'id': {'type': 'string'},
+                    'slug': {'type': 'string'},
+                    'title': {'type': 'string'},
+                    'excerpt': {'type': 'string'},
+                    'cover_image_url': {'type': 'string'},
+                    'word_count': {'type': 'integer'},
+                    'status': {
+                        'type': 'string',
+                        'enum': ['DRAFT', 'PUBLISHED', 'SCHEDULED'],
+                    },
+                    'category': {'$ref': '#/definitions/Category'},
+                    'author': {'$ref': '#/definitions/User'},
+                    'published_at': {'type': 'string'},
+                    'created_at': {'type': 'string'},
+                    'updated_at': {'type': 'string'},
+                },
+            },
+            'PublicPost': {
+                'type': 'object',
+                'description': 'Post publicado sem `content_markdown`; o conteúdo vem em `content_html`',
+                'properties': {
+                    'id': {'type': 'string'},
+                    'slug': {'type': 'string'},
+                    'title': {'type': 'string'},
+                    'excerpt': {'type': 'string'},
+                    'cover_image_url': {'type': 'string'},
+                    'content_html': {'type': 'string', 'description': 'HTML sanitizado renderizado no servidor'},
+                    'word_count': {'type': 'integer'},
+                    'status': {
+                        'type': 'string',
+                        'enum': ['DRAFT', 'PUBLISHED', 'SCHEDULED'],
+                    },
+                    'category': {'$ref': '#/definitions/Category'},
+                    'author': {'$ref': '#/definitions/User'},
+                    'published_at': {'type': 'string'},
+                    'created_at': {'type': 'string'},
+                    'updated_at': {'type': 'string'},
+                },
+            },
+            'PublicPostResponse': {
+                'type': 'object',
+                'properties': {
+                    'data': {'$ref': '#/definitions/PublicPost'},
+                },
+            },
             'PostList': {
                 'type': 'array',
-                'items': {'$ref': '#/definitions/Post'},
+                'items': {'$ref': '#/definitions/PostSummary'},
             },
             'PaginatedResponse': {
                 'type': 'object',
@@ -120,6 +171,9 @@ def build_template(config) -> Dict[str, Any]:
                     'page': {'type': 'integer'},
                     'page_size': {'type': 'integer'},
                     'total': {'type': 'integer'},
+                    'total_strategy': {'type': 'string', 'enum': ['exact', 'cached', 'estimated', 'none']},
+                    'has_more': {'type': 'boolean'},
+                    'next_cursor': {'type': 'string'},
                 },
             },
             'AuthLoginResponse': {
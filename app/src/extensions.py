@@ -5,11 +5,14 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
 
+from .utils.cache import ResponseCache
+from .utils.db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 cors = CORS()
 swagger = Swagger()
+response_cache = ResponseCache()
 
 
-__all__ = ['db', 'jwt', 'cors', 'swagger']
+__all__ = ['db', 'jwt', 'cors', 'swagger', 'response_cache']
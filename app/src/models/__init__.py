@@ -3,5 +3,7 @@ from __future__ import annotations
 from .user import User, UserRole
 from .category import Category
 from .post import Post, PostStatus
+from .boot_state import BootState
+from .cache_generation import CacheGeneration
 
-__all__ = ['User', 'UserRole', 'Category', 'Post', 'PostStatus']
+__all__ = ['User', 'UserRole', 'Category', 'Post', 'PostStatus', 'BootState', 'CacheGeneration']
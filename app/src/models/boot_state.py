@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from ..extensions import db
+from ..utils.clock import utcnow
+
+
+class BootState(db.Model):
+    """Markers left by ``python -m src.boot`` so later container starts can skip finished work."""
+
+    __tablename__ = 'boot_state'
+
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.String(128), nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), default=utcnow, onupdate=utcnow, nullable=False)
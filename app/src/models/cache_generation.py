@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from ..extensions import db
+
+
+class CacheGeneration(db.Model):
+    """Counter bumped by every write that invalidates a process-local cache (see ``utils.generations``)."""
+
+    __tablename__ = 'cache_generations'
+
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
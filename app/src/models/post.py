@@ -5,9 +5,11 @@ from datetime import datetime
 from enum import Enum
 
 from sqlalchemy import Index
+from sqlalchemy.orm import query_expression
 
 from ..extensions import db
 from ..utils.clock import has_passed, utcnow
+from ..utils.markdown import RENDER_VERSION, RenderedMarkdown, render_markdown
 
 
 class PostStatus(str, Enum):
@@ -25,24 +27,68 @@ class Post(db.Model):
     excerpt = db.Column(db.String(500), nullable=True)
     cover_image_url = db.Column(db.String(500), nullable=True)
     content_markdown = db.Column(db.Text, nullable=False)
+    # Sanitized HTML, plain text and word count rendered from content_markdown
+    # on write (see PostService and ``python -m src.render_posts``).
+    content_html = db.Column(db.Text, nullable=True)
+    content_text = db.Column(db.Text, nullable=True)
+    word_count = db.Column(db.Integer, nullable=True)
+    content_render_version = db.Column(db.SmallInteger, nullable=True)
     status = db.Column(db.Enum(PostStatus, native_enum=False, length=20), default=PostStatus.DRAFT, nullable=False)
-    category_id = db.Column(db.String(36), db.ForeignKey('categories.id'), nullable=False, index=True)
-    author_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+    category_id = db.Column(db.String(36), db.ForeignKey('categories.id'), nullable=False)
+    author_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     published_at = db.Column(db.DateTime(timezone=True), nullable=True)
     created_at = db.Column(db.DateTime(timezone=True), default=utcnow, nullable=False)
     updated_at = db.Column(db.DateTime(timezone=True), default=utcnow, onupdate=utcnow, nullable=False)
 
+    # Leading slice of content_text (content_markdown until rendered), populated
+    # only by listing queries that defer the full body (see
+    # PostService.LIST_PREVIEW_CHARS).
+    content_preview = query_expression()
+
     category = db.relationship('Category', back_populates='posts')
     author = db.relationship('User', back_populates='posts')
 
+    # Composite indexes follow the PostService listing shapes (equality columns
+    # first, sort column last); the primary key completes each one, which
+    # covers the ``id`` tie-breaker of keyset pagination. See migration 0003.
     __table_args__ = (
-        Index('ix_posts_status', 'status'),
         Index('ix_posts_published_at', 'published_at'),
+        Index('ix_posts_created_at', 'created_at'),
+        Index('ix_posts_status_published_at', 'status', 'published_at'),
+        Index('ix_posts_category_status_published_at', 'category_id', 'status', 'published_at'),
+        Index('ix_posts_status_created_at', 'status', 'created_at'),
+        Index('ix_posts_category_created_at', 'category_id', 'created_at'),
+        Index('ix_posts_author_created_at', 'author_id', 'created_at'),
+        Index('ft_posts_search', 'title', 'excerpt', 'content_markdown', mysql_prefix='FULLTEXT'),
     )
 
     def is_public(self) -> bool:
         return self.status == PostStatus.PUBLISHED and has_passed(self.published_at)
 
+    def apply_rendered(self, rendered: RenderedMarkdown) -> None:
+        self.content_html = rendered.html
+        self.content_text = rendered.text
+        self.word_count = rendered.word_count
+        self.content_render_version = rendered.version
+
+    def rendered(self) -> RenderedMarkdown:
+        """Stored rendering, or a fresh one for rows the bulk re-render has not reached.
+
+        A fresh rendering is kept on the instance until the Markdown changes,
+        so serializing several rendered fields renders once.
+        """
+        if self.content_render_version == RENDER_VERSION and self.content_html is not None:
+            return RenderedMarkdown(
+                html=self.content_html,
+                text=self.content_text or '',
+                word_count=self.word_count or 0,
+            )
+        fresh = getattr(self, '_fresh_rendering', None)
+        if fresh is None or fresh[0] != self.content_markdown:
+            fresh = (self.content_markdown, render_markdown(self.content_markdown))
+            self._fresh_rendering = fresh
+        return fresh[1]
+
     def to_dict(self, include_content: bool = True) -> dict:
         data = {
             'id': self.id,
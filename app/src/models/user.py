@@ -4,10 +4,9 @@ import uuid
 from datetime import datetime
 from enum import Enum
 
-from werkzeug.security import check_password_hash, generate_password_hash
-
 from ..extensions import db
 from ..utils.clock import utcnow
+from ..utils.passwords import password_hasher
 
 
 class UserRole(str, Enum):
@@ -40,18 +39,12 @@ class User(db.Model):
 
     posts = db.relationship('Post', back_populates='author', lazy='dynamic')
 
-    PASSWORD_METHOD = 'pbkdf2:sha256:600000'
-
+    # Hashing follows PASSWORD_HASH_METHOD; see utils.passwords.PasswordHasher.
     def set_password(self, password: str) -> None:
-        cleaned = (password or '').strip()
-        self.password_hash = generate_password_hash(cleaned, method=self.PASSWORD_METHOD)
+        self.password_hash = password_hasher().hash(password)
 
     def check_password(self, password: str) -> bool:
-        candidate = (password or '').strip()
-        try:
-            return check_password_hash(self.password_hash, candidate)
-        except ValueError:
-            return False
+        return password_hasher().verify(self.password_hash, password)
 
     def to_dict(self) -> dict:
         return {
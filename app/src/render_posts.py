@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import argparse
+
+from .app_factory import create_app
+from .services.post_service import PostService
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Renderiza o markdown dos posts e grava HTML sanitizado, texto puro e contagem de palavras.'
+    )
+    parser.add_argument('--all', action='store_true', help='Renderiza todos os posts, não apenas os pendentes')
+    parser.add_argument('--batch-size', type=int, default=200, help='Posts por lote')
+    parser.add_argument('--workers', type=int, default=None, help='Processos de renderização (padrão: número de CPUs)')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        updated = PostService.rerender_content(everything=args.all, batch_size=args.batch_size, workers=args.workers)
+        print(f'{updated} posts renderizados.')
+
+
+if __name__ == '__main__':
+    main()
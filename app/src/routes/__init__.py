@@ -3,6 +3,7 @@ from flask import Flask
 from .auth import auth_bp
 from .categories import categories_bp
 from .health import health_bp
+from .metrics import metrics_bp
 from .posts import posts_bp
 from .public import public_bp
 from .uploads import uploads_bp
@@ -17,6 +18,7 @@ def register_routes(app: Flask) -> None:
     app.register_blueprint(posts_bp, url_prefix='/api/v1/posts')
     app.register_blueprint(public_bp, url_prefix='/api/v1/public')
     app.register_blueprint(uploads_bp, url_prefix='/api/v1/uploads')
+    app.register_blueprint(metrics_bp)
 
 
 __all__ = ['register_routes']
@@ -3,6 +3,7 @@ from flask import Blueprint, request
 from ..models.user import UserRole
 from ..schemas import CategorySchema
 from ..services import CategoryService
+from ..utils.pagination import resolve_count_strategy
 from ..utils.permissions import require_authenticated, require_roles
 from ..utils.responses import ApiError, paginated_response, success_response
 
@@ -57,13 +58,21 @@ def list_categories(current_user):
     include_inactive = current_user.role in {UserRole.ADMIN, UserRole.SECRETARIA}
     if active_param is not None:
         include_inactive = active_param.lower() not in {'true', '1', 'yes'}
-    items, total = CategoryService.list_categories(
+    result = CategoryService.list_categories(
         page=page,
         page_size=page_size,
         include_inactive=include_inactive,
         query=query,
+        count_strategy=resolve_count_strategy('categories'),
+    )
+    return paginated_response(
+        category_list_schema.dump(result.items),
+        result.total,
+        page,
+        page_size,
+        total_strategy=result.total_strategy,
+        has_more=result.has_more,
     )
-    return paginated_response(category_list_schema.dump(items), total, page, page_size)
 
 
 @categories_bp.post('')
@@ -1,6 +1,18 @@
-from flask import Blueprint
+import time
+
+from flask import Blueprint, current_app
+
+from ..extensions import response_cache
+from ..models.user import UserRole
+from ..utils.db_pool import pool_stats
+from ..utils.db_routing import replica_stats
+from ..utils.passwords import password_hasher
+from ..utils.permissions import require_roles
+from ..utils.responses import success_response
 
 health_bp = Blueprint('health', __name__)
+# Per process: every gunicorn worker reports its own first healthy response.
+_first_healthy_reported = False
 
 
 @health_bp.get('/health')
@@ -19,4 +31,87 @@ def health_check():
               type: string
               example: ok
     """
+    _report_first_healthy()
     return {'status': 'ok'}
+
+
+def _report_first_healthy() -> None:
+    global _first_healthy_reported
+    if _first_healthy_reported:
+        return
+    _first_healthy_reported = True
+    started = current_app.config.get('BOOT_STARTED_AT')
+    if started:
+        current_app.logger.info('Primeira resposta saudável %.2fs após o início do container', time.time() - started)
+
+
+@health_bp.get('/health/caches')
+@require_roles(UserRole.ADMIN)
+def cache_stats(current_user):  # noqa: ARG001
+    """Estatísticas dos caches em memória (admin)
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: Acertos e falhas por namespace (feed público, posts, identidade)
+      403:
+        description: Sem permissão
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    return success_response(response_cache.stats())
+
+
+@health_bp.get('/health/pool')
+@require_roles(UserRole.ADMIN)
+def database_pool_stats(current_user):  # noqa: ARG001
+    """Estatísticas do pool de conexões do banco neste processo (admin)
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: Contadores (checkouts, invalidações, timeouts), espera por conexão e ocupação por engine
+      403:
+        description: Sem permissão
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    return success_response(pool_stats())
+
+
+@health_bp.get('/health/replicas')
+@require_roles(UserRole.ADMIN)
+def database_replica_stats(current_user):  # noqa: ARG001
+    """Estado das réplicas de leitura vistas por este processo (admin)
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: Saúde e atraso de cada réplica e janela de leitura no primário após escritas; null sem réplicas
+      403:
+        description: Sem permissão
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    return success_response(replica_stats())
+
+
+@health_bp.get('/health/passwords')
+@require_roles(UserRole.ADMIN)
+def password_hashing_stats(current_user):  # noqa: ARG001
+    """Política de hash de senhas e carga de login neste processo (admin)
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: Método configurado, verificações, hashes atualizados, logins recusados por excesso e tempo médio
+      403:
+        description: Sem permissão
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    return success_response(password_hasher().stats())
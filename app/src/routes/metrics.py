@@ -0,0 +1,45 @@
+import hmac
+from http import HTTPStatus
+
+from flask import Blueprint, current_app, request
+
+from ..utils.metrics import render, update_pool_gauges
+from ..utils.responses import ApiError
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.get('/metrics')
+def metrics():
+    """Métricas no formato de exposição do Prometheus
+    ---
+    tags:
+      - Health
+    produces:
+      - text/plain
+    description: >
+      Agregadas entre todos os processos do servidor. Quando METRICS_TOKEN está
+      definido, exige o cabeçalho `Authorization: Bearer <METRICS_TOKEN>`; com
+      METRICS_REQUIRE_TOKEN (padrão em produção) e sem token configurado,
+      recusa toda coleta.
+    responses:
+      200:
+        description: Contadores, gauges e histogramas em texto (versão 0.0.4)
+      401:
+        description: Token ausente ou inválido
+        schema:
+          $ref: '#/definitions/Error'
+      404:
+        description: Métricas desativadas (METRICS_ENABLED=false)
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    if not current_app.config.get('METRICS_ENABLED', True):
+        raise ApiError('NOT_FOUND', 'Recurso não encontrado', status=HTTPStatus.NOT_FOUND)
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token and current_app.config.get('METRICS_REQUIRE_TOKEN'):
+        raise ApiError('UNAUTHORIZED', 'METRICS_TOKEN não configurado', status=HTTPStatus.UNAUTHORIZED)
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        raise ApiError('UNAUTHORIZED', 'Token de métricas inválido', status=HTTPStatus.UNAUTHORIZED)
+    update_pool_gauges()
+    return current_app.response_class(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -2,14 +2,15 @@ from datetime import datetime
 
 from flask import Blueprint, request
 
-from ..schemas import PostSchema
+from ..schemas import PostListSchema, PostSchema
 from ..services import PostService
+from ..utils.pagination import resolve_count_strategy
 from ..utils.permissions import require_authenticated
 from ..utils.responses import ApiError, paginated_response, success_response
 
 posts_bp = Blueprint('posts', __name__)
 post_schema = PostSchema()
-posts_schema = PostSchema(many=True)
+posts_schema = PostListSchema(many=True)
 
 
 @posts_bp.get('')
@@ -42,11 +43,15 @@ def list_posts(current_user):
       - in: query
         name: q
         type: string
-        description: Busca em título, resumo ou categoria
+        description: Busca textual em título, resumo, conteúdo ou categoria (ignora acentos, aceita prefixos)
       - in: query
         name: order
         type: string
-        description: Campos `created_at` ou `published_at` com `:asc|desc`
+        description: Campos `created_at`, `published_at`, `title` ou `relevance` (com `q`) com `:asc|desc`
+      - in: query
+        name: cursor
+        type: string
+        description: Cursor opaco (`next_cursor`) para paginação por chave; ignora `page`
     responses:
       200:
         description: Lista paginada
@@ -69,7 +74,8 @@ def list_posts(current_user):
     author = request.args.get('author')
     query = request.args.get('q')
     order = request.args.get('order')
-    items, total = PostService.list_posts(
+    cursor = request.args.get('cursor')
+    result = PostService.list_posts(
         requesting_user=current_user,
         page=page,
         page_size=page_size,
@@ -78,8 +84,18 @@ def list_posts(current_user):
         author=author,
         query=query,
         order=order,
+        cursor=cursor,
+        count_strategy=resolve_count_strategy('posts'),
+    )
+    return paginated_response(
+        posts_schema.dump(result.items),
+        result.total,
+        page,
+        page_size,
+        total_strategy=result.total_strategy,
+        has_more=result.has_more,
+        next_cursor=result.next_cursor,
     )
-    return paginated_response(posts_schema.dump(items), total, page, page_size)
 
 
 @posts_bp.post('')
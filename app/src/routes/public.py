@@ -1,15 +1,26 @@
 from flask import Blueprint, request
 
 from ..models import Category
-from ..schemas import CategorySchema, PostSchema
+from ..schemas import CategorySchema, PostListSchema, PublicPostSchema
+from ..services.cache_service import CacheService
 from ..services.post_service import PostService
+from ..services.search_service import SearchService
+from ..utils.http_cache import build_representation, conditional_response, representation_response
+from ..utils.pagination import resolve_count_strategy
 from ..utils.responses import ApiError, paginated_response, success_response
 
 public_bp = Blueprint('public', __name__)
 category_schema = CategorySchema()
 category_list_schema = CategorySchema(many=True)
-post_schema = PostSchema()
-post_list_schema = PostSchema(many=True)
+post_schema = PublicPostSchema()
+post_list_schema = PostListSchema(many=True)
+
+
+def _post_versions(posts):
+    for post in posts:
+        yield post
+        yield post.category
+        yield post.author
 
 
 @public_bp.get('/categories')
@@ -23,13 +34,20 @@ def public_categories():
         description: Lista de categorias ativas
         schema:
           $ref: '#/definitions/CategoryList'
+      304:
+        description: Conteúdo não modificado (ETag/Last-Modified)
     """
     categories = (
         Category.query.filter_by(is_active=True)
         .order_by(Category.name.asc())
         .all()
     )
-    return success_response(category_list_schema.dump(categories))
+    return conditional_response(
+        'public_categories',
+        categories,
+        lambda: success_response(category_list_schema.dump(categories)),
+        use_last_modified=False,
+    )
 
 
 @public_bp.get('/categories/<slug>')
@@ -48,6 +66,8 @@ def public_category_detail(slug: str):
         description: Categoria encontrada
         schema:
           $ref: '#/definitions/CategoryResponse'
+      304:
+        description: Conteúdo não modificado (ETag/Last-Modified)
       404:
         description: Categoria não encontrada
         schema:
@@ -56,7 +76,11 @@ def public_category_detail(slug: str):
     category = Category.query.filter_by(slug=slug, is_active=True).first()
     if not category:
         raise ApiError('NOT_FOUND', 'Categoria não encontrada', status=404)
-    return success_response(category_schema.dump(category))
+    return conditional_response(
+        'public_category',
+        [category],
+        lambda: success_response(category_schema.dump(category)),
+    )
 
 
 @public_bp.get('/feed')
@@ -81,11 +105,16 @@ def public_feed():
       - in: query
         name: q
         type: string
-        description: Busca por título/resumo
+        description: Busca textual em título, resumo e conteúdo (ignora acentos, aceita prefixos)
       - in: query
         name: order
         type: string
         default: published_at:desc
+        description: Use `relevance` junto com `q` para ordenar pela pontuação da busca
+      - in: query
+        name: cursor
+        type: string
+        description: Cursor opaco (`next_cursor`) para paginação por chave; ignora `page`
     responses:
       200:
         description: Feed público
@@ -96,20 +125,46 @@ def public_feed():
               properties:
                 data:
                   $ref: '#/definitions/PostList'
+      304:
+        description: Conteúdo não modificado (ETag/Last-Modified)
     """
     page = int(request.args.get('page', 1))
     page_size = min(int(request.args.get('page_size', 12)), 50)
     category = request.args.get('category')
     query = request.args.get('q')
     order = request.args.get('order', 'published_at:desc')
-    items, total = PostService.list_public_posts(
-        page=page,
-        page_size=page_size,
-        category_slug=category,
-        query=query,
-        order=order,
-    )
-    return paginated_response(post_list_schema.dump(items), total, page, page_size)
+    cursor = request.args.get('cursor')
+
+    def load():
+        result = PostService.list_public_posts(
+            page=page,
+            page_size=page_size,
+            category_slug=category,
+            query=query,
+            order=order,
+            cursor=cursor,
+            count_strategy=resolve_count_strategy('public_feed'),
+        )
+        return build_representation(
+            _post_versions(result.items),
+            lambda: paginated_response(
+                post_list_schema.dump(result.items),
+                result.total,
+                page,
+                page_size,
+                total_strategy=result.total_strategy,
+                has_more=result.has_more,
+                next_cursor=result.next_cursor,
+            ),
+            extra=(result.total, result.has_more, result.next_cursor),
+        )
+
+    cache_key = (page if not cursor else None, cursor, page_size, category, query, order)
+    if query:
+        # Answers from an index that is still being rebuilt are kept apart.
+        cache_key += (SearchService.index_version(),)
+    representation = CacheService.cached(CacheService.FEED, cache_key, load)
+    return representation_response('public_feed', representation, use_last_modified=False)
 
 
 @public_bp.get('/posts/<slug>')
@@ -127,11 +182,18 @@ def public_post(slug: str):
       200:
         description: Post disponível publicamente
         schema:
-          $ref: '#/definitions/PostResponse'
+          $ref: '#/definitions/PublicPostResponse'
+      304:
+        description: Conteúdo não modificado (ETag/Last-Modified)
       404:
         description: Post não encontrado ou não publicado
         schema:
           $ref: '#/definitions/Error'
     """
-    post = PostService.get_public_post(slug)
-    return success_response(post_schema.dump(post))
+
+    def load():
+        post = PostService.get_public_post(slug)
+        return build_representation(_post_versions([post]), lambda: success_response(post_schema.dump(post)))
+
+    representation = CacheService.cached(CacheService.POST, slug, load)
+    return representation_response('public_post', representation)
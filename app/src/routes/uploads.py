@@ -1,11 +1,13 @@
-import os
-import uuid
+from http import HTTPStatus
 
-from flask import Blueprint, current_app, request, send_from_directory
-from werkzeug.utils import secure_filename
+from flask import Blueprint, current_app, request
 
+from ..services.image_service import ImageService
+from ..utils.file_serving import send_stored_file
+from ..utils.metrics import UPLOAD_BYTES, UPLOADS
 from ..utils.permissions import require_authenticated
 from ..utils.responses import success_response
+from ..utils.uploads import UploadLimits, upload_cache_policy
 
 uploads_bp = Blueprint('uploads', __name__)
 
@@ -27,34 +29,119 @@ def upload_image(current_user):  # noqa: ARG001
         description: Arquivo de imagem
     responses:
       201:
-        description: Upload realizado
+        description: Upload armazenado em /static/uploads/<sha256>.<ext>
         schema:
           $ref: '#/definitions/StandardResponse'
-      400:
-        description: Falha no upload
+      200:
+        description: Conteúdo idêntico já existia; devolve a mesma URL
+        schema:
+          $ref: '#/definitions/StandardResponse'
+      413:
+        description: Arquivo maior que UPLOAD_MAX_BYTES
+        schema:
+          $ref: '#/definitions/Error'
+      415:
+        description: Tipo fora de UPLOAD_ALLOWED_TYPES (verificado pelo conteúdo)
+        schema:
+          $ref: '#/definitions/Error'
+      422:
+        description: Arquivo ausente ou vazio
         schema:
           $ref: '#/definitions/Error'
     """
+    limits = UploadLimits.from_config(current_app.config)
+    # Declared oversize bodies are refused before any byte is read; chunked
+    # bodies are capped by the spool as they stream in.
+    if request.content_length and request.content_length > limits.max_request_bytes:
+        raise limits.too_large()
+    request.upload_limits = limits
+
     file = request.files.get('file')
     if not file:
         return {'error': {'code': 'VALIDATION_ERROR', 'message': 'Arquivo não enviado'}}, 422
 
-    filename = secure_filename(file.filename or '')
-    if not filename:
-        return {'error': {'code': 'VALIDATION_ERROR', 'message': 'Nome de arquivo inválido'}}, 422
-
-    ext = os.path.splitext(filename)[1]
-    unique_name = f"{uuid.uuid4().hex}{ext}"
-    upload_path = current_app.config['UPLOAD_FOLDER']
-    os.makedirs(upload_path, exist_ok=True)
-    file_path = os.path.join(upload_path, unique_name)
-    file.save(file_path)
-
-    url = f"/static/uploads/{unique_name}"
-    return success_response({'url': url}, status=201)
+    stored = file.stream.store()
+    result = 'deduplicated' if stored.deduplicated else 'stored'
+    UPLOADS.inc(result=result)
+    UPLOAD_BYTES.inc(stored.size, result=result)
+    data = {
+        'url': f"/static/uploads/{stored.filename}",
+        'sha256': stored.sha256,
+        'size': stored.size,
+        'content_type': stored.content_type,
+        'deduplicated': stored.deduplicated,
+    }
+    return success_response(data, status=HTTPStatus.OK if stored.deduplicated else HTTPStatus.CREATED)
 
 
 @uploads_bp.get('/image/<path:filename>')
 def get_image(filename: str):
-    upload_path = current_app.config['UPLOAD_FOLDER']
-    return send_from_directory(upload_path, filename)
+    """Imagem enviada, original ou redimensionada
+    ---
+    tags:
+      - Uploads
+    parameters:
+      - in: path
+        name: filename
+        type: string
+        required: true
+      - in: query
+        name: w
+        type: integer
+        description: Largura máxima; somente valores de IMAGE_SIZES
+      - in: query
+        name: h
+        type: integer
+        description: Altura máxima; somente valores de IMAGE_SIZES
+      - in: query
+        name: fit
+        type: string
+        enum: [inside, cover]
+        description: inside reduz para caber na caixa; cover preenche w x h recortando o centro
+      - in: query
+        name: fm
+        type: string
+        enum: [webp, jpeg, png]
+        description: Formato de saída (padrão é o formato original)
+      - in: query
+        name: q
+        type: integer
+        description: Qualidade; somente valores de IMAGE_QUALITIES
+    produces:
+      - image/webp
+      - image/jpeg
+      - image/png
+    responses:
+      200:
+        description: Arquivo de imagem; sem parâmetros devolve o original. Aceita Range e requisições condicionais
+      206:
+        description: Intervalo de bytes solicitado via Range
+      304:
+        description: Cópia do cliente ainda válida
+      404:
+        description: Imagem não encontrada
+      422:
+        description: Parâmetro fora da lista permitida ou arquivo não é imagem
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    config = current_app.config
+    variant = ImageService.parse_variant(filename, request.args)
+    if variant is None:
+        return send_stored_file(
+            config['UPLOAD_FOLDER'],
+            filename,
+            accel_prefix=config['UPLOAD_ACCEL_PREFIX'],
+            cache_policy=upload_cache_policy(filename),
+        )
+
+    rendered = ImageService.render(filename, variant)
+    return send_stored_file(
+        config['IMAGE_CACHE_FOLDER'],
+        rendered.filename,
+        accel_prefix=config['IMAGE_CACHE_ACCEL_PREFIX'],
+        mimetype=variant.mimetype,
+        etag=rendered.etag,
+        last_modified=rendered.last_modified,
+        cache_policy=upload_cache_policy(filename, default='image_variant'),
+    )
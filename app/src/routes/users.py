@@ -3,6 +3,7 @@ from flask import Blueprint, request
 from ..models.user import UserRole
 from ..schemas import UserSchema
 from ..services import UserService
+from ..utils.pagination import resolve_count_strategy
 from ..utils.permissions import require_roles
 from ..utils.responses import paginated_response, success_response
 
@@ -57,8 +58,21 @@ def list_users(current_user):  # noqa: ARG001
     page_size = min(int(request.args.get('page_size', 20)), 100)
     role = request.args.get('role')
     query = request.args.get('q')
-    items, total = UserService.list_users(page=page, page_size=page_size, role=role, query=query)
-    return paginated_response(users_schema.dump(items), total, page, page_size)
+    result = UserService.list_users(
+        page=page,
+        page_size=page_size,
+        role=role,
+        query=query,
+        count_strategy=resolve_count_strategy('users'),
+    )
+    return paginated_response(
+        users_schema.dump(result.items),
+        result.total,
+        page,
+        page_size,
+        total_strategy=result.total_strategy,
+        has_more=result.has_more,
+    )
 
 
 @users_bp.post('')
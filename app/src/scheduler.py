@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import argparse
+
+from .app_factory import create_app
+from .services.scheduler_service import SchedulerService
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Publica posts agendados quando a data de publicação chega.')
+    parser.add_argument('--once', action='store_true', help='Executa uma única rodada e encerra')
+    parser.add_argument('--interval', type=float, default=None, help='Segundos entre rodadas (SCHEDULER_INTERVAL)')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.once:
+            promoted = SchedulerService.promote_due()
+            print(f'{promoted} posts publicados.')
+            return
+        SchedulerService.run_forever(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,6 @@
 from .user_schema import UserSchema, UserCreateSchema, UserUpdateSchema
 from .category_schema import CategorySchema, CategoryCreateSchema, CategoryUpdateSchema
-from .post_schema import PostSchema, PostCreateSchema, PostUpdateSchema, PostListSchema
+from .post_schema import PostSchema, PostCreateSchema, PostUpdateSchema, PostListSchema, PublicPostSchema
 
 __all__ = [
     'UserSchema',
@@ -13,4 +13,5 @@ __all__ = [
     'PostCreateSchema',
     'PostUpdateSchema',
     'PostListSchema',
+    'PublicPostSchema',
 ]
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from marshmallow import Schema as _Schema
+
+from ..utils.request_timing import timed
+
+
+class Schema(_Schema):
+    """marshmallow Schema whose dumps count as serialization in request timings."""
+
+    def dump(self, obj, *, many=None):
+        with timed('serialize'):
+            return super().dump(obj, many=many)
+
+
+__all__ = ['Schema']
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from marshmallow import Schema, fields, validate
+from marshmallow import fields, validate
 
 from ..models.post import PostStatus
+from ..utils.text import make_excerpt
+from .base import Schema
 
 
 class PostAuthorSchema(Schema):
@@ -24,6 +26,8 @@ class PostSchema(Schema):
     excerpt = fields.Str(allow_none=True)
     cover_image_url = fields.Str(allow_none=True)
     content_markdown = fields.Str(required=True)
+    content_html = fields.Method('get_content_html', dump_only=True)
+    word_count = fields.Method('get_word_count', dump_only=True)
     status = fields.Str(required=True, validate=validate.OneOf([status.value for status in PostStatus]))
     category = fields.Nested(PostCategorySchema)
     author = fields.Nested(PostAuthorSchema)
@@ -31,9 +35,32 @@ class PostSchema(Schema):
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
 
+    def get_content_html(self, obj):
+        return obj.rendered().html
+
+    def get_word_count(self, obj):
+        return obj.rendered().word_count
+
+
+class PublicPostSchema(PostSchema):
+    """Public detail: readers get the rendered HTML, not the Markdown source."""
+
+    class Meta:
+        exclude = ('content_markdown',)
+
 
 class PostListSchema(PostSchema):
-    content_markdown = fields.Str(dump_only=True)
+    excerpt = fields.Method('get_excerpt')
+    # Stored value only: rendering here would load every deferred body.
+    word_count = fields.Int(dump_only=True, allow_none=True)
+
+    class Meta:
+        exclude = ('content_markdown', 'content_html')
+
+    def get_excerpt(self, obj):
+        if obj.excerpt:
+            return obj.excerpt
+        return make_excerpt(getattr(obj, 'content_preview', None))
 
 
 class PostCreateSchema(Schema):
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from marshmallow import Schema, fields, validate
+from marshmallow import fields, validate
 
 from ..models.user import UserRole
+from .base import Schema
 
 
 class UserSchema(Schema):
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+import argparse
+import random
+import re
+import time
+import unicodedata
+import uuid
 from datetime import timedelta
+from typing import Dict, List, Tuple
 
 from faker import Faker
+from sqlalchemy import insert
 
 from .app_factory import create_app
 from .extensions import db
 from .models import Category, Post, PostStatus, User, UserRole
 from .utils.clock import utcnow
+from .utils.markdown import RENDER_VERSION, render_markdown
+from .utils.passwords import password_hasher
 
 fake = Faker('pt_BR')
 
@@ -36,11 +46,15 @@ def seed_categories():
 
 
 def seed_users():
+    # Seed accounts share passwords; hash each distinct one once.
+    hashes: Dict[str, str] = {}
     for name, email, password, role, allowed_slugs in USERS:
         user = User.query.filter_by(email=email).first()
         if not user:
             user = User(name=name, email=email, role=role, allowed_category_slugs=allowed_slugs)
-            user.set_password(password)
+            if password not in hashes:
+                hashes[password] = password_hasher().hash(password)
+            user.password_hash = hashes[password]
             db.session.add(user)
     db.session.commit()
 
@@ -104,17 +118,203 @@ def seed_posts():
             status=sample['status'],
             published_at=sample['published_at'],
         )
+        post.apply_rendered(render_markdown(post.content_markdown))
         db.session.add(post)
 
     db.session.commit()
 
 
+def seed_all():
+    seed_categories()
+    seed_users()
+    seed_posts()
+
+
+# Password of every account created by seed_scale.
+SCALE_PASSWORD = '123456'
+# Markdown blocks generated (and rendered) once per run; posts combine them.
+_SCALE_BLOCKS = 400
+_SLUG_INVALID = re.compile(r'[^a-z0-9]+')
+# Faker has no Portuguese lorem provider; its sentences draw from this list.
+_SCALE_WORDS = (
+    'assembleia campeonato rodada clube atleta tribunal julgamento regulamento diretoria conselho tabela '
+    'calendário arbitragem estádio torcida inscrição transferência súmula recurso partida temporada comissão '
+    'edital sorteio premiação nota oficial reunião pauta votação presidente secretaria tesouraria balanço '
+    'contas relatório treinador elenco categoria base feminino amador profissional final semifinal '
+    'classificação rebaixamento acesso punição multa suspensão denúncia audiência sessão plenário decisão '
+    'prazo documento registro federação liga associados estatuto eleição mandato chapa candidatura ata '
+    'convocação comunicado boletim informativo resultado jogo gol vitória empate derrota pontos grupo fase '
+    'chave árbitro assistente relator procurador defesa parecer acórdão efeito suspensivo atleta inscrito '
+    'condição jogo documentação prazo regulamentar publicação portal semana mês ano próximo anterior geral '
+    'extraordinária ordinária aprovada aprovado rejeitado mantida mantido confirmada confirmado será foi '
+    'devem deverão conforme artigo parágrafo inciso norma vigente durante após antes entre sobre para com'
+).split()
+
+
+def parse_volume(value: str) -> int:
+    """``5000``, ``100k`` or ``1m``."""
+    value = value.strip().lower().replace('_', '')
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip('km')) * multiplier)
+
+
+def _slugify(text: str) -> str:
+    ascii_text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return _SLUG_INVALID.sub('-', ascii_text.lower()).strip('-')
+
+
+def seed_scale(
+    posts: int,
+    *,
+    users: int = 0,
+    categories: int = 0,
+    seed: int = 1,
+    batch_size: int = 2000,
+) -> Tuple[int, int, int]:
+    """Bulk-generate Portuguese categories, users and posts; identical for the same ``seed``.
+
+    Rows go in through Core ``insert`` executemany batches, bypassing the
+    ORM unit of work. Every account gets ``SCALE_PASSWORD`` under one hash,
+    computed once. Post bodies are assembled from a pool of Faker blocks
+    rendered once, so the stored HTML, text and word count need no
+    per-post markdown rendering. Slugs and e-mails carry the seed: a second
+    run with another seed adds to the data, and the same seed is refused.
+    """
+    users = users or max(10, posts // 200)
+    categories = categories or max(5, min(200, posts // 2000))
+    marker = f's{seed}'
+    if Category.query.filter(Category.slug.like(f'%-{marker}-0')).first():
+        raise SystemExit(f'Dados de escala com a semente {seed} já existem; use outra --seed')
+
+    fake = Faker('pt_BR')
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    now = utcnow()
+
+    def identifier() -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    category_rows = []
+    for index in range(categories):
+        name = f'{fake.catch_phrase()} {index}'[:110]
+        restricted = index % 10 == 9
+        category_rows.append(
+            {
+                'id': identifier(),
+                'name': name,
+                'slug': f'{_slugify(name)[:120]}-{marker}-{index}',
+                'description': fake.sentence(nb_words=12, ext_word_list=_SCALE_WORDS),
+                'is_active': index % 25 != 24,
+                'allowed_roles': ['tjd'] if restricted else None,
+                'created_at': now,
+                'updated_at': now,
+            }
+        )
+    category_ids = [row['id'] for row in category_rows]
+    category_slugs = [row['slug'] for row in category_rows]
+    db.session.execute(insert(Category.__table__), category_rows)
+
+    password_hash = password_hasher().hash(SCALE_PASSWORD)
+    roles = [UserRole.EDITOR] * 16 + [UserRole.SECRETARIA] * 2 + [UserRole.TJD, UserRole.ADMIN]
+    author_ids: List[str] = []
+    for start in range(0, users, batch_size):
+        rows = []
+        for index in range(start, min(users, start + batch_size)):
+            role = rng.choice(roles)
+            first, last = fake.first_name(), fake.last_name()
+            rows.append(
+                {
+                    'id': identifier(),
+                    'name': f'{first} {last}',
+                    'email': f'{_slugify(first)}.{_slugify(last)}.{marker}.{index}@exemplo.com.br',
+                    'password_hash': password_hash,
+                    'role': role,
+                    'is_active': rng.random() > 0.02,
+                    'allowed_category_slugs': (
+                        rng.sample(category_slugs, min(3, len(category_slugs))) if role == UserRole.EDITOR else None
+                    ),
+                    'created_at': now,
+                    'updated_at': now,
+                }
+            )
+        author_ids += [row['id'] for row in rows]
+        db.session.execute(insert(User.__table__), rows)
+    db.session.commit()
+
+    blocks = []
+    for index in range(_SCALE_BLOCKS):
+        markdown = (
+            f'## {fake.sentence(nb_words=5, ext_word_list=_SCALE_WORDS)[:-1]}'
+            if index % 6 == 0
+            else fake.paragraph(nb_sentences=rng.randint(3, 8), ext_word_list=_SCALE_WORDS)
+        )
+        rendered = render_markdown(markdown)
+        blocks.append((markdown, rendered.html, rendered.text, rendered.word_count))
+
+    statuses = [PostStatus.PUBLISHED] * 17 + [PostStatus.DRAFT] * 2 + [PostStatus.SCHEDULED]
+    post_table = Post.__table__
+    for start in range(0, posts, batch_size):
+        rows = []
+        for index in range(start, min(posts, start + batch_size)):
+            status = rng.choice(statuses)
+            if status == PostStatus.SCHEDULED:
+                created_at = now - timedelta(seconds=rng.randint(0, 30 * 86400))
+                published_at = now + timedelta(seconds=rng.randint(3600, 90 * 86400))
+            else:
+                created_at = now - timedelta(seconds=rng.randint(3600, 3 * 365 * 86400))
+                published_at = None
+                if status == PostStatus.PUBLISHED:
+                    published_at = min(now, created_at + timedelta(seconds=rng.randint(0, 86400)))
+            # Blocks are separate markdown paragraphs, so their renderings concatenate.
+            chosen = [rng.choice(blocks) for _ in range(rng.randint(2, 8))]
+            text = ' '.join(block[2] for block in chosen)
+            title = fake.sentence(nb_words=rng.randint(4, 10), ext_word_list=_SCALE_WORDS)[:-1]
+            rows.append(
+                {
+                    'id': identifier(),
+                    'slug': f'{_slugify(title)[:120]}-{marker}-{index}',
+                    'title': title,
+                    'excerpt': text[:200].rsplit(' ', 1)[0] if rng.random() < 0.6 else None,
+                    'cover_image_url': None,
+                    'content_markdown': '\n\n'.join(block[0] for block in chosen),
+                    'content_html': ''.join(block[1] for block in chosen),
+                    'content_text': text,
+                    'word_count': sum(block[3] for block in chosen),
+                    'content_render_version': RENDER_VERSION,
+                    'status': status,
+                    'category_id': rng.choice(category_ids),
+                    'author_id': rng.choice(author_ids),
+                    'published_at': published_at,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                }
+            )
+        db.session.execute(insert(post_table), rows)
+        db.session.commit()
+    return categories, users, posts
+
+
 def main():
+    parser = argparse.ArgumentParser(description='Popula o banco com dados básicos ou com volume sintético.')
+    parser.add_argument('--scale', type=parse_volume, help='Gera esta quantidade de posts (ex. 50000, 100k, 1m)')
+    parser.add_argument('--users', type=parse_volume, default=0, help='Usuários gerados (padrão: posts/200)')
+    parser.add_argument('--categories', type=parse_volume, default=0, help='Categorias geradas (padrão: posts/2000)')
+    parser.add_argument('--seed', type=int, default=1, help='Semente; a mesma semente gera os mesmos dados')
+    parser.add_argument('--batch-size', type=int, default=2000, help='Linhas por INSERT em lote')
+    args = parser.parse_args()
+
     app = create_app()
     with app.app_context():
-        seed_categories()
-        seed_users()
-        seed_posts()
+        seed_all()
+        if args.scale:
+            started = time.perf_counter()
+            categories, users, posts = seed_scale(
+                args.scale, users=args.users, categories=args.categories, seed=args.seed, batch_size=args.batch_size
+            )
+            print(
+                f'{categories} categorias, {users} usuários e {posts} posts gerados '
+                f'em {time.perf_counter() - started:.1f}s (senha {SCALE_PASSWORD})'
+            )
         print('Database seeded successfully.')
 
 
@@ -2,5 +2,8 @@ from .auth_service import AuthService
 from .user_service import UserService
 from .category_service import CategoryService
 from .post_service import PostService
+from .cache_service import CacheService
+from .search_service import SearchService
+from .image_service import ImageService
 
-__all__ = ['AuthService', 'UserService', 'CategoryService', 'PostService']
+__all__ = ['AuthService', 'UserService', 'CategoryService', 'PostService', 'CacheService', 'SearchService', 'ImageService']
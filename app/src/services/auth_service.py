@@ -1,23 +1,112 @@
 from __future__ import annotations
 
+import logging
+from dataclasses import dataclass
 from http import HTTPStatus
+from typing import Any, Dict, Optional, Tuple
 
+from flask import current_app
 from flask_jwt_extended import create_access_token, get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 
-from ..extensions import db
-from ..models.user import User
+from ..extensions import db, response_cache
+from ..models.user import User, UserRole
 from ..schemas import UserSchema
+from ..utils import generations
+from ..utils.db_routing import primary_reads
+from ..utils.metrics import LOGIN_ATTEMPTS
+from ..utils.passwords import password_hasher
 from ..utils.responses import ApiError
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Session-detached snapshot of the authenticated user.
+
+    Carries what permission checks and ``/auth/me`` need, so it can be cached
+    across requests without holding on to an ORM instance.
+    """
+
+    id: str
+    name: str
+    email: str
+    role: UserRole
+    is_active: bool
+    allowed_category_slugs: Tuple[str, ...]
+    created_at: Optional[str]
+    updated_at: Optional[str]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CurrentUser':
+        return cls(
+            id=data['id'],
+            name=data['name'],
+            email=data['email'],
+            role=UserRole(data['role']),
+            is_active=bool(data['is_active']),
+            allowed_category_slugs=tuple(data.get('allowed_category_slugs') or ()),
+            created_at=data.get('created_at'),
+            updated_at=data.get('updated_at'),
+        )
+
+    @property
+    def has_full_access(self) -> bool:
+        return self.role in {UserRole.ADMIN, UserRole.SECRETARIA}
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'role': self.role.value,
+            'is_active': self.is_active,
+            'allowed_category_slugs': list(self.allowed_category_slugs),
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+        }
+
 
 class AuthService:
     user_schema = UserSchema()
 
+    # Response cache namespace holding CurrentUser snapshots keyed by user id.
+    # Every token of a user shares the entry. Any committed write to users,
+    # from any process, bumps the database generation of the same name, which
+    # retires every snapshot; with a shared tier the per-id version does it.
+    # The generation is the per-process snapshot from generations.current(),
+    # so a hit runs no query and another worker's change applies within
+    # CACHE_GENERATIONS_TTL (this process's own changes apply at once).
+    IDENTITY = 'identity'
+
     @staticmethod
     def login(email: str, password: str):
-        user = User.query.filter_by(email=email.lower()).first()
-        if not user or not user.check_password(password):
-            raise ApiError('INVALID_CREDENTIALS', 'E-mail ou senha inválidos', status=HTTPStatus.UNAUTHORIZED)
+        try:
+            result = AuthService._login(email, password)
+        except ApiError as exc:
+            LOGIN_ATTEMPTS.inc(result=exc.code.lower())
+            raise
+        LOGIN_ATTEMPTS.inc(result='success')
+        return result
+
+    @staticmethod
+    def _login(email: str, password: str):
+        hasher = password_hasher()
+        # Every login takes a slot first, known e-mail or not: when they run
+        # out both get LOGIN_BUSY, so the answer never tells which exist.
+        with hasher.slot():
+            user = User.query.filter_by(email=email.lower()).first()
+            if not user:
+                # Same wait as a wrong password, without the hashing.
+                hasher.verify_unknown(password)
+                raise ApiError('INVALID_CREDENTIALS', 'E-mail ou senha inválidos', status=HTTPStatus.UNAUTHORIZED)
+            if not user.check_password(password):
+                raise ApiError('INVALID_CREDENTIALS', 'E-mail ou senha inválidos', status=HTTPStatus.UNAUTHORIZED)
+            if hasher.needs_rehash(user.password_hash):
+                AuthService._upgrade_password_hash(user, password)
         if not user.is_active:
             raise ApiError('USER_INACTIVE', 'Usuário inativo', status=HTTPStatus.FORBIDDEN)
 
@@ -26,17 +115,80 @@ class AuthService:
         return token, AuthService.user_schema.dump(user)
 
     @staticmethod
-    def get_current_user() -> User:
+    def _upgrade_password_hash(user: User, password: str) -> None:
+        """Store the password under the current policy; the login succeeds either way."""
+        hasher = password_hasher()
+        users = User.__table__
+        try:
+            password_hash = hasher.hash(password)
+        except ApiError:
+            logger.warning('Hash de senha do usuário %s não atualizado: pool de hash ocupado', user.id)
+            return
+        try:
+            db.session.execute(
+                users.update()
+                # A password changed meanwhile wins over the upgrade.
+                .where(users.c.id == user.id, users.c.password_hash == user.password_hash)
+                # Keep updated_at: it versions the author data in public payloads.
+                .values(password_hash=password_hash, updated_at=users.c.updated_at)
+            )
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            logger.warning('Falha ao atualizar o hash de senha do usuário %s', user.id, exc_info=True)
+            return
+        hasher.note_rehash()
+
+    @staticmethod
+    def get_current_user() -> CurrentUser:
         identity = get_jwt_identity()
         if not identity:
             raise ApiError('UNAUTHORIZED', 'Token inválido ou ausente', status=HTTPStatus.UNAUTHORIZED)
-        user = User.query.get(identity)
+        # get_or_set pins the generation before the load: a change committed
+        # while loading leaves the snapshot unreachable instead of cached.
+        snapshot = response_cache.get_or_set(AuthService.IDENTITY, identity, lambda: AuthService._load_user(identity))
+        current = CurrentUser.from_dict(snapshot)
+        if not current.is_active:
+            raise ApiError('USER_INACTIVE', 'Usuário inativo', status=HTTPStatus.FORBIDDEN)
+        return current
+
+    @staticmethod
+    def _load_user(identity: str) -> Tuple[dict, int]:
+        # From the primary: a replica may still hold the role or status the
+        # generation already retired.
+        with primary_reads():
+            user = db.session.get(User, identity, populate_existing=True)
         if not user:
             raise ApiError('UNAUTHORIZED', 'Usuário não encontrado para este token', status=HTTPStatus.UNAUTHORIZED)
-        if not user.is_active:
-            raise ApiError('USER_INACTIVE', 'Usuário inativo', status=HTTPStatus.FORBIDDEN)
-        return user
+        return user.to_dict(), current_app.config.get('IDENTITY_CACHE_TTL', 30)
+
+    @staticmethod
+    def forget_user(user_id: str) -> None:
+        """Drop the cached snapshot so role or status changes apply on the next request."""
+        response_cache.invalidate(AuthService.IDENTITY, user_id)
+
+    @staticmethod
+    def register_listeners() -> None:
+        if event.contains(Session, 'after_flush', _collect_changes):
+            return
+        event.listen(Session, 'after_flush', _collect_changes)
+        event.listen(Session, 'do_orm_execute', _collect_bulk_changes)
 
     @staticmethod
     def logout():
         db.session.commit()
+
+
+def _collect_changes(session: Session, flush_context) -> None:  # noqa: ARG001
+    if any(isinstance(obj, User) for obj in (*session.new, *session.deleted)) or any(
+        isinstance(obj, User) and session.is_modified(obj) for obj in session.dirty
+    ):
+        generations.bump(session, [AuthService.IDENTITY])
+
+
+def _collect_bulk_changes(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is User:
+        generations.bump(orm_execute_state.session, [AuthService.IDENTITY])
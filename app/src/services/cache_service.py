@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from itertools import chain
+from typing import Any, Callable, Hashable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..extensions import response_cache
+from ..models import Category, Post, PostStatus, User
+from ..utils import generations
+from ..utils.db_routing import pinned_replica, primary_reads
+from ..utils.pagination import COUNTS_GENERATION, count_cache
+
+_PENDING_KEY = 'public_cache_pending'
+_EVERYTHING = ('*', None)
+
+
+class CacheService:
+    """Public response caches, invalidated by every committed write that changes them.
+
+    Each write bumps the database generations of the caches it affects in its
+    own transaction (see ``utils.generations``), so entries held by other
+    gunicorn workers, and writes made by the scheduler process, are covered
+    without a shared tier. After the commit this process also drops its own
+    entries and, when configured, bumps the shared tier's versions.
+    """
+
+    FEED = 'public_feed'
+    POST = 'public_post'
+
+    @staticmethod
+    def cached(namespace: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached public representation or build and store it."""
+        if not response_cache.enabled:
+            return loader()
+        # The visible set only changes through writes (scheduled posts are
+        # promoted by SchedulerService), so the default TTL is a safety net.
+        return response_cache.get_or_set(namespace, key, lambda: (_load_consistent(namespace, loader), None))
+
+    @staticmethod
+    def invalidate_public(post_slugs: Tuple[str, ...] = (), *, everything: bool = False) -> None:
+        if everything:
+            response_cache.invalidate(CacheService.POST)
+        for slug in post_slugs:
+            response_cache.invalidate(CacheService.POST, slug)
+        response_cache.invalidate(CacheService.FEED)
+        count_cache.clear()
+
+    @staticmethod
+    def register_listeners() -> None:
+        if event.contains(Session, 'after_flush', _collect_changes):
+            return
+        event.listen(Session, 'after_flush', _collect_changes)
+        event.listen(Session, 'do_orm_execute', _collect_bulk_changes)
+        event.listen(Session, 'after_commit', _apply_pending)
+        event.listen(Session, 'after_rollback', _discard_pending)
+
+
+def _load_consistent(namespace: str, loader: Callable[[], Any]) -> Any:
+    # Every client gets the entry, so its rows must be at least as new as the
+    # versions get_or_set pinned before calling this. A replica in rotation
+    # (lag within DB_REPLICA_MAX_LAG) fills it once it has replayed the
+    # generation the primary holds now; otherwise the primary does.
+    with pinned_replica() as key:
+        if key is not None:
+            expected = {namespace: generations.refresh().get(namespace, 0)}
+            if generations.replayed(key, expected):
+                return loader()
+    with primary_reads():
+        return loader()
+
+
+def _pending(session: Session) -> Set[Tuple[str, Optional[str]]]:
+    return session.info.setdefault(_PENDING_KEY, set())
+
+
+def _attribute_values(obj: Any, name: str) -> list:
+    history = inspect(obj).attrs[name].history
+    return [value for value in chain(history.added or (), history.unchanged or (), history.deleted or ()) if value]
+
+
+def _attribute_changed(obj: Any, *names: str) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in names)
+
+
+def _collect_changes(session: Session, flush_context) -> None:  # noqa: ARG001
+    pending = _pending(session)
+    before = len(pending)
+    listed = False
+    deleted = list(session.deleted)
+    dirty = [obj for obj in session.dirty if session.is_modified(obj)]
+    for obj in chain(session.new, dirty, deleted):
+        listed = listed or isinstance(obj, (Post, Category, User))
+        if isinstance(obj, Post):
+            # Drafts and scheduled posts never reach public responses.
+            if PostStatus.PUBLISHED in _attribute_values(obj, 'status'):
+                pending.add((CacheService.FEED, None))
+                pending.update((CacheService.POST, slug) for slug in _attribute_values(obj, 'slug'))
+        elif isinstance(obj, Category):
+            pending.add(_EVERYTHING)
+        elif isinstance(obj, User) and (obj in deleted or _attribute_changed(obj, 'name', 'email')):
+            # Authors are embedded in public post payloads.
+            pending.add(_EVERYTHING)
+    stale = [COUNTS_GENERATION] if listed else []
+    if len(pending) > before:
+        stale += [CacheService.FEED, CacheService.POST]
+    generations.bump(session, stale)
+
+
+def _collect_bulk_changes(orm_execute_state) -> None:
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ not in {Post, Category, User}:
+        return
+    stale = [COUNTS_GENERATION]
+    if not orm_execute_state.is_insert:
+        _pending(orm_execute_state.session).add(_EVERYTHING)
+        stale += [CacheService.FEED, CacheService.POST]
+    generations.bump(orm_execute_state.session, stale)
+
+
+def _apply_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    slugs = tuple(sorted(key for namespace, key in pending if namespace == CacheService.POST and key))
+    CacheService.invalidate_public(slugs, everything=_EVERYTHING in pending)
+
+
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+__all__ = ['CacheService']
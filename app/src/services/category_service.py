@@ -1,12 +1,50 @@
 from __future__ import annotations
 
-from sqlalchemy import or_
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Optional
 
-from ..extensions import db
-from ..models import Category
+from flask import has_request_context, request
+from sqlalchemy import event, or_
+from sqlalchemy.orm import Session
+
+from ..extensions import db, response_cache
+from ..models import Category, UserRole
 from ..schemas import CategoryCreateSchema, CategorySchema, CategoryUpdateSchema
+from ..utils import generations
+from ..utils.db_routing import primary_reads, replica_reads
+from ..utils.pagination import COUNT_EXACT, Page, count_total, fetch_page
 from ..utils.responses import ApiError
 
+_PENDING_KEY = 'category_permissions_pending'
+# Memo on the request object: every lookup of a request shares one index.
+_REQUEST_KEY = 'category_permissions'
+
+# Categories a role may use even without being listed in ``allowed_roles``.
+ROLE_DEFAULT_SLUGS = {UserRole.TJD.value: ('tjd',)}
+
+
+@dataclass(frozen=True)
+class CategoryPermissions:
+    """Role to category grants, precomputed from ``Category.allowed_roles``."""
+
+    role_ids: Dict[str, FrozenSet[str]]
+    slug_ids: Dict[str, str]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CategoryPermissions':
+        return cls(
+            role_ids={role: frozenset(ids) for role, ids in data['roles'].items()},
+            slug_ids=dict(data['slugs']),
+        )
+
+    def role_allows(self, role: UserRole, category_id: str) -> bool:
+        return category_id in self.role_ids.get(role.value, frozenset())
+
+    def allowed_ids(self, role: UserRole, extra_slugs: Optional[Iterable[str]] = None) -> FrozenSet[str]:
+        """Categories granted to ``role`` plus the user's own ``allowed_category_slugs``."""
+        extra = {self.slug_ids[slug] for slug in extra_slugs or () if slug in self.slug_ids}
+        return self.role_ids.get(role.value, frozenset()) | extra
+
 
 class CategoryService:
     schema = CategorySchema()
@@ -14,8 +52,19 @@ class CategoryService:
     create_schema = CategoryCreateSchema()
     update_schema = CategoryUpdateSchema()
 
+    PERMISSIONS = 'category_permissions'
+    _permissions: Optional[tuple] = None
+
     @staticmethod
-    def list_categories(page: int = 1, page_size: int = 20, *, include_inactive: bool = True, query: str | None = None):
+    @replica_reads()
+    def list_categories(
+        page: int = 1,
+        page_size: int = 20,
+        *,
+        include_inactive: bool = True,
+        query: str | None = None,
+        count_strategy: str = COUNT_EXACT,
+    ) -> Page:
         q = Category.query
         if not include_inactive:
             q = q.filter(Category.is_active.is_(True))
@@ -23,14 +72,17 @@ class CategoryService:
             term = f"%{query.lower()}%"
             q = q.filter(or_(Category.name.ilike(term), Category.slug.ilike(term)))
 
-        total = q.count()
-        items = (
-            q.order_by(Category.name.asc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-            .all()
+        offset = (page - 1) * page_size
+        items, has_more = fetch_page(q.order_by(Category.name.asc()), page_size, offset=offset)
+        total, strategy = count_total(
+            q,
+            count_strategy,
+            cache_key=('categories', include_inactive, query),
+            offset=offset,
+            page_items=len(items),
+            has_more=has_more,
         )
-        return items, total
+        return Page(items=items, total=total, has_more=has_more, total_strategy=strategy)
 
     @staticmethod
     def create_category(data: dict) -> Category:
@@ -74,9 +126,93 @@ class CategoryService:
         db.session.delete(category)
         db.session.commit()
 
+    @staticmethod
+    def permissions() -> CategoryPermissions:
+        """Current role grants, loaded with one query and cached until a category write.
+
+        Category writes from any process bump the ``category_permissions``
+        database generation, which the cache checks against the per-process
+        generation snapshot, so a revoked grant outlives its commit by at most
+        ``CACHE_GENERATIONS_TTL`` in other processes and not at all in this
+        one. A request resolves the index once and reuses it for every lookup.
+        """
+        if has_request_context():
+            memo = getattr(request, _REQUEST_KEY, None)
+            if memo is not None:
+                return memo
+        raw = response_cache.get_or_set(
+            CategoryService.PERMISSIONS, 'index', lambda: (CategoryService._build_permissions(), None)
+        )
+        cached = CategoryService._permissions
+        # Local cache hits return the same dict, so the frozensets are reused.
+        if cached is not None and cached[0] is raw:
+            permissions = cached[1]
+        else:
+            permissions = CategoryPermissions.from_dict(raw)
+            CategoryService._permissions = (raw, permissions)
+        if has_request_context():
+            setattr(request, _REQUEST_KEY, permissions)
+        return permissions
+
+    @staticmethod
+    def invalidate_permissions() -> None:
+        response_cache.invalidate(CategoryService.PERMISSIONS)
+        CategoryService._permissions = None
+        if has_request_context():
+            setattr(request, _REQUEST_KEY, None)
+
+    @staticmethod
+    def register_listeners() -> None:
+        """Rebuild grants after any committed category write, service or not."""
+        if event.contains(Session, 'after_flush', _collect_changes):
+            return
+        event.listen(Session, 'after_flush', _collect_changes)
+        event.listen(Session, 'do_orm_execute', _collect_bulk_changes)
+        event.listen(Session, 'after_commit', _apply_pending)
+        event.listen(Session, 'after_rollback', _discard_pending)
+
+    @staticmethod
+    def _build_permissions() -> dict:
+        roles: Dict[str, list] = {role.value: [] for role in UserRole}
+        slugs: Dict[str, str] = {}
+        # From the primary: a lagging replica could hand back a revoked grant
+        # under the current generation.
+        with primary_reads():
+            rows = db.session.query(Category.id, Category.slug, Category.allowed_roles).all()
+        for category_id, slug, allowed_roles in rows:
+            slugs[slug] = category_id
+            for role in roles:
+                if role in (allowed_roles or ()) or slug in ROLE_DEFAULT_SLUGS.get(role, ()):
+                    roles[role].append(category_id)
+        return {'roles': roles, 'slugs': slugs}
+
     @staticmethod
     def _ensure_unique(name: str | None, slug: str | None) -> None:
         if name and Category.query.filter_by(name=name).first():
             raise ApiError('CATEGORY_EXISTS', 'Nome de categoria já cadastrado', status=409)
         if slug and Category.query.filter_by(slug=slug).first():
             raise ApiError('CATEGORY_EXISTS', 'Slug de categoria já cadastrado', status=409)
+
+
+def _collect_changes(session: Session, flush_context) -> None:  # noqa: ARG001
+    if any(isinstance(obj, Category) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_PENDING_KEY] = True
+        generations.bump(session, [CategoryService.PERMISSIONS])
+
+
+def _collect_bulk_changes(orm_execute_state) -> None:
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is Category:
+        orm_execute_state.session.info[_PENDING_KEY] = True
+        generations.bump(orm_execute_state.session, [CategoryService.PERMISSIONS])
+
+
+def _apply_pending(session: Session) -> None:
+    if session.info.pop(_PENDING_KEY, False):
+        CategoryService.invalidate_permissions()
+
+
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Dict, Mapping, Optional, Tuple
+
+from flask import current_app
+from PIL import Image
+from werkzeug.security import safe_join
+
+from ..utils.disk_cache import DiskLRUCache
+from ..utils.file_serving import is_hidden
+from ..utils.imaging import FIT_COVER, FIT_INSIDE, init_worker, render_variant
+from ..utils.responses import ApiError
+
+logger = logging.getLogger(__name__)
+
+# Output format per source extension when ``fm`` is omitted.
+_SOURCE_FORMATS = {'.jpg': 'jpeg', '.jpeg': 'jpeg', '.png': 'png', '.webp': 'webp'}
+_FORMATS = {'jpeg': ('.jpg', 'image/jpeg'), 'webp': ('.webp', 'image/webp'), 'png': ('.png', 'image/png')}
+
+
+@dataclass(frozen=True)
+class ImageVariant:
+    width: Optional[int]
+    height: Optional[int]
+    fit: str
+    format: str
+    quality: int
+
+    @property
+    def key(self) -> str:
+        return f'{self.width}x{self.height}:{self.fit}:{self.format}:q{self.quality}'
+
+    @property
+    def suffix(self) -> str:
+        return _FORMATS[self.format][0]
+
+    @property
+    def mimetype(self) -> str:
+        return _FORMATS[self.format][1]
+
+
+@dataclass(frozen=True)
+class RenderedImage:
+    path: str
+    # Relative to IMAGE_CACHE_FOLDER, for X-Accel-Redirect.
+    filename: str
+    # Derived from the source and the variant; the cached file's own mtime
+    # moves on every hit, so it cannot back the validators.
+    etag: str
+    last_modified: float
+
+
+class ImageService:
+    """Resized and converted variants of uploaded images.
+
+    Only whitelisted sizes, formats and qualities are accepted, so the number
+    of variants per upload is bounded. Variants are rendered in a process pool
+    (request threads only wait on it), written to a size-capped LRU disk cache
+    and served from there on later requests. Concurrent requests for the same
+    missing variant in one process share a single render.
+    """
+
+    FITS = (FIT_INSIDE, FIT_COVER)
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _executor_pid: Optional[int] = None
+    _lock = threading.Lock()
+    _inflight: Dict[str, Future] = {}
+
+    @staticmethod
+    def parse_variant(filename: str, args: Mapping[str, str]) -> Optional[ImageVariant]:
+        """Variant requested by the ``w``/``h``/``fit``/``fm``/``q`` query args; ``None`` for the original."""
+        if not any(args.get(name) for name in ('w', 'h', 'fit', 'fm', 'q')):
+            return None
+        config = current_app.config
+        width = ImageService._dimension(args.get('w'), 'w')
+        height = ImageService._dimension(args.get('h'), 'h')
+        if width is None and height is None:
+            raise ApiError('VALIDATION_ERROR', 'Informe a largura (w) ou a altura (h)', status=HTTPStatus.UNPROCESSABLE_ENTITY)
+
+        fit = (args.get('fit') or FIT_INSIDE).lower()
+        if fit not in ImageService.FITS:
+            raise ApiError('VALIDATION_ERROR', "fit deve ser 'inside' ou 'cover'", status=HTTPStatus.UNPROCESSABLE_ENTITY)
+        if fit == FIT_COVER and not (width and height):
+            raise ApiError('VALIDATION_ERROR', "fit=cover exige largura e altura", status=HTTPStatus.UNPROCESSABLE_ENTITY)
+
+        source_format = _SOURCE_FORMATS.get(os.path.splitext(filename)[1].lower(), 'jpeg')
+        fmt = (args.get('fm') or source_format).lower()
+        fmt = 'jpeg' if fmt == 'jpg' else fmt
+        if fmt not in config['IMAGE_FORMATS'] or fmt not in _FORMATS:
+            allowed = ', '.join(config['IMAGE_FORMATS'])
+            raise ApiError('VALIDATION_ERROR', f'Formato não permitido (use {allowed})', status=HTTPStatus.UNPROCESSABLE_ENTITY)
+
+        quality = config['IMAGE_DEFAULT_QUALITY']
+        if args.get('q'):
+            quality = ImageService._whitelisted(args['q'], config['IMAGE_QUALITIES'], 'q')
+        return ImageVariant(width=width, height=height, fit=fit, format=fmt, quality=quality)
+
+    @staticmethod
+    def render(filename: str, variant: ImageVariant) -> RenderedImage:
+        """The cached variant, rendered first when missing."""
+        # Hidden segments (the .incoming spool) hold unvalidated bytes.
+        if is_hidden(filename):
+            raise ApiError('NOT_FOUND', 'Imagem não encontrada', status=HTTPStatus.NOT_FOUND)
+        source = safe_join(current_app.config['UPLOAD_FOLDER'], filename)
+        if source is None or not os.path.isfile(source):
+            raise ApiError('NOT_FOUND', 'Imagem não encontrada', status=HTTPStatus.NOT_FOUND)
+
+        # Uploads get unique names, but keying on mtime and size also covers
+        # files replaced by hand.
+        stat = os.stat(source)
+        cache = ImageService.cache()
+        path = cache.path_for(f'{filename}:{stat.st_mtime_ns}:{stat.st_size}:{variant.key}', variant.suffix)
+        rendered = RenderedImage(
+            path=path,
+            filename=os.path.relpath(path, cache.root),
+            etag=os.path.basename(path),
+            last_modified=stat.st_mtime,
+        )
+        if cache.touch(path):
+            return rendered
+
+        with ImageService._lock:
+            future = ImageService._inflight.get(path)
+            owner = future is None
+            if owner:
+                future = ImageService._submit(source, path, variant)
+                ImageService._inflight[path] = future
+        try:
+            size = future.result(timeout=current_app.config['IMAGE_RENDER_TIMEOUT'])
+        except FutureTimeoutError as exc:
+            raise ApiError('IMAGE_TIMEOUT', 'A imagem demorou demais para ser processada', status=HTTPStatus.SERVICE_UNAVAILABLE) from exc
+        except BrokenProcessPool as exc:
+            ImageService.shutdown()
+            raise ApiError('IMAGE_UNAVAILABLE', 'Processamento de imagens indisponível', status=HTTPStatus.SERVICE_UNAVAILABLE) from exc
+        except (OSError, ValueError, Image.DecompressionBombError) as exc:
+            logger.warning('Falha ao processar %s: %s', filename, exc)
+            raise ApiError('INVALID_IMAGE', 'Arquivo não é uma imagem suportada', status=HTTPStatus.UNPROCESSABLE_ENTITY) from exc
+        finally:
+            if owner:
+                with ImageService._lock:
+                    ImageService._inflight.pop(path, None)
+        if owner:
+            cache.added(size, keep=path)
+        return rendered
+
+    @staticmethod
+    def cache() -> DiskLRUCache:
+        cache = current_app.extensions.get('image_cache')
+        if cache is None:
+            cache = DiskLRUCache(
+                current_app.config['IMAGE_CACHE_FOLDER'],
+                current_app.config['IMAGE_CACHE_MAX_MB'] * 1024 * 1024,
+            )
+            current_app.extensions['image_cache'] = cache
+        return cache
+
+    @staticmethod
+    def shutdown() -> None:
+        with ImageService._lock:
+            executor, ImageService._executor = ImageService._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _submit(source: str, path: str, variant: ImageVariant) -> Future:
+        # Called with _lock held. The pool is created lazily in each process,
+        # so gunicorn workers never inherit one from the preloading master.
+        if ImageService._executor is None or ImageService._executor_pid != os.getpid():
+            ImageService._executor = ProcessPoolExecutor(
+                max_workers=current_app.config['IMAGE_WORKERS'],
+                # spawn: forking a threaded server process can copy held locks.
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+                initargs=(current_app.config['IMAGE_MAX_PIXELS'],),
+            )
+            ImageService._executor_pid = os.getpid()
+        return ImageService._executor.submit(
+            render_variant,
+            source,
+            path,
+            width=variant.width,
+            height=variant.height,
+            fit=variant.fit,
+            fmt=variant.format,
+            quality=variant.quality,
+        )
+
+    @staticmethod
+    def _dimension(value: Optional[str], name: str) -> Optional[int]:
+        if not value:
+            return None
+        return ImageService._whitelisted(value, current_app.config['IMAGE_SIZES'], name)
+
+    @staticmethod
+    def _whitelisted(value: str, allowed: Tuple[int, ...], name: str) -> int:
+        try:
+            number = int(value)
+        except ValueError:
+            number = None
+        if number not in allowed:
+            options = ', '.join(str(item) for item in allowed)
+            raise ApiError('VALIDATION_ERROR', f'Valor de {name} não permitido (use {options})', status=HTTPStatus.UNPROCESSABLE_ENTITY)
+        return number
+
+
+__all__ = ['ImageService', 'ImageVariant', 'RenderedImage']
@@ -1,15 +1,36 @@
 from __future__ import annotations
 
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 
-from sqlalchemy import asc, desc, func, or_
+from flask import current_app
+from sqlalchemy import asc, bindparam, desc, false, func, inspect, or_
+from sqlalchemy.orm import contains_eager, defer, joinedload, with_expression
 
 from ..extensions import db
 from ..models import Category, Post, PostStatus, User, UserRole
 from ..schemas import PostCreateSchema, PostSchema, PostUpdateSchema
+from ..utils import generations
 from ..utils.clock import ensure_tz, has_passed, utcnow
+from ..utils.db_routing import replica_reads
+from ..utils.markdown import RENDER_VERSION, RenderedMarkdown, render_many, render_markdown
+from ..utils.pagination import (
+    COUNT_EXACT,
+    Page,
+    count_total,
+    decode_cursor,
+    encode_cursor,
+    fetch_page,
+    keyset_filter,
+)
 from ..utils.responses import ApiError
+from .cache_service import CacheService
+from .category_service import CategoryService
+from .search_service import SearchService
 
 
 class PostService:
@@ -17,7 +38,12 @@ class PostService:
     create_schema = PostCreateSchema()
     update_schema = PostUpdateSchema()
 
+    # Characters of content_text (content_markdown for rows not rendered yet)
+    # fetched by listings to build fallback excerpts.
+    LIST_PREVIEW_CHARS = 400
+
     @staticmethod
+    @replica_reads()
     def list_posts(
         *,
         requesting_user: User,
@@ -28,35 +54,41 @@ class PostService:
         author: Optional[str] = None,
         query: Optional[str] = None,
         order: Optional[str] = None,
-    ) -> Tuple[list[Post], int]:
+        cursor: Optional[str] = None,
+        count_strategy: str = COUNT_EXACT,
+    ) -> Page:
         q = Post.query.join(Category).join(User)
 
         if status:
             q = q.filter(Post.status == PostStatus(status))
         if category:
-            q = q.filter(or_(Category.slug == category, Category.id == category))
+            # Resolve the category as a constant so posts can be read through
+            # ix_posts_category_created_at instead of joining back from categories.
+            category_id = (
+                db.session.query(Category.id)
+                .filter(or_(Category.slug == category, Category.id == category))
+                .limit(1)
+                .scalar_subquery()
+            )
+            q = q.filter(Post.category_id == category_id)
         if author:
             q = q.filter(Post.author_id == author)
+        relevance = None
         if query:
-            term = f"%{query.lower()}%"
-            q = q.filter(
-                or_(
-                    func.lower(Post.title).ilike(term),
-                    func.lower(Post.excerpt).ilike(term),
-                    func.lower(Category.name).ilike(term),
-                    func.lower(Category.slug).ilike(term),
-                )
-            )
+            q, relevance = SearchService.apply(q, query, include_categories=True)
 
         q = PostService._apply_user_scope(q, requesting_user)
 
-        sort_field, sort_dir = PostService._parse_order(order)
-        sort_column = getattr(Post, sort_field)
-        q = q.order_by(asc(sort_column) if sort_dir == 'asc' else desc(sort_column))
-
-        total = q.count()
-        items = q.offset((page - 1) * page_size).limit(page_size).all()
-        return items, total
+        return PostService._paginate(
+            q,
+            order,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            count_strategy=count_strategy,
+            cache_key=('posts', requesting_user.id, status, category, author, query),
+            relevance=relevance,
+        )
 
     @staticmethod
     def create_post(data: dict, requesting_user: User) -> Post:
@@ -74,12 +106,11 @@ class PostService:
 
         status = PostStatus(payload.get('status', PostStatus.DRAFT.value))
         published_at = ensure_tz(payload.get('published_at')) if payload.get('published_at') else None
+        status, published_at = PostService._normalize_publication(status, published_at)
         if status == PostStatus.SCHEDULED and not published_at:
             raise ApiError('VALIDATION_ERROR', 'Informe a data de publicação para agendamento', status=422)
         if status == PostStatus.SCHEDULED and published_at and has_passed(published_at):
             raise ApiError('VALIDATION_ERROR', 'Data de agendamento deve ser futura', status=422)
-        if status == PostStatus.PUBLISHED and not published_at:
-            published_at = utcnow()
 
         post = Post(
             slug=payload['slug'],
@@ -92,13 +123,18 @@ class PostService:
             author_id=author.id,
             published_at=published_at,
         )
+        post.apply_rendered(render_markdown(post.content_markdown))
         db.session.add(post)
         db.session.commit()
-        return post
+        return PostService._reload(post)
 
     @staticmethod
     def get_post(identifier: str, *, requesting_user: Optional[User] = None) -> Post:
-        post = Post.query.filter((Post.id == identifier) | (Post.slug == identifier)).first()
+        post = (
+            Post.query.options(joinedload(Post.category), joinedload(Post.author))
+            .filter((Post.id == identifier) | (Post.slug == identifier))
+            .first()
+        )
         if not post:
             raise ApiError('NOT_FOUND', 'Post não encontrado', status=404)
         if requesting_user:
@@ -119,8 +155,11 @@ class PostService:
             post.excerpt = payload['excerpt']
         if 'cover_image_url' in payload:
             post.cover_image_url = payload['cover_image_url']
-        if 'content_markdown' in payload:
+        if 'content_markdown' in payload and (
+            payload['content_markdown'] != post.content_markdown or post.content_html is None
+        ):
             post.content_markdown = payload['content_markdown']
+            post.apply_rendered(render_markdown(post.content_markdown))
         if 'category_id' in payload:
             new_category = Category.query.get(payload['category_id'])
             if not new_category:
@@ -140,16 +179,15 @@ class PostService:
 
         PostService._assert_user_can_write(requesting_user, post.category, author_id=post.author_id)
 
+        post.status, post.published_at = PostService._normalize_publication(post.status, post.published_at)
         if post.status == PostStatus.SCHEDULED:
             if not post.published_at:
                 raise ApiError('VALIDATION_ERROR', 'Informe a data de agendamento', status=422)
             if has_passed(post.published_at):
                 raise ApiError('VALIDATION_ERROR', 'Data de agendamento deve ser futura', status=422)
-        if post.status == PostStatus.PUBLISHED and not post.published_at:
-            post.published_at = utcnow()
 
         db.session.commit()
-        return post
+        return PostService._reload(post)
 
     @staticmethod
     def delete_post(post_id: str, requesting_user: User) -> None:
@@ -163,10 +201,11 @@ class PostService:
         post = PostService.get_post(post_id)
         PostService._assert_user_can_write(requesting_user, post.category, author_id=post.author_id)
         post.status = PostStatus.PUBLISHED
-        if not post.published_at:
+        # Publishing is immediate; a pending schedule date is replaced by now.
+        if not post.published_at or not has_passed(post.published_at):
             post.published_at = utcnow()
         db.session.commit()
-        return post
+        return PostService._reload(post)
 
     @staticmethod
     def schedule_post(post_id: str, requesting_user: User, published_at: datetime) -> Post:
@@ -180,39 +219,49 @@ class PostService:
         post.status = PostStatus.SCHEDULED
         post.published_at = published_at
         db.session.commit()
-        return post
+        return PostService._reload(post)
 
     @staticmethod
+    @replica_reads()
     def list_public_posts(
         page: int = 1,
         page_size: int = 12,
         category_slug: Optional[str] = None,
         query: Optional[str] = None,
         order: Optional[str] = None,
-    ) -> Tuple[list[Post], int]:
+        cursor: Optional[str] = None,
+        count_strategy: str = COUNT_EXACT,
+    ) -> Page:
+        # PUBLISHED implies a past published_at: future dates are stored as
+        # SCHEDULED and promoted by SchedulerService when they come due.
         q = Post.query.join(Category).join(User).filter(Post.status == PostStatus.PUBLISHED)
-        q = q.filter(or_(Post.published_at.is_(None), Post.published_at <= utcnow()))
         q = q.filter(Category.is_active.is_(True))
         if category_slug:
             q = q.filter(Category.slug == category_slug)
+        relevance = None
         if query:
-            term = f"%{query.lower()}%"
-            q = q.filter(or_(func.lower(Post.title).ilike(term), func.lower(Post.excerpt).ilike(term)))
-
-        sort_field, sort_dir = PostService._parse_order(order or 'published_at:desc')
-        sort_column = getattr(Post, sort_field)
-        q = q.order_by(asc(sort_column) if sort_dir == 'asc' else desc(sort_column))
-
-        total = q.count()
-        items = q.offset((page - 1) * page_size).limit(page_size).all()
-        return items, total
+            q, relevance = SearchService.apply(q, query)
+
+        return PostService._paginate(
+            q,
+            order or 'published_at:desc',
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            count_strategy=count_strategy,
+            cache_key=('public_feed', category_slug, query),
+            relevance=relevance,
+            default_order='published_at:desc',
+        )
 
     @staticmethod
+    @replica_reads()
     def get_public_post(slug: str) -> Post:
         post = (
             Post.query.join(Category)
+            .join(User)
+            .options(contains_eager(Post.category), contains_eager(Post.author))
             .filter(Post.slug == slug, Post.status == PostStatus.PUBLISHED)
-            .filter(or_(Post.published_at.is_(None), Post.published_at <= utcnow()))
             .filter(Category.is_active.is_(True))
             .first()
         )
@@ -220,6 +269,104 @@ class PostService:
             raise ApiError('NOT_FOUND', 'Post não encontrado ou indisponível', status=404)
         return post
 
+    @staticmethod
+    def rerender_content(*, everything: bool = False, batch_size: int = 200, workers: Optional[int] = None) -> int:
+        """Store the rendering of posts whose HTML is missing or from an older RENDER_VERSION.
+
+        Batches are read in primary-key order and rendered in a process pool,
+        with at most two batches per worker in flight. A row edited while its
+        batch was rendering keeps the rendering PostService stored on write.
+        Returns the number of rows updated.
+        """
+        workers = workers or os.cpu_count() or 1
+        pool: Optional[ProcessPoolExecutor] = None
+        pending: deque = deque()
+        updated = 0
+        try:
+            for batch in PostService._markdown_batches(everything, batch_size):
+                if workers == 1:
+                    updated += PostService._store_rendered(render_many(batch), dict(batch))
+                    continue
+                if pool is None:
+                    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+                pending.append((pool.submit(render_many, batch), dict(batch)))
+                if len(pending) >= workers * 2:
+                    future, sources = pending.popleft()
+                    updated += PostService._store_rendered(future.result(), sources)
+            while pending:
+                future, sources = pending.popleft()
+                updated += PostService._store_rendered(future.result(), sources)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        if updated:
+            CacheService.invalidate_public(everything=True)
+        return updated
+
+    @staticmethod
+    def _markdown_batches(everything: bool, batch_size: int) -> Iterator[List[Tuple[str, str]]]:
+        query = db.session.query(Post.id, Post.content_markdown)
+        if not everything:
+            query = query.filter(
+                or_(
+                    Post.content_html.is_(None),
+                    Post.content_render_version.is_(None),
+                    Post.content_render_version != RENDER_VERSION,
+                )
+            )
+        last_id = ''
+        while True:
+            rows = query.filter(Post.id > last_id).order_by(Post.id).limit(batch_size).all()
+            if not rows:
+                return
+            last_id = rows[-1].id
+            yield [(row.id, row.content_markdown) for row in rows]
+
+    @staticmethod
+    def _store_rendered(results: List[Tuple[str, RenderedMarkdown]], sources: dict) -> int:
+        posts = Post.__table__
+        statement = (
+            posts.update()
+            .where(posts.c.id == bindparam('b_id'), posts.c.content_markdown == bindparam('b_source'))
+            .values(
+                content_html=bindparam('b_html'),
+                content_text=bindparam('b_text'),
+                word_count=bindparam('b_words'),
+                content_render_version=bindparam('b_version'),
+            )
+        )
+        params = [
+            {
+                'b_id': identifier,
+                'b_source': sources[identifier],
+                'b_html': rendered.html,
+                'b_text': rendered.text,
+                'b_words': rendered.word_count,
+                'b_version': rendered.version,
+            }
+            for identifier, rendered in results
+        ]
+        result = db.session.execute(statement, params)
+        if result.rowcount:
+            # Core updates skip the ORM listeners: retire the public entries of
+            # every process in the same transaction.
+            generations.bump(db.session, [CacheService.FEED, CacheService.POST])
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def _reload(post: Post) -> Post:
+        # Commits expire the instance; reload it with its relationships in a
+        # single statement instead of one refresh per attribute access. The id
+        # comes from the identity key so reading it does not trigger a refresh.
+        post_id = inspect(post).identity[0]
+        return (
+            Post.query.options(joinedload(Post.category), joinedload(Post.author))
+            .populate_existing()
+            .filter(Post.id == post_id)
+            .one()
+        )
+
     @staticmethod
     def _ensure_unique_slug(slug: str) -> None:
         if Post.query.filter_by(slug=slug).first():
@@ -234,25 +381,112 @@ class PostService:
             field, direction = order.split(':', 1)
         else:
             field, direction = order, 'desc'
-        field = field if field in {'created_at', 'published_at', 'title'} else 'created_at'
+        field = field if field in {'created_at', 'published_at', 'title', 'relevance'} else 'created_at'
         direction = direction if direction in {'asc', 'desc'} else 'desc'
         return field, direction
 
+    @staticmethod
+    def _max_relevance_offset() -> int:
+        return current_app.config.get('SEARCH_MAX_OFFSET', 1000)
+
+    @staticmethod
+    def _relevance_offset(value) -> int:
+        # bool is an int subclass; JSON cursors never carry one legitimately.
+        if type(value) is not int or not 0 <= value <= PostService._max_relevance_offset():
+            raise ApiError('INVALID_CURSOR', 'Cursor de paginação inválido', status=400)
+        return value
+
+    @staticmethod
+    def _paginate(
+        query,
+        order: Optional[str],
+        *,
+        page: int,
+        page_size: int,
+        cursor: Optional[str],
+        count_strategy: str,
+        cache_key: tuple,
+        relevance=None,
+        default_order: Optional[str] = None,
+    ) -> Page:
+        sort_field, sort_dir = PostService._parse_order(order)
+        if sort_field == 'relevance' and relevance is None:
+            sort_field, sort_dir = PostService._parse_order(default_order)
+        order_key = f'{sort_field}:{sort_dir}'
+        sort_column = relevance if sort_field == 'relevance' else getattr(Post, sort_field)
+        direction = asc if sort_dir == 'asc' else desc
+        page_query = (
+            query.options(*PostService._list_options())
+            .order_by(direction(sort_column), direction(Post.id))
+            # Categories and users are tiny; left to the cost model MySQL may
+            # start from them and filesort. Reading posts first walks the
+            # composite index in sort order and stops at the page limit.
+            .prefix_with('/*+ JOIN_PREFIX(posts) */', dialect='mysql')
+        )
+
+        offset: Optional[int] = (page - 1) * page_size
+        if cursor:
+            value, identifier = decode_cursor(cursor, order_key)
+            if sort_field == 'relevance':
+                # Scores are not stable keys; relevance cursors carry the offset.
+                offset = PostService._relevance_offset(value)
+            else:
+                page_query = page_query.filter(keyset_filter(sort_column, Post.id, sort_dir, value, identifier))
+                offset = None
+
+        items, has_more = fetch_page(page_query, page_size, offset=offset or 0)
+        next_cursor = None
+        if has_more and items:
+            last = items[-1]
+            if sort_field == 'relevance':
+                next_offset = (offset or 0) + len(items)
+                if next_offset <= PostService._max_relevance_offset():
+                    next_cursor = encode_cursor(order_key, next_offset, last.id)
+            else:
+                next_cursor = encode_cursor(order_key, getattr(last, sort_field), last.id)
+
+        total, strategy = count_total(
+            query,
+            count_strategy,
+            cache_key=cache_key,
+            offset=offset,
+            page_items=len(items),
+            has_more=has_more,
+        )
+        return Page(items=items, total=total, has_more=has_more, next_cursor=next_cursor, total_strategy=strategy)
+
+    @staticmethod
+    def _list_options() -> list:
+        return [
+            contains_eager(Post.category),
+            contains_eager(Post.author),
+            defer(Post.content_markdown),
+            defer(Post.content_html),
+            defer(Post.content_text),
+            with_expression(
+                Post.content_preview,
+                func.substr(func.coalesce(Post.content_text, Post.content_markdown), 1, PostService.LIST_PREVIEW_CHARS),
+            ),
+        ]
+
+    @staticmethod
+    def _normalize_publication(status: PostStatus, published_at: Optional[datetime]) -> Tuple[PostStatus, Optional[datetime]]:
+        """Keep PUBLISHED rows in the past: a future date turns the post into SCHEDULED."""
+        if status == PostStatus.PUBLISHED:
+            if not published_at:
+                return status, utcnow()
+            if not has_passed(published_at):
+                return PostStatus.SCHEDULED, published_at
+        return status, published_at
+
     @staticmethod
     def _apply_user_scope(query, user: User):
         if user.role in {UserRole.ADMIN, UserRole.SECRETARIA, UserRole.EDITOR}:
             return query
-        allowed_slugs = set(user.allowed_category_slugs or [])
-        if user.role == UserRole.TJD:
-            allowed_slugs.add('tjd')
-            extra = [c.slug for c in Category.query.all() if c.allowed_roles and 'tjd' in c.allowed_roles]
-            allowed_slugs.update(extra)
-        if user.role == UserRole.EDITOR:
-            extra = [c.slug for c in Category.query.all() if c.allowed_roles and 'editor' in c.allowed_roles]
-            allowed_slugs.update(extra)
-        if not allowed_slugs:
-            allowed_slugs = {'__empty__'}
-        return query.filter(Category.slug.in_(allowed_slugs))
+        allowed_ids = CategoryService.permissions().allowed_ids(user.role, user.allowed_category_slugs)
+        if not allowed_ids:
+            return query.filter(false())
+        return query.filter(Post.category_id.in_(sorted(allowed_ids)))
 
     @staticmethod
     def _assert_user_can_read(user: User, post: Post) -> None:
@@ -269,7 +503,7 @@ class PostService:
             return
 
         if user.role == UserRole.TJD:
-            if category.slug != 'tjd' and (not category.allowed_roles or 'tjd' not in category.allowed_roles):
+            if not CategoryService.permissions().role_allows(user.role, category.id):
                 raise ApiError('FORBIDDEN', 'Usuário TJD não pode publicar nesta categoria', status=403)
             if author_id != user.id:
                 raise ApiError('FORBIDDEN', 'Usuário não pode atribuir outro autor', status=403)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+
+from flask import Flask, current_app
+from sqlalchemy.orm import load_only
+
+from ..extensions import db
+from ..models import Post, PostStatus
+from ..utils.clock import utcnow
+from ..utils.locks import advisory_lock
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerService:
+    """Promotes SCHEDULED posts to PUBLISHED once their ``published_at`` passes.
+
+    Public queries only look at ``status = PUBLISHED``, so this is the single
+    place where scheduled posts become visible. Promotion goes through the ORM:
+    the session listeners of CacheService and SearchService see each status
+    change and invalidate the affected public entries on commit.
+    """
+
+    LOCK_NAME = 'laf_portal:publish_scheduled'
+
+    @staticmethod
+    def promote_due(*, batch_size: Optional[int] = None, now: Optional[datetime] = None) -> int:
+        """Publish every due post in batches; returns how many were promoted.
+
+        Replicas share a MySQL advisory lock, so only one promotes at a time and
+        the others return 0 immediately.
+        """
+        batch_size = batch_size or current_app.config.get('SCHEDULER_BATCH_SIZE', 100)
+        promoted = 0
+        with advisory_lock(SchedulerService.LOCK_NAME) as acquired:
+            if not acquired:
+                return 0
+            while True:
+                posts = (
+                    Post.query.options(load_only(Post.id, Post.slug, Post.status, Post.published_at))
+                    .filter(Post.status == PostStatus.SCHEDULED, Post.published_at <= (now or utcnow()))
+                    .order_by(Post.published_at.asc(), Post.id.asc())
+                    .limit(batch_size)
+                    .all()
+                )
+                if not posts:
+                    break
+                for post in posts:
+                    post.status = PostStatus.PUBLISHED
+                db.session.commit()
+                promoted += len(posts)
+                if len(posts) < batch_size:
+                    break
+        if promoted:
+            logger.info('Publicados %s posts agendados', promoted)
+        return promoted
+
+    @staticmethod
+    def run_forever(interval: Optional[float] = None, stop: Optional[threading.Event] = None) -> None:
+        """Promote due posts every ``interval`` seconds until ``stop`` is set."""
+        interval = interval or current_app.config.get('SCHEDULER_INTERVAL', 30)
+        stop = stop or threading.Event()
+        while True:
+            try:
+                SchedulerService.promote_due()
+            except Exception:  # noqa: BLE001
+                logger.exception('Falha ao publicar posts agendados')
+                db.session.rollback()
+            finally:
+                db.session.remove()
+            if stop.wait(interval):
+                return
+
+    @staticmethod
+    def start_background(app: Flask) -> threading.Event:
+        """Run the loop in a daemon thread of this process; set the returned event to stop it."""
+        stop = threading.Event()
+
+        def _target() -> None:
+            with app.app_context():
+                SchedulerService.run_forever(stop=stop)
+
+        threading.Thread(target=_target, name='post-scheduler', daemon=True).start()
+        return stop
+
+
+__all__ = ['SchedulerService']
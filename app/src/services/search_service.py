@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import re
+import threading
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import case, event, false, func, inspect, literal, or_
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models import Category, Post
+from ..utils import generations
+from ..utils.db_routing import primary_reads
+from ..utils.search_index import InvertedIndex
+
+logger = logging.getLogger(__name__)
+
+_INDEXED_FIELDS = ('title', 'excerpt', 'content_markdown')
+# session.info: index changes of the transaction, applied after it commits.
+_PENDING_KEY = 'search_index_pending'
+
+
+class SearchService:
+    """Post search: MySQL FULLTEXT when available, in-memory inverted index otherwise.
+
+    The FULLTEXT index (migration 0002) covers title, excerpt and
+    content_markdown; accent tolerance comes from the accent-insensitive
+    utf8mb4 collation of those columns. The Python fallback folds accents
+    itself. Every write to the indexed fields bumps the ``search_index``
+    database generation; commits made by this process update its index in
+    place, and a generation moved by another process starts a rebuild on a
+    background thread while searches keep using the previous index. Only
+    the first search of a process builds the index in the request.
+    """
+
+    # Shortest word InnoDB indexes by default (innodb_ft_min_token_size).
+    MIN_TOKEN_SIZE = 3
+    GENERATION = 'search_index'
+
+    index = InvertedIndex()
+    _index_generation: Optional[int] = None
+    _index_lock = threading.Lock()
+    _build_lock = threading.Lock()
+    _rebuild: Optional[threading.Thread] = None
+    # Local commits made while a rebuild runs (see _pending for their shape).
+    _replay: Optional[List[dict]] = None
+
+    @staticmethod
+    def apply(query, term: str, *, include_categories: bool = False) -> Tuple[object, object]:
+        """Filter ``query`` by ``term``; returns ``(query, relevance_expression)``."""
+        fulltext = SearchService.uses_fulltext()
+        if fulltext:
+            condition, relevance = SearchService._fulltext(term)
+        else:
+            condition, relevance = SearchService._inverted_index(term)
+        if include_categories:
+            category_ids = SearchService._matching_categories(term)
+            if category_ids:
+                if fulltext:
+                    # MySQL reads the FULLTEXT index only for a MATCH ANDed into
+                    # the WHERE clause; ORed with the category test it evaluates
+                    # MATCH on every post. Resolve the best hits through the index
+                    # first, as the Python backend does.
+                    condition = Post.id.in_(SearchService._best_matches(query, condition, relevance))
+                condition = or_(condition, Post.category_id.in_(category_ids))
+        return query.filter(condition), relevance
+
+    @staticmethod
+    def _matching_categories(term: str) -> List[str]:
+        like = f"%{term.lower()}%"
+        rows = db.session.query(Category.id).filter(
+            or_(func.lower(Category.name).ilike(like), func.lower(Category.slug).ilike(like))
+        )
+        return [category_id for category_id, in rows]
+
+    @staticmethod
+    def _best_matches(query, condition, relevance) -> List[str]:
+        limit = current_app.config.get('SEARCH_MAX_CANDIDATES', 500)
+        rows = query.with_entities(Post.id).filter(condition).order_by(relevance.desc()).limit(limit)
+        return [post_id for post_id, in rows]
+
+    @staticmethod
+    def uses_fulltext() -> bool:
+        backend = current_app.config.get('SEARCH_BACKEND', 'auto')
+        if backend == 'python':
+            return False
+        return db.session.get_bind().dialect.name == 'mysql'
+
+    @staticmethod
+    def _fulltext(term: str):
+        tokens = [token for token in re.findall(r'\w+', term.lower()) if len(token) >= SearchService.MIN_TOKEN_SIZE]
+        if not tokens:
+            # Too short for the FULLTEXT index: keep the previous substring match.
+            like = f"%{term.lower()}%"
+            return or_(func.lower(Post.title).ilike(like), func.lower(Post.excerpt).ilike(like)), literal(0)
+        boolean_query = ' '.join(f'+{token}*' for token in tokens)
+        relevance = match(Post.title, Post.excerpt, Post.content_markdown, against=boolean_query).in_boolean_mode()
+        return relevance, relevance
+
+    @staticmethod
+    def _inverted_index(term: str):
+        scores = SearchService._current_index().search(term)
+        if not scores:
+            return false(), literal(0)
+        limit = current_app.config.get('SEARCH_MAX_CANDIDATES', 500)
+        if len(scores) > limit:
+            # The IN list and the CASE ordering grow with every candidate; keep the best.
+            scores = dict(heapq.nlargest(limit, scores.items(), key=itemgetter(1)))
+        return Post.id.in_(list(scores)), case(scores, value=Post.id, else_=0)
+
+    @staticmethod
+    def _current_index() -> InvertedIndex:
+        if SearchService._index_generation is None:
+            with SearchService._build_lock:
+                if SearchService._index_generation is None:
+                    SearchService.rebuild_index()
+        elif SearchService._index_generation < generations.current().get(SearchService.GENERATION, 0):
+            SearchService._schedule_rebuild()
+        return SearchService.index
+
+    @staticmethod
+    def _schedule_rebuild() -> None:
+        with SearchService._index_lock:
+            if SearchService._rebuild is not None and SearchService._rebuild.is_alive():
+                return
+            SearchService._replay = []
+            app = current_app._get_current_object()
+            SearchService._rebuild = threading.Thread(
+                target=_rebuild_in_background, args=(app,), name='search-index', daemon=True
+            )
+            SearchService._rebuild.start()
+
+    @staticmethod
+    def rebuild_index() -> None:
+        """Build a fresh index from the primary and swap it in."""
+        index = InvertedIndex()
+        # From the primary: the index is tagged with the primary's generation,
+        # read in the same transaction as the rows.
+        with primary_reads():
+            generation = generations.value_in(db.session, SearchService.GENERATION)
+            rows = db.session.query(Post.id, Post.title, Post.excerpt, Post.content_markdown)
+            for post_id, title, excerpt, content in rows.yield_per(500):
+                index.add(post_id, {'title': title, 'excerpt': excerpt, 'content': content})
+        with SearchService._index_lock:
+            # Local commits the rows above may predate.
+            for pending in SearchService._replay or ():
+                if pending['generation'] > generation:
+                    _apply_to(index, pending['changes'])
+                    if pending['complete'] and pending['since'] == generation:
+                        generation = pending['generation']
+            SearchService._replay = None
+            SearchService.index = index
+            SearchService._index_generation = generation
+
+    @staticmethod
+    def index_version() -> Optional[int]:
+        """Generation the in-memory index reflects; ``None`` with FULLTEXT or before the first build."""
+        return None if SearchService.uses_fulltext() else SearchService._index_generation
+
+    @staticmethod
+    def wait_for_rebuild(timeout: Optional[float] = None) -> None:
+        rebuild = SearchService._rebuild
+        if rebuild is not None:
+            rebuild.join(timeout)
+
+    @staticmethod
+    def _apply_committed(pending: dict) -> None:
+        with SearchService._index_lock:
+            if SearchService._index_generation is None:
+                # Not built yet; the first search reads these rows.
+                return
+            _apply_to(SearchService.index, pending['changes'])
+            if SearchService._replay is not None:
+                SearchService._replay.append(pending)
+            if pending['complete'] and SearchService._index_generation == pending['since']:
+                # No other process moved the generation in between: the index
+                # is current without a rebuild.
+                SearchService._index_generation = pending['generation']
+
+    @staticmethod
+    def register_listeners() -> None:
+        if event.contains(Session, 'after_flush', _collect_changes):
+            return
+        event.listen(Session, 'after_flush', _collect_changes)
+        event.listen(Session, 'do_orm_execute', _collect_bulk_changes)
+        event.listen(Session, 'after_commit', _apply_pending)
+        event.listen(Session, 'after_rollback', _discard_pending)
+
+
+def _rebuild_in_background(app) -> None:
+    try:
+        with app.app_context():
+            SearchService.rebuild_index()
+    except Exception:  # noqa: BLE001 - the next search schedules another attempt
+        logger.exception('Falha ao reconstruir o índice de busca')
+        with SearchService._index_lock:
+            SearchService._replay = None
+
+
+def _apply_to(index: InvertedIndex, changes: Dict[str, Optional[dict]]) -> None:
+    for post_id, fields in changes.items():
+        if fields is None:
+            index.remove(post_id)
+        else:
+            index.add(post_id, fields)
+
+
+def _pending(session: Session, generation: int, *, complete: bool) -> dict:
+    pending = session.info.setdefault(_PENDING_KEY, {'since': generation - 1, 'changes': {}, 'complete': True})
+    pending['generation'] = generation
+    pending['complete'] = pending['complete'] and complete
+    return pending
+
+
+def _collect_changes(session: Session, flush_context) -> None:  # noqa: ARG001
+    changes: Dict[str, Optional[dict]] = {}
+    for post in (*session.new, *session.dirty):
+        if isinstance(post, Post) and (
+            post in session.new
+            or any(inspect(post).attrs[name].history.has_changes() for name in _INDEXED_FIELDS)
+        ):
+            changes[post.id] = {'title': post.title, 'excerpt': post.excerpt, 'content': post.content_markdown}
+    for post in session.deleted:
+        if isinstance(post, Post):
+            changes[post.id] = None
+    if not changes or SearchService.uses_fulltext():
+        return
+    generations.bump(session, [SearchService.GENERATION])
+    generation = generations.value_in(session, SearchService.GENERATION)
+    _pending(session, generation, complete=True)['changes'].update(changes)
+
+
+def _collect_bulk_changes(orm_execute_state) -> None:
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is Post and not SearchService.uses_fulltext():
+        session = orm_execute_state.session
+        generations.bump(session, [SearchService.GENERATION])
+        # Rows unknown: the generation is left behind and a rebuild follows.
+        _pending(session, generations.value_in(session, SearchService.GENERATION), complete=False)
+
+
+def _apply_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        SearchService._apply_committed(pending)
+
+
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+__all__ = ['SearchService']
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-from math import ceil
-
 from sqlalchemy import or_
 
 from ..extensions import db
 from ..models import User, UserRole
 from ..schemas import UserCreateSchema, UserSchema, UserUpdateSchema
+from ..utils.pagination import COUNT_EXACT, Page, count_total, fetch_page
 from ..utils.responses import ApiError
+from .auth_service import AuthService
 
 
 class UserService:
@@ -17,7 +17,14 @@ class UserService:
     user_update_schema = UserUpdateSchema()
 
     @staticmethod
-    def list_users(page: int = 1, page_size: int = 20, role: str | None = None, query: str | None = None):
+    def list_users(
+        page: int = 1,
+        page_size: int = 20,
+        role: str | None = None,
+        query: str | None = None,
+        *,
+        count_strategy: str = COUNT_EXACT,
+    ) -> Page:
         q = User.query
         if role:
             q = q.filter(User.role == UserRole(role))
@@ -25,9 +32,17 @@ class UserService:
             term = f"%{query.lower()}%"
             q = q.filter(or_(User.email.ilike(term), User.name.ilike(term)))
 
-        total = q.count()
-        items = q.order_by(User.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
-        return items, total
+        offset = (page - 1) * page_size
+        items, has_more = fetch_page(q.order_by(User.created_at.desc()), page_size, offset=offset)
+        total, strategy = count_total(
+            q,
+            count_strategy,
+            cache_key=('users', role, query),
+            offset=offset,
+            page_items=len(items),
+            has_more=has_more,
+        )
+        return Page(items=items, total=total, has_more=has_more, total_strategy=strategy)
 
     @staticmethod
     def create_user(data: dict) -> User:
@@ -82,6 +97,7 @@ class UserService:
             user.allowed_category_slugs = UserService._sanitize_allowed_categories(user.role, payload['allowed_category_slugs'])
 
         db.session.commit()
+        AuthService.forget_user(user.id)
         return user
 
     @staticmethod
@@ -89,6 +105,7 @@ class UserService:
         user = UserService.get_user(user_id)
         db.session.delete(user)
         db.session.commit()
+        AuthService.forget_user(user_id)
 
     @staticmethod
     def _sanitize_allowed_categories(role: UserRole, slugs):
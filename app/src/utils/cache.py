@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU map whose entries carry their own expiry."""
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MemorySharedStore:
+    """Process-local stand-in for the subset of the Redis API the cache uses."""
+
+    def __init__(self) -> None:
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+        self._lock = threading.Lock()
+
+    def _alive(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._alive(key)
+
+    def mget(self, keys: Iterable[str]) -> List[Optional[bytes]]:
+        with self._lock:
+            return [self._alive(key) for key in keys]
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        with self._lock:
+            self._data[key] = (time.time() + ex if ex else None, value)
+        return True
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            current = int(self._alive(key) or 0) + 1
+            self._data[key] = (None, str(current).encode('utf-8'))
+            return current
+
+
+def _connect_shared(url: str):
+    if url.startswith('memory://'):
+        return MemorySharedStore()
+    try:
+        import redis  # type: ignore
+    except ImportError:  # pragma: no cover - optional dependency
+        logger.warning('CACHE_SHARED_URL configurado mas o pacote redis não está instalado; usando apenas cache local')
+        return None
+    return redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+
+
+def _hit_stats(hits: int, misses: int) -> Dict[str, Any]:
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_rate': round(hits / total, 4) if total else 0.0}
+
+
+class ResponseCache:
+    """Two-tier cache (in-process LRU + optional shared store) with namespaces.
+
+    Invalidation never scans keys: ``invalidate(namespace)`` bumps a namespace
+    generation and ``invalidate(namespace, key)`` bumps a per-key version.
+    With a shared tier both are stored there, so every process observes them
+    on its next lookup. Without one, entries are also tagged with the
+    database generation of their namespace (``generations``, see
+    ``utils.generations``); writers bump it in their transaction, which is
+    what reaches the other processes.
+    """
+
+    def __init__(self, app=None) -> None:
+        self.enabled = False
+        self.default_ttl = 60
+        self.prefix = 'laf:cache:'
+        self._local = LRUCache()
+        self._shared = None
+        self.generations: Optional[Callable[[], Dict[str, int]]] = None
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._namespace_stats: Dict[str, List[int]] = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, *, generations: Optional[Callable[[], Dict[str, int]]] = None) -> None:
+        self.enabled = app.config.get('CACHE_ENABLED', True)
+        self.default_ttl = app.config.get('CACHE_DEFAULT_TTL', 60)
+        self.prefix = app.config.get('CACHE_KEY_PREFIX', self.prefix)
+        self._local = LRUCache(app.config.get('CACHE_LOCAL_MAX_ENTRIES', 512))
+        shared_url = app.config.get('CACHE_SHARED_URL')
+        self._shared = _connect_shared(shared_url) if shared_url else None
+        self.generations = generations
+        app.extensions['response_cache'] = self
+
+    @property
+    def shared(self) -> bool:
+        return self._shared is not None
+
+    # -- lookups -----------------------------------------------------------------
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        if not self.enabled:
+            return None
+        return self._lookup(namespace, key, self._versions(namespace, key))
+
+    def set(self, namespace: str, key: Hashable, value: Any, *, ttl: Optional[float] = None) -> Any:
+        if not self.enabled:
+            return value
+        return self._store(namespace, key, self._versions(namespace, key), value, ttl)
+
+    def get_or_set(self, namespace: str, key: Hashable, loader: Callable[[], Tuple[Any, Optional[float]]]) -> Any:
+        """Return the cached value or store ``loader()``'s ``(value, ttl)``.
+
+        The value is stored under the versions read before loading, so an
+        invalidation that lands while ``loader`` runs makes it unreachable
+        instead of caching data older than the invalidation.
+        """
+        if not self.enabled:
+            return loader()[0]
+        versions = self._versions(namespace, key)
+        value = self._lookup(namespace, key, versions)
+        if value is None:
+            value, ttl = loader()
+            self._store(namespace, key, versions, value, ttl)
+        return value
+
+    def _lookup(self, namespace: str, key: Hashable, versions: tuple) -> Any:
+        entry = self._local.get((namespace, key))
+        value = entry[1] if entry is not None and entry[0] == versions else None
+        if value is None and self._shared is not None:
+            raw = self._shared_call('get', self._shared_key(namespace, versions, key))
+            if raw is not None:
+                value = json.loads(raw)
+                # The shared tier owns the expiry; keep the local copy briefly.
+                self._local.set((namespace, key), (versions, value), time.time() + min(self.default_ttl, 5))
+        with self._lock:
+            counters = self._namespace_stats.setdefault(namespace, [0, 0])
+            if value is None:
+                self.misses += 1
+                counters[1] += 1
+            else:
+                self.hits += 1
+                counters[0] += 1
+        CACHE_REQUESTS.inc(namespace=namespace, result='miss' if value is None else 'hit')
+        return value
+
+    def _store(self, namespace: str, key: Hashable, versions: tuple, value: Any, ttl: Optional[float]) -> Any:
+        ttl = self.default_ttl if ttl is None else min(ttl, self.default_ttl)
+        if ttl <= 0:
+            return value
+        self._local.set((namespace, key), (versions, value), time.time() + ttl)
+        if self._shared is not None:
+            payload = json.dumps(value, default=str, separators=(',', ':'))
+            self._shared_call('set', self._shared_key(namespace, versions, key), payload, ex=max(int(ttl), 1))
+        return value
+
+    # -- invalidation ------------------------------------------------------------
+
+    def invalidate(self, namespace: str, key: Optional[Hashable] = None) -> None:
+        if key is None:
+            with self._lock:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            if self._shared is not None:
+                self._shared_call('incr', f'{self.prefix}gen:{namespace}')
+            return
+        self._local.pop((namespace, key))
+        if self._shared is not None:
+            self._shared_call('incr', f'{self.prefix}ver:{namespace}:{self._digest(key)}')
+
+    def clear(self) -> None:
+        """Drop this process's entries and counters; the shared tier is left alone."""
+        self._local.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self._namespace_stats.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            namespaces = {namespace: tuple(counters) for namespace, counters in self._namespace_stats.items()}
+        return {
+            'enabled': self.enabled,
+            'shared': self._shared is not None,
+            'entries': len(self._local),
+            **_hit_stats(hits, misses),
+            'namespaces': {namespace: _hit_stats(*counters) for namespace, counters in sorted(namespaces.items())},
+        }
+
+    # -- internals ---------------------------------------------------------------
+
+    @staticmethod
+    def _digest(key: Hashable) -> str:
+        return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+    def _shared_key(self, namespace: str, versions: tuple, key: Hashable) -> str:
+        version = '.'.join(str(part) for part in versions)
+        return f'{self.prefix}{namespace}:{version}:{self._digest(key)}'
+
+    def _versions(self, namespace: str, key: Hashable) -> tuple:
+        with self._lock:
+            local_generation = self._generations.get(namespace, 0)
+        raw = None
+        if self._shared is not None:
+            raw = self._shared_call(
+                'mget', [f'{self.prefix}gen:{namespace}', f'{self.prefix}ver:{namespace}:{self._digest(key)}']
+            )
+        if raw is None:
+            # No shared tier, or it is unreachable: the database generation
+            # still retires entries written by other processes.
+            stored = self.generations().get(namespace, 0) if self.generations is not None else 0
+            return (local_generation, 'db', stored)
+        generation, version = raw
+        return (int(generation or 0), int(version or 0))
+
+    def _shared_call(self, method: str, *args, **kwargs):
+        try:
+            return getattr(self._shared, method)(*args, **kwargs)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning('Falha no cache compartilhado (%s): %s', method, exc)
+            return None
+
+
+__all__ = ['LRUCache', 'MemorySharedStore', 'ResponseCache']
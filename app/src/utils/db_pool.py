@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from flask import Flask
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from ..extensions import db
+
+_COUNTERS = ('connects', 'checkouts', 'checkins', 'invalidations', 'soft_invalidations', 'timeouts')
+
+
+class PoolStats:
+    """Thread-safe counters for one engine's connection pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(_COUNTERS, 0)
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._overflow_peak = 0
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def observe_checkout(self, seconds: float, overflow: int) -> None:
+        with self._lock:
+            self._wait_total += seconds
+            self._wait_max = max(self._wait_max, seconds)
+            self._overflow_peak = max(self._overflow_peak, overflow)
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        with self._lock:
+            data: Dict[str, Any] = dict(self._counters)
+            if isinstance(pool, InstrumentedQueuePool):
+                checkouts = data['checkouts']
+                data['checkout_wait_ms'] = {
+                    'avg': round(self._wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                    'max': round(self._wait_max * 1000, 3),
+                    'total': round(self._wait_total * 1000, 3),
+                }
+                data['overflow_peak'] = self._overflow_peak
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+            )
+        return data
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout, including waits for a free slot."""
+
+    stats: Optional[PoolStats] = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.incr('timeouts')
+            raise
+        if self.stats is not None:
+            self.stats.observe_checkout(time.perf_counter() - started, self.overflow())
+        return connection
+
+    def recreate(self) -> 'InstrumentedQueuePool':
+        # engine.dispose() swaps in a fresh pool; keep counting into the same stats.
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def configure_pool(app: Flask) -> None:
+    """Use the instrumented pool for server databases; call before ``db.init_app``."""
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+    if uri.startswith('sqlite'):
+        return
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    options.setdefault('poolclass', InstrumentedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def register_pool_listeners(app: Flask) -> None:
+    """Attach counters to every engine of ``app``; call after ``db.init_app``."""
+    with app.app_context():
+        for engine in db.engines.values():
+            stats = PoolStats()
+            engine.pool_stats = stats
+            if isinstance(engine.pool, InstrumentedQueuePool):
+                engine.pool.stats = stats
+            _listen(engine, stats)
+
+
+def _listen(engine, stats: PoolStats) -> None:
+    for event_name, counter in (
+        ('connect', 'connects'),
+        ('checkout', 'checkouts'),
+        ('checkin', 'checkins'),
+        ('invalidate', 'invalidations'),
+        ('soft_invalidate', 'soft_invalidations'),
+    ):
+        event.listen(engine, event_name, lambda *args, _counter=counter: stats.incr(_counter))
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-engine pool counters and gauges for the current app."""
+    result = {}
+    for name, engine in db.engines.items():
+        stats = getattr(engine, 'pool_stats', None)
+        if stats is not None:
+            result[name or 'default'] = stats.snapshot(engine.pool)
+    return result
+
+
+__all__ = ['InstrumentedQueuePool', 'PoolStats', 'configure_pool', 'pool_stats', 'register_pool_listeners']
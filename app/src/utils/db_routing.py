@@ -0,0 +1,376 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from flask import Flask, current_app, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc, text
+from sqlalchemy.sql import Select
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND_PREFIX = 'replica_'
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+# Set on responses to requests that committed a write; holds the epoch second
+# until which that client's reads stay on the primary.
+STICKY_COOKIE = 'laf_primary_reads'
+
+# session.info flags: reads may use a replica / this transaction has written.
+_READS_KEY = 'replica_reads'
+_WROTE_KEY = 'replica_wrote'
+# session.info: bind key every plain SELECT of a ``pinned_replica`` block uses.
+_PINNED_KEY = 'replica_pinned'
+# Request attribute: the request committed a write.
+_REQUEST_WROTE = 'replica_wrote'
+
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs to a healthy replica when reads are routed.
+
+    Flushes, DML, ``FOR UPDATE`` selects, raw SQL and every statement after the
+    transaction has written stay on the primary bind.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            key = self.info.get(_PINNED_KEY)
+            if key is None:
+                router = current_app.extensions.get('replica_router')
+                key = router.choose() if router is not None else None
+            if key is not None:
+                return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause) -> bool:
+        return (
+            bool(self.info.get(_READS_KEY) or self.info.get(_PINNED_KEY))
+            and not self._flushing
+            and not self.info.get(_WROTE_KEY)
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        )
+
+
+@dataclass
+class ReplicaState:
+    # Out of rotation until the first probe has run.
+    healthy: bool = False
+    lag: Optional[float] = None
+    error: Optional[str] = None
+    checked_at: float = float('-inf')
+
+
+class ReplicaRouter:
+    """Health, lag and write-stickiness bookkeeping for the replica binds of one app.
+
+    A background thread per process probes each replica every
+    ``DB_REPLICA_CHECK_INTERVAL`` seconds (``SELECT 1`` plus the replication
+    delay on MySQL), so routing a statement only reads the last verdict; one
+    that fails or lags more than ``DB_REPLICA_MAX_LAG`` seconds is skipped
+    until a later probe passes. Read-your-writes is scoped to the writer: a
+    request that commits a write sets the ``STICKY_COOKIE`` cookie, and that
+    client's reads stay on the primary for ``DB_REPLICA_STICKY_SECONDS``,
+    never less than the tolerated lag. Caches shared with other clients never
+    depend on it: they fill from a ``pinned_replica`` that has replayed the
+    entry's generation, or under ``primary_reads``.
+    """
+
+    def __init__(self, app: Flask, bind_keys: List[str]) -> None:
+        self.app = app
+        self.bind_keys = sorted(bind_keys)
+        self.max_lag = float(app.config.get('DB_REPLICA_MAX_LAG', 5))
+        self.check_interval = float(app.config.get('DB_REPLICA_CHECK_INTERVAL', 10))
+        self.sticky_seconds = max(float(app.config.get('DB_REPLICA_STICKY_SECONDS', 10)), self.max_lag)
+        self._states: Dict[str, ReplicaState] = {key: ReplicaState() for key in self.bind_keys}
+        self._lock = threading.Lock()
+        self._turn = 0
+        # Writes committed outside requests (CLI, scheduler) by this process.
+        self._last_write = float('-inf')
+        self._prober_pid: Optional[int] = None
+
+    # -- routing -------------------------------------------------------------------
+
+    def choose(self) -> Optional[str]:
+        """Bind key of the next healthy replica (round robin), or ``None`` for the primary."""
+        self.start_probing()
+        healthy = [key for key in self.bind_keys if self._states[key].healthy]
+        if not healthy:
+            return None
+        with self._lock:
+            self._turn += 1
+            return healthy[self._turn % len(healthy)]
+
+    def reads_allowed(self) -> bool:
+        """Outside requests: whether this process committed a write too recently."""
+        return not self.recent_write()
+
+    def start_probing(self) -> None:
+        """Start this process's probe thread; threads do not survive gunicorn's fork."""
+        pid = os.getpid()
+        if self._prober_pid == pid:
+            return
+        with self._lock:
+            if self._prober_pid == pid:
+                return
+            self._prober_pid = pid
+        threading.Thread(target=self._probe_forever, name='replica-probe', daemon=True).start()
+
+    def _probe_forever(self) -> None:
+        while True:
+            try:
+                with self.app.app_context():
+                    for key in self.bind_keys:
+                        self.check(key)
+            except Exception:  # noqa: BLE001 - keep probing; routing falls back to the primary meanwhile
+                logger.exception('Falha ao verificar as réplicas')
+            time.sleep(max(self.check_interval, 1.0))
+
+    def check(self, key: str) -> ReplicaState:
+        engine = current_app.extensions['sqlalchemy'].engines[key]
+        try:
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+                lag = _replication_lag(connection)
+        except exc.SQLAlchemyError as error:
+            logger.warning('Réplica %s indisponível: %s', key, error)
+            return self._record(key, healthy=False, lag=None, error=type(error).__name__)
+        healthy = lag is not None and lag <= self.max_lag
+        if not healthy:
+            logger.warning('Réplica %s atrasada (%s s); leituras vão para o primário', key, lag)
+        return self._record(key, healthy=healthy, lag=lag, error=None)
+
+    def mark_failed(self, key: str, error: str) -> None:
+        """Take ``key`` out of rotation until the next probe passes."""
+        self._record(key, healthy=False, lag=None, error=error)
+
+    def _record(self, key: str, *, healthy: bool, lag: Optional[float], error: Optional[str]) -> ReplicaState:
+        state = self._states[key]
+        with self._lock:
+            state.healthy, state.lag, state.error = healthy, lag, error
+            state.checked_at = time.monotonic()
+        return state
+
+    # -- read-your-writes ----------------------------------------------------------
+
+    def note_write(self) -> None:
+        self._last_write = time.monotonic()
+
+    def recent_write(self) -> bool:
+        return time.monotonic() - self._last_write < self.sticky_seconds
+
+    def sticky_request(self) -> bool:
+        """Whether the current request's client committed a write in the sticky window."""
+        try:
+            until = float(request.cookies.get(STICKY_COOKIE, ''))
+        except ValueError:
+            return False
+        # The cookie's own expiry is up to the client; bound it here as well.
+        return time.time() < until <= time.time() + self.sticky_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            replicas = {
+                key: {
+                    'healthy': state.healthy,
+                    'lag_seconds': state.lag,
+                    'error': state.error,
+                    'checked_seconds_ago': round(now - state.checked_at, 3) if state.checked_at > 0 else None,
+                }
+                for key, state in self._states.items()
+            }
+        return {
+            'replicas': replicas,
+            'max_lag_seconds': self.max_lag,
+            'sticky_seconds': self.sticky_seconds,
+        }
+
+
+def _replication_lag(connection) -> Optional[float]:
+    """Seconds the replica is behind its source; ``None`` when replication is stopped."""
+    if connection.dialect.name != 'mysql':
+        return 0.0
+    for statement, column in (
+        ('SHOW REPLICA STATUS', 'Seconds_Behind_Source'),
+        ('SHOW SLAVE STATUS', 'Seconds_Behind_Master'),
+    ):
+        try:
+            row = connection.execute(text(statement)).mappings().first()
+        except exc.DBAPIError:
+            # Older server, or the user lacks REPLICATION CLIENT.
+            continue
+        if row is None:
+            # Not replicating: a standalone copy kept in sync by other means.
+            return 0.0
+        value = row.get(column)
+        return None if value is None else float(value)
+    return 0.0
+
+
+def init_replica_routing(app: Flask) -> None:
+    """Route safe-method requests to the ``replica_*`` binds; call after ``db.init_app``."""
+    bind_keys = [key for key in app.config.get('SQLALCHEMY_BINDS') or {} if key.startswith(REPLICA_BIND_PREFIX)]
+    if not bind_keys:
+        return
+    router = ReplicaRouter(app, bind_keys)
+    app.extensions['replica_router'] = router
+    app.before_request(_route_request)
+    app.after_request(_set_sticky_cookie)
+    app.teardown_request(_end_request)
+
+    with app.app_context():
+        engines = app.extensions['sqlalchemy'].engines
+        for key in bind_keys:
+            event.listen(engines[key], 'handle_error', _replica_error_listener(router, key))
+
+    if not event.contains(Session, 'after_flush', _note_flush):
+        event.listen(Session, 'after_flush', _note_flush)
+        event.listen(Session, 'do_orm_execute', _note_bulk_write)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+
+
+@contextmanager
+def replica_reads() -> Iterator[None]:
+    """Let the block's SELECTs use a replica; also usable as a decorator.
+
+    Inside a request the request hook has already decided (write methods and
+    clients holding the sticky cookie read from the primary), so this only
+    matters for code running outside requests, such as CLI commands.
+    """
+    router = current_app.extensions.get('replica_router')
+    session = current_app.extensions['sqlalchemy'].session
+    if router is None or _READS_KEY in session.info or has_request_context():
+        yield
+        return
+    session.info[_READS_KEY] = router.reads_allowed()
+    try:
+        yield
+    finally:
+        session.info.pop(_READS_KEY, None)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """Keep the block's SELECTs on the primary, even in a request routed to a replica.
+
+    For data that fills caches shared by every client: a lagging replica would
+    store rows older than the generation the entry carries, and the writer's
+    sticky cookie does not protect other clients.
+    """
+    session = current_app.extensions['sqlalchemy'].session
+    previous = session.info.get(_READS_KEY)
+    pinned = session.info.pop(_PINNED_KEY, None)
+    session.info[_READS_KEY] = False
+    try:
+        yield
+    finally:
+        if previous is None:
+            session.info.pop(_READS_KEY, None)
+        else:
+            session.info[_READS_KEY] = previous
+        if pinned is not None:
+            session.info[_PINNED_KEY] = pinned
+
+
+@contextmanager
+def pinned_replica() -> Iterator[Optional[str]]:
+    """Send the block's plain SELECTs to one replica in rotation, whatever the request routing.
+
+    Yields that replica's bind key, or ``None`` when no replica is healthy or
+    the transaction has already written; the block then reads as usual. The
+    replica may lag up to ``DB_REPLICA_MAX_LAG``, so callers check it has
+    what they need first (see ``generations.replayed``).
+    """
+    router = current_app.extensions.get('replica_router')
+    session = current_app.extensions['sqlalchemy'].session
+    key = None
+    if router is not None and _PINNED_KEY not in session.info and not session.info.get(_WROTE_KEY):
+        key = router.choose()
+    if key is None:
+        yield None
+        return
+    session.info[_PINNED_KEY] = key
+    try:
+        yield key
+    finally:
+        session.info.pop(_PINNED_KEY, None)
+
+
+def replica_stats() -> Optional[Dict[str, Any]]:
+    router = current_app.extensions.get('replica_router')
+    return router.stats() if router is not None else None
+
+
+def _route_request() -> None:
+    router = current_app.extensions['replica_router']
+    session = current_app.extensions['sqlalchemy'].session
+    session.info[_READS_KEY] = request.method in SAFE_METHODS and not router.sticky_request()
+
+
+def _set_sticky_cookie(response):
+    if getattr(request, _REQUEST_WROTE, False):
+        router = current_app.extensions['replica_router']
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(int(time.time() + router.sticky_seconds)),
+            max_age=int(router.sticky_seconds),
+            secure=request.is_secure,
+            httponly=True,
+            samesite='Lax',
+        )
+    return response
+
+
+def _end_request(_exc=None) -> None:
+    current_app.extensions['sqlalchemy'].session.info.pop(_READS_KEY, None)
+
+
+def _replica_error_listener(router: ReplicaRouter, key: str):
+    def _on_error(context) -> None:
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+            router.mark_failed(key, type(context.original_exception).__name__)
+
+    return _on_error
+
+
+def _note_flush(session, flush_context) -> None:  # noqa: ARG001
+    session.info[_WROTE_KEY] = True
+
+
+def _note_bulk_write(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_WROTE_KEY] = True
+
+
+def _after_commit(session) -> None:
+    if not (session.info.pop(_WROTE_KEY, False) and has_app_context()):
+        return
+    if has_request_context():
+        setattr(request, _REQUEST_WROTE, True)
+        return
+    router = current_app.extensions.get('replica_router')
+    if router is not None:
+        router.note_write()
+
+
+def _after_rollback(session) -> None:
+    session.info.pop(_WROTE_KEY, None)
+
+
+__all__ = [
+    'STICKY_COOKIE',
+    'ReplicaRouter',
+    'RoutingSession',
+    'init_replica_routing',
+    'pinned_replica',
+    'primary_reads',
+    'replica_reads',
+    'replica_stats',
+]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TMP_SUFFIX = '.tmp'
+
+
+class DiskLRUCache:
+    """Derived files under ``root`` capped at ``max_bytes``, least recently used evicted first.
+
+    A file's mtime records its last use: hits touch it and eviction deletes the
+    oldest files until the folder is back under ``low_water`` of the cap. The
+    byte total is kept in memory and recounted on every eviction, so processes
+    sharing the folder converge on its real size. Writers must create files
+    atomically (write ``<path>.<id>.tmp`` and rename), so readers never see a
+    partial file.
+    """
+
+    # Leftovers of renders that died mid-write are swept after this long.
+    STALE_TMP_SECONDS = 3600
+
+    def __init__(self, root: str, max_bytes: int, *, low_water: float = 0.9) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path_for(self, key: str, suffix: str = '') -> str:
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.root, digest[:2], f'{digest}{suffix}')
+
+    def touch(self, path: str) -> bool:
+        """Mark ``path`` as used; ``False`` when it is not cached."""
+        try:
+            os.utime(path, None)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def added(self, size: int, *, keep: Optional[str] = None) -> None:
+        """Account for a file just stored, evicting old ones when over the cap.
+
+        ``keep`` (the new file) survives the eviction even if it alone exceeds
+        the cap, so the request that rendered it can still serve it.
+        """
+        with self._lock:
+            if self._total is not None:
+                self._total += size
+            over = self._total is None or self._total > self.max_bytes
+        if over:
+            self.evict(keep=keep)
+
+    def evict(self, *, keep: Optional[str] = None) -> int:
+        """Recount the folder and delete least recently used files; returns bytes freed."""
+        entries, total = self._scan()
+        freed = 0
+        target = int(self.max_bytes * self.low_water)
+        if total > self.max_bytes:
+            for _mtime, size, path in sorted(entries):
+                if total - freed <= target:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                freed += size
+                with self._lock:
+                    self.evictions += 1
+            logger.info('Cache de imagens: %s bytes liberados', freed)
+        with self._lock:
+            self._total = total - freed
+        return freed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'bytes': self._total,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def _scan(self) -> Tuple[List[Tuple[float, int, str]], int]:
+        entries: List[Tuple[float, int, str]] = []
+        total = 0
+        stale_before = time.time() - self.STALE_TMP_SECONDS
+        os.makedirs(self.root, exist_ok=True)
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.endswith(TMP_SUFFIX):
+                    if stat.st_mtime < stale_before:
+                        try:
+                            os.remove(entry.path)
+                        except FileNotFoundError:
+                            pass
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        return entries, total
+
+
+__all__ = ['DiskLRUCache']
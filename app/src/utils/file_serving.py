@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import mimetypes
+import os
+from http import HTTPStatus
+from typing import Optional
+from urllib.parse import quote
+
+from flask import abort, current_app, request, send_file
+from werkzeug.security import safe_join
+
+SERVE_PYTHON = 'python'
+SERVE_X_ACCEL = 'x-accel'
+SERVE_X_SENDFILE = 'x-sendfile'
+
+
+def is_hidden(filename: str) -> bool:
+    """Whether any segment of ``filename`` starts with a dot, like the ``.incoming`` spool."""
+    return any(part.startswith('.') for part in filename.replace('\\', '/').split('/'))
+
+
+def send_stored_file(
+    root: str,
+    filename: str,
+    *,
+    accel_prefix: str,
+    mimetype: Optional[str] = None,
+    etag: Optional[str] = None,
+    last_modified: Optional[float] = None,
+    cache_policy: Optional[str] = None,
+):
+    """Serve ``root/filename`` with validators, ranges and a Cache-Control policy.
+
+    ``UPLOAD_SERVE_MODE`` picks who moves the bytes. ``python`` streams them
+    from this worker (werkzeug answers Range and conditional requests).
+    ``x-accel`` and ``x-sendfile`` only answer the conditional request here
+    and hand the file to the front proxy through ``X-Accel-Redirect``
+    (``accel_prefix`` + path, an nginx ``internal`` location) or
+    ``X-Sendfile`` (absolute path); the proxy then serves ranges itself.
+    Hidden paths such as ``.incoming`` are never served.
+    """
+    path = safe_join(root, filename)
+    if path is None or is_hidden(filename) or not os.path.isfile(path):
+        abort(HTTPStatus.NOT_FOUND)
+
+    mode = current_app.config.get('UPLOAD_SERVE_MODE', SERVE_PYTHON)
+    if mode == SERVE_PYTHON:
+        response = send_file(
+            path,
+            mimetype=mimetype,
+            conditional=True,
+            etag=etag if etag is not None else True,
+            last_modified=last_modified,
+        )
+        # werkzeug only names the unit when a Range arrives; advertise it up front.
+        response.accept_ranges = 'bytes'
+    else:
+        stat = os.stat(path)
+        response = current_app.response_class(
+            mimetype=mimetype or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        )
+        response.set_etag(etag or f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+        response.last_modified = last_modified if last_modified is not None else stat.st_mtime
+        response = response.make_conditional(request)
+        if response.status_code != HTTPStatus.NOT_MODIFIED:
+            if mode == SERVE_X_ACCEL:
+                response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{quote(filename)}"
+            else:
+                response.headers['X-Sendfile'] = os.path.abspath(path)
+
+    policy = (current_app.config.get('HTTP_CACHE_POLICIES') or {}).get(cache_policy) if cache_policy else None
+    if policy:
+        response.headers['Cache-Control'] = policy
+    return response
+
+
+__all__ = ['SERVE_PYTHON', 'SERVE_X_ACCEL', 'SERVE_X_SENDFILE', 'is_hidden', 'send_stored_file']
@@ -0,0 +1,163 @@
+"""Cache generations kept in the database.
+
+Caches held in process memory (response cache entries without a shared
+tier, listing counts) stay valid only while the rows they were built from
+are unchanged, and those rows may be written by any gunicorn worker, the
+scheduler or a CLI command. Each such cache is therefore tagged with a
+counter of the ``cache_generations`` table: a write bumps the counters it
+affects inside its own transaction, and readers compare their entries with
+the committed values.
+
+Each process keeps a snapshot of the table for ``CACHE_GENERATIONS_TTL``
+seconds, so a cache hit costs no query; a commit that bumped a counter in
+this process drops the snapshot at once. Writes from other processes are
+therefore seen within that bound, the same trade-off as the replica
+sticky window. A request keeps the snapshot it started with.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import current_app, has_app_context, has_request_context, request
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+# Memo on the request object: the app context (and its ``g``) may outlive
+# the request, as in tests and in the scheduler thread.
+_MEMO_KEY = 'cache_generations'
+_EXTENSION = 'cache_generations'
+# session.info flag: the transaction bumped a counter.
+_BUMPED_KEY = 'cache_generations_bumped'
+
+_READ = text('SELECT name, value FROM cache_generations')
+_READ_ONE = text('SELECT value FROM cache_generations WHERE name = :name')
+_BUMP = {
+    'mysql': text(
+        'INSERT INTO cache_generations (name, value) VALUES (:name, 1) ON DUPLICATE KEY UPDATE value = value + 1'
+    ),
+    # sqlite and PostgreSQL.
+    'default': text(
+        'INSERT INTO cache_generations (name, value) VALUES (:name, 1) '
+        'ON CONFLICT (name) DO UPDATE SET value = cache_generations.value + 1'
+    ),
+}
+
+
+class _Snapshot:
+    """Process-wide copy of the table, refreshed at most every ``ttl`` seconds."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entry: Optional[Tuple[float, Dict[str, int]]] = None
+        self._forgotten_at = float('-inf')
+
+    def get(self, ttl: float) -> Optional[Dict[str, int]]:
+        with self._lock:
+            entry = self._entry
+        if entry is None or time.monotonic() - entry[0] >= ttl:
+            return None
+        return entry[1]
+
+    def store(self, read_at: float, values: Dict[str, int]) -> None:
+        with self._lock:
+            # A read that started before a forget() or a newer read is stale.
+            if read_at < self._forgotten_at or (self._entry is not None and self._entry[0] >= read_at):
+                return
+            self._entry = (read_at, values)
+
+    def forget(self) -> None:
+        with self._lock:
+            self._entry = None
+            self._forgotten_at = time.monotonic()
+
+
+def _snapshot() -> _Snapshot:
+    return current_app.extensions.setdefault(_EXTENSION, _Snapshot())
+
+
+def current() -> Dict[str, int]:
+    """Committed generation of every counter, at most ``CACHE_GENERATIONS_TTL`` seconds old."""
+    if has_request_context():
+        values = getattr(request, _MEMO_KEY, None)
+        if values is not None:
+            return values
+    values = _snapshot().get(current_app.config.get('CACHE_GENERATIONS_TTL', 1.0))
+    if values is None:
+        values = refresh()
+    if has_request_context():
+        setattr(request, _MEMO_KEY, values)
+    return values
+
+
+def refresh() -> Dict[str, int]:
+    """Read every counter from the primary now and update this process's snapshot."""
+    read_at = time.monotonic()
+    session = current_app.extensions['sqlalchemy'].session
+    # Raw SQL always runs on the primary: a replica may not have the bump yet.
+    values = {name: int(value) for name, value in session.execute(_READ)}
+    _snapshot().store(read_at, values)
+    return values
+
+
+def replayed(bind_key: str, expected: Dict[str, int]) -> bool:
+    """Whether replica ``bind_key`` has applied the commits that set ``expected``.
+
+    Counters are bumped in the writers' transactions and replicas apply
+    commits in order, so a replica holding these values has every write
+    they stand for. The read shares the session's transaction on that
+    replica, hence its snapshot on MySQL, with the SELECTs that follow.
+    """
+    sqlalchemy = current_app.extensions['sqlalchemy']
+    rows = sqlalchemy.session.execute(_READ, bind_arguments={'bind': sqlalchemy.engines[bind_key]})
+    stored = {name: int(value) for name, value in rows}
+    return all(stored.get(name, 0) >= value for name, value in expected.items())
+
+
+def forget() -> None:
+    """Drop this process's snapshot; the next ``current()`` reads the table."""
+    _snapshot().forget()
+
+
+def bump(session: Session, names: Iterable[str]) -> None:
+    """Advance ``names`` in the session's transaction; they take effect when it commits.
+
+    Call from flush or execute listeners: the counters commit or roll back
+    together with the write that made the caches stale.
+    """
+    names = sorted(set(names))
+    if not names:
+        return
+    connection = session.connection()
+    statement = _BUMP.get(connection.dialect.name, _BUMP['default'])
+    connection.execute(statement, [{'name': name} for name in names])
+    session.info[_BUMPED_KEY] = True
+
+
+def value_in(session: Session, name: str) -> int:
+    """Counter ``name`` as the session's transaction sees it, its own bumps included."""
+    return int(session.connection().execute(_READ_ONE, {'name': name}).scalar() or 0)
+
+
+def register_listeners() -> None:
+    if event.contains(Session, 'after_commit', _forget_memo):
+        return
+    event.listen(Session, 'after_commit', _forget_memo)
+    event.listen(Session, 'after_rollback', _discard_bumped)
+
+
+def _forget_memo(session: Session) -> None:
+    # The rest of the request, and this process, must see what it just committed.
+    if has_request_context():
+        setattr(request, _MEMO_KEY, None)
+    if session.info.pop(_BUMPED_KEY, False) and has_app_context():
+        _snapshot().forget()
+
+
+def _discard_bumped(session: Session) -> None:
+    session.info.pop(_BUMPED_KEY, None)
+
+
+__all__ = ['bump', 'current', 'forget', 'refresh', 'register_listeners', 'replayed', 'value_in']
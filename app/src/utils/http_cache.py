@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from flask import current_app, jsonify, make_response, request
+from sqlalchemy import inspect
+
+from .clock import ensure_tz, utcnow
+
+# HTTP dates have whole seconds: a resource changed less than this long ago
+# may change again within the same second, so it is sent without Last-Modified.
+_LAST_MODIFIED_SETTLE = timedelta(seconds=1)
+
+
+def fingerprint(rows: Iterable[Any], *extra: Any) -> Tuple[str, Optional[datetime]]:
+    """Build an ETag and Last-Modified pair from ORM rows.
+
+    Each row contributes its ``id`` and the values of its loaded columns, so
+    the tag changes when any returned field is edited (even twice within one
+    second of a whole-second ``DATETIME``) and when rows enter or leave the set.
+    """
+    digest = hashlib.sha1()
+    last_modified: Optional[datetime] = None
+    for row in rows:
+        if row is None:
+            continue
+        # Reading updated_at first reloads the columns of an expired row.
+        updated_at = ensure_tz(row.updated_at)
+        digest.update(f'{row.id}:{_loaded_values(row)!r};'.encode('utf-8'))
+        if updated_at and (last_modified is None or updated_at > last_modified):
+            last_modified = updated_at
+    for value in extra:
+        digest.update(repr(value).encode('utf-8'))
+    return digest.hexdigest(), last_modified
+
+
+def _loaded_values(row: Any) -> list:
+    # Deferred columns are left out: they are not in the response either.
+    state = inspect(row)
+    return [state.dict[attr.key] for attr in state.mapper.column_attrs if attr.key in state.dict]
+
+
+def is_not_modified(etag: str, last_modified: Optional[datetime], *, use_last_modified: bool = True) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if use_last_modified and request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= ensure_tz(request.if_modified_since)
+    return False
+
+
+def conditional_response(
+    route: str,
+    rows: Iterable[Any],
+    build: Callable[[], Tuple[Any, int]],
+    *,
+    extra: Tuple[Any, ...] = (),
+    use_last_modified: bool = True,
+):
+    """Answer with 304 when the client copy is current, otherwise call ``build``.
+
+    ``build`` returns the usual ``(body, status)`` tuple and is only invoked on
+    a miss, so serialization is skipped for revalidations. Collections should
+    pass ``use_last_modified=False``: removing a row does not move the newest
+    ``updated_at``, so only the ETag can detect it.
+    """
+    if not current_app.config.get('HTTP_CACHE_ENABLED', True):
+        body, status = build()
+        return make_response(jsonify(body), status)
+
+    etag, last_modified = fingerprint(rows, *extra)
+    if is_not_modified(etag, last_modified, use_last_modified=use_last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        body, status = build()
+        response = make_response(jsonify(body), status)
+    return _with_validators(route, response, etag, last_modified)
+
+
+def build_representation(
+    rows: Iterable[Any],
+    build: Callable[[], Tuple[Any, int]],
+    *,
+    extra: Tuple[Any, ...] = (),
+) -> Dict[str, Any]:
+    """Serialize a response together with its validators so it can be cached."""
+    etag, last_modified = fingerprint(rows, *extra)
+    body, status = build()
+    return {
+        'body': body,
+        'status': int(status),
+        'etag': etag,
+        'last_modified': last_modified.isoformat() if last_modified else None,
+    }
+
+
+def representation_response(route: str, representation: Dict[str, Any], *, use_last_modified: bool = True):
+    if not current_app.config.get('HTTP_CACHE_ENABLED', True):
+        return make_response(jsonify(representation['body']), representation['status'])
+
+    etag = representation['etag']
+    last_modified = representation.get('last_modified')
+    last_modified = datetime.fromisoformat(last_modified) if last_modified else None
+    if is_not_modified(etag, last_modified, use_last_modified=use_last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(jsonify(representation['body']), representation['status'])
+    return _with_validators(route, response, etag, last_modified)
+
+
+def _with_validators(route: str, response, etag: str, last_modified: Optional[datetime]):
+    response.set_etag(etag, weak=True)
+    if last_modified and last_modified <= utcnow() - _LAST_MODIFIED_SETTLE:
+        response.last_modified = last_modified
+    policy = (current_app.config.get('HTTP_CACHE_POLICIES') or {}).get(route)
+    if policy:
+        response.headers['Cache-Control'] = policy
+    return response
+
+
+__all__ = [
+    'build_representation',
+    'conditional_response',
+    'fingerprint',
+    'is_not_modified',
+    'representation_response',
+]
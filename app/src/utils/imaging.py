@@ -0,0 +1,87 @@
+"""Image rendering run inside the ImageService process pool.
+
+Kept free of Flask and database imports so the pool workers stay small.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import uuid
+
+from PIL import Image, ImageOps
+
+FIT_INSIDE = 'inside'
+FIT_COVER = 'cover'
+
+_ORIENTATION = 0x0112
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+# Pillow format name and save options per output format.
+_SAVE_OPTIONS = {
+    'jpeg': ('JPEG', {'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', {'method': 4}),
+    'png': ('PNG', {'optimize': True}),
+}
+
+
+def init_worker(max_pixels: int) -> None:
+    # Refuse decompression bombs before any pixel is decoded.
+    Image.MAX_IMAGE_PIXELS = max_pixels
+
+
+def render_variant(
+    source: str,
+    destination: str,
+    *,
+    width: int | None,
+    height: int | None,
+    fit: str,
+    fmt: str,
+    quality: int,
+) -> int:
+    """Resize ``source`` into ``destination`` atomically; returns the bytes written.
+
+    ``inside`` scales down to fit the box and never enlarges; ``cover`` fills
+    the ``width`` x ``height`` box and crops the overflow around the center.
+    """
+    with Image.open(source) as image:
+        # JPEG sources decode directly at a reduced scale when possible.
+        image.draft('RGB', _draft_size(image, width, height, fit))
+        image = ImageOps.exif_transpose(image)
+        if fit == FIT_COVER and width and height:
+            image = ImageOps.fit(image, (width, height), method=Image.Resampling.LANCZOS)
+        else:
+            image.thumbnail((width or image.width, height or image.height), Image.Resampling.LANCZOS)
+
+        pil_format, options = _SAVE_OPTIONS[fmt]
+        if fmt == 'jpeg' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        elif image.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+            image = image.convert('RGBA')
+        if fmt != 'png':
+            options = {**options, 'quality': quality}
+
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        tmp_path = f'{destination}.{uuid.uuid4().hex}.tmp'
+        try:
+            image.save(tmp_path, pil_format, **options)
+            os.replace(tmp_path, destination)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return os.path.getsize(destination)
+
+
+def _draft_size(image: Image.Image, width: int | None, height: int | None, fit: str) -> tuple:
+    """Smallest size the decoder may produce without losing detail for the output box."""
+    if image.getexif().get(_ORIENTATION) in _TRANSPOSED_ORIENTATIONS:
+        # The box applies after rotation; the decoder works on stored pixels.
+        width, height = height, width
+    if fit == FIT_COVER and width and height:
+        scale = max(width / image.width, height / image.height)
+        return math.ceil(image.width * scale), math.ceil(image.height * scale)
+    return width or image.width, height or image.height
+
+
+__all__ = ['FIT_COVER', 'FIT_INSIDE', 'init_worker', 'render_variant']
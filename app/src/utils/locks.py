@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import text
+
+from ..extensions import db
+
+
+@contextmanager
+def advisory_lock(name: str, timeout: int = 0) -> Iterator[bool]:
+    """Hold a MySQL named lock (``GET_LOCK``) for the duration of the block.
+
+    Yields ``False`` when another connection already holds it. The lock lives
+    on a dedicated connection, so the session may commit freely inside the
+    block. Other dialects have no named locks and always yield ``True``.
+    """
+    engine = db.engine
+    if engine.dialect.name != 'mysql':
+        yield True
+        return
+    with engine.connect() as connection:
+        acquired = connection.execute(
+            text('SELECT GET_LOCK(:name, :timeout)'), {'name': name, 'timeout': timeout}
+        ).scalar() == 1
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text('SELECT RELEASE_LOCK(:name)'), {'name': name})
+
+
+__all__ = ['advisory_lock']
@@ -0,0 +1,79 @@
+"""Markdown to sanitized HTML and plain text, stored with each post.
+
+Kept free of Flask and database imports so the bulk re-render pool workers
+stay small.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+import mistune
+
+# Bump when the renderer output changes (parser upgrade, new plugin, different
+# sanitization) so ``python -m src.render_posts`` picks up every stored post.
+RENDER_VERSION = 1
+
+# escape=True turns raw HTML in the source into text, and the renderer
+# replaces javascript:/vbscript:/data: (non-image) links, so the output is
+# safe to embed as-is.
+_markdown = mistune.create_markdown(escape=True)
+
+_BLOCK_TAGS = frozenset(
+    {'p', 'div', 'br', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'pre', 'blockquote', 'tr', 'td', 'th'}
+)
+_WORD = re.compile(r'\w+')
+_BLANK = re.compile(r'\s+')
+
+
+@dataclass(frozen=True)
+class RenderedMarkdown:
+    html: str
+    text: str
+    word_count: int
+    version: int = RENDER_VERSION
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):  # noqa: ARG002
+        if tag == 'img':
+            alt = dict(attrs).get('alt')
+            if alt:
+                self.parts.append(f' {alt} ')
+        elif tag in _BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in _BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return _BLANK.sub(' ', ''.join(parser.parts)).strip()
+
+
+def render_markdown(source: Optional[str]) -> RenderedMarkdown:
+    html = _markdown(source or '')
+    text = html_to_text(html)
+    return RenderedMarkdown(html=html, text=text, word_count=len(_WORD.findall(text)))
+
+
+def render_many(items: List[Tuple[str, Optional[str]]]) -> List[Tuple[str, RenderedMarkdown]]:
+    """Render ``(id, markdown)`` pairs; the unit of work of the bulk re-render pool."""
+    return [(identifier, render_markdown(source)) for identifier, source in items]
+
+
+__all__ = ['RENDER_VERSION', 'RenderedMarkdown', 'html_to_text', 'render_many', 'render_markdown']
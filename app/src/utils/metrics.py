@@ -0,0 +1,433 @@
+"""Prometheus metrics shared by every server process, exposed at ``/metrics``.
+
+Values live in memory-mapped files under ``METRICS_MULTIPROC_DIR``, one
+file per process for counters and one for gauges. A scrape reaches a single
+gunicorn worker, and that worker sums the files of all of them, so a
+request count covers the whole server. ``gunicorn.conf.py`` creates the
+directory, and when a worker exits it deletes the worker's gauge file (a
+dead worker keeps no connections) and folds its counters into
+``counter_archive.db``, so totals never go backwards and recycled workers
+do not leave a file each behind. Without a directory (development server,
+tests) values stay in process memory.
+
+Entries are appended as ``<uint32 key length><key, padded><float64 value>``
+after an 8-byte header holding the used length, which is written last.
+Readers in other processes therefore never see a half-written entry, and
+each value is an aligned 8-byte word.
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from flask import Flask, current_app, g, request
+from sqlalchemy import event
+
+_HEADER = struct.Struct('<I4x')
+_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+_INITIAL_SIZE = 64 * 1024
+ARCHIVE_FILE = 'counter_archive.db'
+# Archive keys recording the processes folded into it; not metric samples.
+_MERGED_PREFIX = '\0merged:'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _MmapFile:
+    """Append-only key/value file of one process; only that process writes it."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, 'a+b')  # noqa: SIM115 - kept open for the process lifetime
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(_INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._used = _HEADER.unpack_from(self._map, 0)[0] or _HEADER.size
+        self._positions = {key: position for key, _value, position in _entries(self._map, self._used)}
+
+    def add(self, key: str, amount: float) -> None:
+        position = self._position(key)
+        _VALUE.pack_into(self._map, position, _VALUE.unpack_from(self._map, position)[0] + amount)
+
+    def set(self, key: str, value: float) -> None:
+        _VALUE.pack_into(self._map, self._position(key), value)
+
+    def _position(self, key: str) -> int:
+        position = self._positions.get(key)
+        if position is None:
+            encoded = key.encode('utf-8')
+            padding = -(_LENGTH.size + len(encoded)) % 8
+            entry = _LENGTH.pack(len(encoded)) + encoded + b' ' * padding + _VALUE.pack(0.0)
+            while self._used + len(entry) > len(self._map):
+                self._grow()
+            self._map[self._used : self._used + len(entry)] = entry
+            self._used += len(entry)
+            _HEADER.pack_into(self._map, 0, self._used)
+            position = self._positions[key] = self._used - _VALUE.size
+        return position
+
+    def _grow(self) -> None:
+        size = len(self._map) * 2
+        self._map.close()
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def close(self) -> None:
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+
+def _entries(data, used: int) -> Iterator[Tuple[str, float, int]]:
+    position = _HEADER.size
+    while position < used:
+        length = _LENGTH.unpack_from(data, position)[0]
+        start = position + _LENGTH.size
+        key = bytes(data[start : start + length]).decode('utf-8')
+        position = start + length + (-(_LENGTH.size + length) % 8)
+        yield key, _VALUE.unpack_from(data, position)[0], position
+        position += _VALUE.size
+
+
+def _read_file(path: str) -> Iterator[Tuple[str, float]]:
+    with open(path, 'rb') as source:
+        data = source.read()
+    if len(data) < _HEADER.size:
+        return
+    used = min(_HEADER.unpack_from(data, 0)[0], len(data))
+    for key, value, _position in _entries(data, used):
+        yield key, value
+
+
+class LocalValues:
+    """Values of this process only."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, str], float] = {}
+
+    def add(self, kind: str, key: str, amount: float) -> None:
+        with self._lock:
+            self._values[(kind, key)] = self._values.get((kind, key), 0.0) + amount
+
+    def set(self, kind: str, key: str, value: float) -> None:
+        with self._lock:
+            self._values[(kind, key)] = value
+
+    def collect(self) -> Dict[str, float]:
+        with self._lock:
+            return {key: value for (_kind, key), value in self._values.items()}
+
+
+class MultiprocessValues:
+    """Values in per-process files of a shared directory, summed on collect."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._files: Dict[str, _MmapFile] = {}
+        self._pid: Optional[int] = None
+
+    def add(self, kind: str, key: str, amount: float) -> None:
+        with self._lock:
+            self._file(kind).add(key, amount)
+
+    def set(self, kind: str, key: str, value: float) -> None:
+        with self._lock:
+            self._file(kind).set(key, value)
+
+    def _file(self, kind: str) -> _MmapFile:
+        pid = os.getpid()
+        if pid != self._pid:
+            # Forked: the parent's files belong to the parent.
+            self._files, self._pid = {}, pid
+        handle = self._files.get(kind)
+        if handle is None:
+            handle = self._files[kind] = _MmapFile(os.path.join(self.directory, f'{kind}_{pid}.db'))
+        return handle
+
+    def collect(self) -> Dict[str, float]:
+        per_process: Dict[str, Dict[str, float]] = {}
+        archive = os.path.join(self.directory, ARCHIVE_FILE)
+        for path in glob.glob(os.path.join(self.directory, '*.db')):
+            if path == archive:
+                continue
+            try:
+                per_process[os.path.basename(path)] = dict(_read_file(path))
+            except FileNotFoundError:
+                # Removed by mark_process_dead mid-scrape; the archive read
+                # below already holds its counters.
+                continue
+        # Read after the process files: mark_process_dead replaces the
+        # archive before deleting a counter file, so a file missed above is
+        # always in this archive, and one read above is skipped if it is.
+        archived = dict(_read_file(archive)) if os.path.exists(archive) else {}
+        totals: Dict[str, float] = defaultdict(float)
+        for name, values in per_process.items():
+            if f'{_MERGED_PREFIX}{name}' in archived:
+                continue
+            for key, value in values.items():
+                totals[key] += value
+        for key, value in archived.items():
+            if not key.startswith(_MERGED_PREFIX):
+                totals[key] += value
+        return totals
+
+
+def mark_process_dead(directory: str, pid: int) -> None:
+    """Drop the gauges of an exited process and fold its counters into the archive.
+
+    Runs in the gunicorn master, the only writer of the archive. The new
+    archive is written aside and renamed into place before the counter file
+    is deleted, so a concurrent scrape counts the process exactly once.
+    """
+    try:
+        os.remove(os.path.join(directory, f'gauge_{pid}.db'))
+    except FileNotFoundError:
+        pass
+    name = f'counter_{pid}.db'
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        return
+    archive = os.path.join(directory, ARCHIVE_FILE)
+    merged: Dict[str, float] = defaultdict(float)
+    if os.path.exists(archive):
+        merged.update(_read_file(archive))
+    for key, value in _read_file(path):
+        merged[key] += value
+    merged[f'{_MERGED_PREFIX}{name}'] = 1.0
+    staging = os.path.join(directory, f'{ARCHIVE_FILE}.tmp')
+    if os.path.exists(staging):
+        os.remove(staging)
+    handle = _MmapFile(staging)
+    for key, value in merged.items():
+        handle.set(key, value)
+    handle.close()
+    os.replace(staging, archive)
+    os.remove(path)
+
+
+def clear_directory(directory: str) -> None:
+    for path in glob.glob(os.path.join(directory, '*.db')):
+        os.remove(path)
+
+
+_values = None
+REGISTRY: List['_Metric'] = []
+
+
+def configure(directory: Optional[str], *, enabled: bool = True) -> None:
+    global _values
+    if not enabled:
+        _values = None
+    elif directory:
+        if not (isinstance(_values, MultiprocessValues) and _values.directory == directory):
+            os.makedirs(directory, exist_ok=True)
+            _values = MultiprocessValues(directory)
+    elif not isinstance(_values, LocalValues):
+        _values = LocalValues()
+
+
+class _Metric:
+    kind = ''
+    storage = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        REGISTRY.append(self)
+
+    def _key(self, suffix: str, labels: dict, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = [[name, str(labels[name])] for name in self.labels] + [list(pair) for pair in extra]
+        return json.dumps([self.name + suffix, pairs], separators=(',', ':'))
+
+    def _add(self, key: str, amount: float) -> None:
+        values = _values
+        if values is not None:
+            values.add(self.storage, key, amount)
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        self._add(self._key('', labels), amount)
+
+
+class Gauge(_Metric):
+    """Summed over the live processes."""
+
+    kind = 'gauge'
+    storage = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        values = _values
+        if values is not None:
+            values.set(self.storage, self._key('', labels), value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        self._add(self._key('', labels), amount)
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self._add(self._key('', labels), -amount)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        if _values is None:
+            return
+        # Buckets are stored individually and made cumulative when rendered.
+        bound = next((bucket for bucket in self.buckets if value <= bucket), None)
+        self._add(self._key('_bucket', labels, (('le', _format(bound) if bound is not None else '+Inf'),)), 1.0)
+        self._add(self._key('_sum', labels), value)
+        self._add(self._key('_count', labels), 1.0)
+
+
+HTTP_REQUESTS = Counter('laf_http_requests_total', 'HTTP requests served.', ('method', 'route', 'status'))
+HTTP_LATENCY = Histogram(
+    'laf_http_request_duration_seconds', 'Time to build HTTP responses.', ('method', 'route')
+)
+HTTP_IN_PROGRESS = Gauge('laf_http_requests_in_progress', 'HTTP requests being served.')
+DB_POOL_CONNECTIONS = Gauge(
+    'laf_db_pool_connections', 'Pooled database connections by state.', ('engine', 'state')
+)
+DB_POOL_EVENTS = Counter('laf_db_pool_events_total', 'Database pool events.', ('engine', 'event'))
+CACHE_REQUESTS = Counter('laf_cache_requests_total', 'Response cache lookups.', ('namespace', 'result'))
+LOGIN_ATTEMPTS = Counter('laf_login_attempts_total', 'Login attempts by outcome.', ('result',))
+UPLOADS = Counter('laf_uploads_total', 'Image uploads stored.', ('result',))
+UPLOAD_BYTES = Counter('laf_upload_bytes_total', 'Bytes of image uploads stored.', ('result',))
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _sample(name: str, pairs, value: float) -> str:
+    labels = ','.join(f'{label}="{_escape(text)}"' for label, text in pairs)
+    return f'{name}{{{labels}}} {_format(value)}' if labels else f'{name} {_format(value)}'
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (0.0.4)."""
+    samples: Dict[str, List[Tuple[list, float]]] = defaultdict(list)
+    for key, value in (_values.collect() if _values is not None else {}).items():
+        name, pairs = json.loads(key)
+        samples[name].append((pairs, value))
+
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        if metric.kind != 'histogram':
+            for pairs, value in sorted(samples.get(metric.name, ()), key=lambda item: item[0]):
+                lines.append(_sample(metric.name, pairs, value))
+            continue
+        buckets: Dict[tuple, Dict[str, float]] = defaultdict(dict)
+        for pairs, value in samples.get(f'{metric.name}_bucket', ()):
+            labels = tuple(tuple(pair) for pair in pairs if pair[0] != 'le')
+            buckets[labels][next(pair[1] for pair in pairs if pair[0] == 'le')] = value
+        sums = {tuple(tuple(pair) for pair in pairs): value for pairs, value in samples.get(f'{metric.name}_sum', ())}
+        for labels in sorted(buckets):
+            running = 0.0
+            for bound in [_format(bucket) for bucket in metric.buckets] + ['+Inf']:
+                running += buckets[labels].get(bound, 0.0)
+                lines.append(_sample(f'{metric.name}_bucket', labels + (('le', bound),), running))
+            lines.append(_sample(f'{metric.name}_sum', labels, sums.get(labels, 0.0)))
+            lines.append(_sample(f'{metric.name}_count', labels, running))
+    return '\n'.join(lines) + '\n'
+
+
+def update_pool_gauges() -> None:
+    # Through app.extensions: importing the db here would be circular (the
+    # response cache, created with the extensions, counts into this module).
+    for name, engine in current_app.extensions['sqlalchemy'].engines.items():
+        pool = engine.pool
+        if not hasattr(pool, 'checkedout'):
+            continue
+        engine_name = name or 'default'
+        DB_POOL_CONNECTIONS.set(pool.checkedout(), engine=engine_name, state='checked_out')
+        DB_POOL_CONNECTIONS.set(pool.checkedin(), engine=engine_name, state='checked_in')
+        DB_POOL_CONNECTIONS.set(max(pool.overflow(), 0), engine=engine_name, state='overflow')
+
+
+def init_metrics(app: Flask) -> None:
+    """Record request and pool metrics when ``METRICS_ENABLED``; call after ``db.init_app``."""
+    configure(app.config.get('METRICS_MULTIPROC_DIR'), enabled=app.config.get('METRICS_ENABLED', True))
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    with app.app_context():
+        for name, engine in app.extensions['sqlalchemy'].engines.items():
+            for event_name in ('connect', 'checkout', 'invalidate'):
+                event.listen(
+                    engine,
+                    event_name,
+                    lambda *args, _engine=name or 'default', _event=event_name: DB_POOL_EVENTS.inc(
+                        engine=_engine, event=_event
+                    ),
+                )
+
+    @app.before_request
+    def start_request_metrics():
+        g._metrics_started = time.perf_counter()
+        HTTP_IN_PROGRESS.inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('_metrics_started')
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            HTTP_REQUESTS.inc(method=request.method, route=route, status=response.status_code)
+            HTTP_LATENCY.observe(time.perf_counter() - started, method=request.method, route=route)
+            update_pool_gauges()
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(_exc):
+        if g.pop('_metrics_started', None) is not None:
+            HTTP_IN_PROGRESS.dec()
+
+
+__all__ = [
+    'ARCHIVE_FILE',
+    'CACHE_REQUESTS',
+    'DB_POOL_CONNECTIONS',
+    'DB_POOL_EVENTS',
+    'HTTP_IN_PROGRESS',
+    'HTTP_LATENCY',
+    'HTTP_REQUESTS',
+    'LOGIN_ATTEMPTS',
+    'UPLOADS',
+    'UPLOAD_BYTES',
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'LocalValues',
+    'MultiprocessValues',
+    'clear_directory',
+    'configure',
+    'init_metrics',
+    'mark_process_dead',
+    'render',
+    'update_pool_gauges',
+]
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import and_, or_
+
+from . import generations
+from .cache import LRUCache
+from .db_routing import primary_reads
+from .query_plan import explain, supports_explain
+from .responses import ApiError
+
+COUNT_EXACT = 'exact'
+COUNT_CACHED = 'cached'
+COUNT_ESTIMATED = 'estimated'
+COUNT_NONE = 'none'
+COUNT_STRATEGIES = (COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATED, COUNT_NONE)
+
+# Database generation bumped by every write to a listed table (see
+# CacheService); cached totals of an older generation are not used.
+COUNTS_GENERATION = 'listing_counts'
+
+
+@dataclass
+class Page:
+    items: List[Any] = field(default_factory=list)
+    total: Optional[int] = None
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+    total_strategy: str = COUNT_EXACT
+
+
+class CountCache:
+    """Thread-safe LRU of listing totals keyed by filter signature.
+
+    Holds at most ``COUNT_CACHE_MAX_ENTRIES`` totals, all of one
+    ``listing_counts`` generation: the first call that sees a newer one drops
+    them, so totals of older generations never linger until they expire.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self._entries = LRUCache(max_entries)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        self._entries.max_entries = max(int(app.config.get('COUNT_CACHE_MAX_ENTRIES', 1024)), 1)
+
+    def get(self, generation: int, key: Hashable) -> Optional[int]:
+        with self._lock:
+            self._advance(generation)
+        return self._entries.get(key)
+
+    def set(self, generation: int, key: Hashable, total: int, ttl: float) -> None:
+        with self._lock:
+            self._advance(generation)
+            if generation < self._generation:
+                # Counted under a generation that has since been retired.
+                return
+            self._entries.set(key, total, time.time() + ttl)
+
+    def _advance(self, generation: int) -> None:
+        if generation > self._generation:
+            self._generation = generation
+            self._entries.clear()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+count_cache = CountCache()
+
+
+def encode_cursor(order: str, value: Any, identifier: str) -> str:
+    if isinstance(value, datetime):
+        value = {'dt': value.isoformat()}
+    raw = json.dumps({'o': order, 'v': value, 'id': identifier}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, order: str) -> Tuple[Any, str]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        value, identifier = data['v'], data['id']
+        cursor_order = data['o']
+        if isinstance(value, dict) and 'dt' in value:
+            value = datetime.fromisoformat(value['dt'])
+    except (ValueError, KeyError, TypeError, binascii.Error) as exc:
+        raise ApiError('INVALID_CURSOR', 'Cursor de paginação inválido', status=400) from exc
+    if cursor_order != order:
+        raise ApiError('INVALID_CURSOR', 'Cursor não corresponde à ordenação solicitada', status=400)
+    return value, identifier
+
+
+def keyset_filter(column, id_column, direction: str, value: Any, identifier: str):
+    """Predicate selecting the rows that come after ``(value, identifier)``.
+
+    Rows are ordered by ``column`` and then ``id_column`` in the same direction.
+    NULLs sort first ascending and last descending, as in MySQL.
+    """
+    if direction == 'asc':
+        if value is None:
+            return or_(and_(column.is_(None), id_column > identifier), column.isnot(None))
+        return or_(column > value, and_(column == value, id_column > identifier))
+    if value is None:
+        return and_(column.is_(None), id_column < identifier)
+    return or_(column < value, and_(column == value, id_column < identifier), column.is_(None))
+
+
+def fetch_page(query, page_size: int, *, offset: int = 0):
+    """Fetch one page plus a lookahead row; returns ``(items, has_more)``."""
+    if offset:
+        query = query.offset(offset)
+    rows = query.limit(page_size + 1).all()
+    return rows[:page_size], len(rows) > page_size
+
+
+def resolve_count_strategy(endpoint: str) -> str:
+    strategies = current_app.config.get('COUNT_STRATEGIES') or {}
+    strategy = strategies.get(endpoint) or current_app.config.get('COUNT_STRATEGY_DEFAULT', COUNT_EXACT)
+    return strategy if strategy in COUNT_STRATEGIES else COUNT_EXACT
+
+
+def count_total(
+    query,
+    strategy: str,
+    *,
+    cache_key: Optional[Hashable] = None,
+    offset: Optional[int] = None,
+    page_items: int = 0,
+    has_more: bool = True,
+) -> Tuple[Optional[int], str]:
+    """Resolve the listing total according to ``strategy``.
+
+    Returns ``(total, strategy_used)``. When the offset of the page is known and
+    the lookahead found no further rows, the total is derived without querying.
+    """
+    if strategy == COUNT_NONE:
+        return None, COUNT_NONE
+    if offset is not None and not has_more and (page_items or not offset):
+        return offset + page_items, COUNT_EXACT
+    if strategy == COUNT_CACHED and cache_key is not None:
+        generation = generations.current().get(COUNTS_GENERATION, 0)
+        total = count_cache.get(generation, cache_key)
+        if total is None:
+            # Shared by every client under the current generation: count on the primary.
+            with primary_reads():
+                total = query.order_by(None).count()
+            count_cache.set(generation, cache_key, total, current_app.config.get('COUNT_CACHE_TTL', 30))
+        return total, COUNT_CACHED
+    if strategy == COUNT_ESTIMATED:
+        estimate = _estimate_count(query)
+        if estimate is not None:
+            return estimate, COUNT_ESTIMATED
+    return query.order_by(None).count(), COUNT_EXACT
+
+
+def _estimate_count(query) -> Optional[int]:
+    if not supports_explain():
+        return None
+    estimate = 1.0
+    for row in explain(query.order_by(None)):
+        rows = row.get('rows') or 1
+        filtered = row.get('filtered') or 100
+        estimate *= float(rows) * float(filtered) / 100
+    return int(round(estimate))
+
+
+__all__ = [
+    'COUNT_CACHED',
+    'COUNT_ESTIMATED',
+    'COUNT_EXACT',
+    'COUNT_NONE',
+    'COUNT_STRATEGIES',
+    'COUNTS_GENERATION',
+    'CountCache',
+    'Page',
+    'count_cache',
+    'count_total',
+    'decode_cursor',
+    'encode_cursor',
+    'fetch_page',
+    'keyset_filter',
+    'resolve_count_strategy',
+]
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from http import HTTPStatus
+from typing import Callable, Iterator, Optional, TypeVar
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from .responses import ApiError
+
+T = TypeVar('T')
+
+# Weight of the newest sample in the average verification time.
+_EWMA_ALPHA = 0.2
+
+
+def normalize_password(password: Optional[str]) -> str:
+    return (password or '').strip()
+
+
+def hash_method(stored: Optional[str]) -> Optional[str]:
+    """Method and parameters of a werkzeug hash (``pbkdf2:sha256:600000``), or ``None``."""
+    if not stored or '$' not in stored:
+        return None
+    return stored.split('$', 1)[0]
+
+
+def _verify(stored: str, password: str) -> bool:
+    try:
+        return check_password_hash(stored, password)
+    except ValueError:
+        return False
+
+
+class PasswordHasher:
+    """Password hashing under one configurable policy, with bounded concurrency.
+
+    Hashes are werkzeug strings (``method$salt$hash``), so the policy may be
+    any werkzeug method (``pbkdf2:sha256:<iterations>``, ``scrypt:<n>:<r>:<p>``).
+    Stored hashes are always verified with their own parameters;
+    ``needs_rehash`` reports the ones that differ from the policy.
+
+    The work runs on a small thread pool. hashlib releases the GIL while it
+    hashes, so the request threads of the worker keep serving, and at most
+    ``workers`` hashes burn CPU at once per process. ``slot`` admits up to
+    ``max_concurrent`` logins that hash and rejects the rest immediately
+    instead of queueing them behind seconds of hashing. Hashing that outlasts
+    ``timeout`` fails with ``LOGIN_BUSY`` for verifications and
+    ``PASSWORD_HASH_BUSY`` for new hashes (user create/update).
+    """
+
+    def __init__(self, method: str, *, workers: int, max_concurrent: int, timeout: float) -> None:
+        self.method = method
+        self.workers = workers
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._dummy_hash: Optional[str] = None
+        self._verify_seconds: Optional[float] = None
+        self.verified = 0
+        self.rehashed = 0
+        self.rejected = 0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise _login_busy()
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def hash(self, password: Optional[str]) -> str:
+        return self._run(_hash_busy, generate_password_hash, normalize_password(password), method=self.method)
+
+    def verify(self, stored: Optional[str], password: Optional[str]) -> bool:
+        if not stored:
+            return False
+        started = time.perf_counter()
+        valid = self._run(_login_busy, _verify, stored, normalize_password(password))
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.verified += 1
+            previous = self._verify_seconds
+            self._verify_seconds = elapsed if previous is None else previous + _EWMA_ALPHA * (elapsed - previous)
+        return valid
+
+    def verify_unknown(self, password: Optional[str]) -> None:
+        """Take as long as a failed verification for an account that does not exist.
+
+        Call it inside ``slot``, like a real verification, so unknown e-mails
+        are admitted and refused exactly like known ones and the sleepers are
+        capped at ``max_concurrent``. Once the average verification time is
+        known this only sleeps, so probing costs no CPU.
+        """
+        with self._lock:
+            expected = self._verify_seconds
+        if expected is None:
+            # First login of the process: calibrate with a real verification.
+            self.verify(self._dummy(), password)
+            return
+        time.sleep(expected)
+
+    def needs_rehash(self, stored: Optional[str]) -> bool:
+        return hash_method(stored) != self.method
+
+    def note_rehash(self) -> None:
+        with self._lock:
+            self.rehashed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'method': self.method,
+                'workers': self.workers,
+                'max_concurrent': self.max_concurrent,
+                'verified': self.verified,
+                'rehashed': self.rehashed,
+                'rejected': self.rejected,
+                'avg_verify_ms': round(self._verify_seconds * 1000, 1) if self._verify_seconds is not None else None,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _dummy(self) -> str:
+        if self._dummy_hash is None:
+            self._dummy_hash = self.hash(os.urandom(16).hex())
+        return self._dummy_hash
+
+    def _run(self, busy: Callable[[], ApiError], func: Callable[..., T], *args, **kwargs) -> T:
+        with self._lock:
+            # Created lazily per process, like the image pool: gunicorn
+            # workers must not inherit threads from the preloading master.
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+                self._executor_pid = os.getpid()
+            future = self._executor.submit(func, *args, **kwargs)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError as exc:
+            future.cancel()
+            raise busy() from exc
+
+
+def password_hasher() -> PasswordHasher:
+    hasher = current_app.extensions.get('password_hasher')
+    if hasher is None:
+        config = current_app.config
+        hasher = PasswordHasher(
+            config['PASSWORD_HASH_METHOD'],
+            workers=config['PASSWORD_HASH_WORKERS'],
+            max_concurrent=config['LOGIN_MAX_CONCURRENT'],
+            timeout=config['PASSWORD_HASH_TIMEOUT'],
+        )
+        # setdefault: concurrent first requests must share one admission limit.
+        hasher = current_app.extensions.setdefault('password_hasher', hasher)
+    return hasher
+
+
+def _login_busy() -> ApiError:
+    return ApiError(
+        'LOGIN_BUSY',
+        'Muitas tentativas de login simultâneas; tente novamente em instantes',
+        status=HTTPStatus.SERVICE_UNAVAILABLE,
+        headers={'Retry-After': '1'},
+    )
+
+
+def _hash_busy() -> ApiError:
+    return ApiError(
+        'PASSWORD_HASH_BUSY',
+        'Servidor ocupado ao gravar a senha; tente novamente em instantes',
+        status=HTTPStatus.SERVICE_UNAVAILABLE,
+        headers={'Retry-After': '1'},
+    )
+
+
+__all__ = ['PasswordHasher', 'hash_method', 'normalize_password', 'password_hasher']
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from ..extensions import db
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement) -> None:
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return f"EXPLAIN {compiler.process(element.statement, **kw)}"
+
+
+def explain(query) -> List[Dict[str, Any]]:
+    """Return the MySQL ``EXPLAIN`` rows for a query or select statement."""
+    statement = getattr(query, 'statement', query)
+    result = db.session.execute(Explain(statement))
+    return [dict(row) for row in result.mappings()]
+
+
+def supports_explain() -> bool:
+    return db.session.get_bind().dialect.name == 'mysql'
+
+
+__all__ = ['Explain', 'explain', 'supports_explain']
@@ -0,0 +1,161 @@
+"""Per-request timings: SQL time and count, auth, serialization and total.
+
+With ``REQUEST_TIMING_ENABLED`` every response carries a ``Server-Timing``
+header (shown by browser dev tools next to the request), and requests
+slower than ``REQUEST_TIMING_LOG_MIN_MS`` are logged as one JSON line:
+
+    Server-Timing: db;dur=12.4;desc="5 queries", auth;dur=0.8, serialize;dur=3.1, total;dur=19.7
+
+When disabled nothing is registered: no request hooks, no SQL listeners,
+and ``timed`` blocks cost a context-variable lookup.
+
+Spans may overlap: lazy loads during serialization count in both ``db``
+and ``serialize``.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from flask import Flask, Response, current_app, g, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+from ..extensions import db
+
+_current: ContextVar[Optional['RequestTimer']] = ContextVar('request_timer', default=None)
+
+
+class RequestTimer:
+    __slots__ = ('started', 'queries', 'spans', '_active')
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.spans: Dict[str, float] = {}
+        self._active: set = set()
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def summary(self) -> Dict[str, float]:
+        data = {f'{name}_ms': round(seconds * 1000, 2) for name, seconds in self.spans.items()}
+        data['queries'] = self.queries
+        data['total_ms'] = round((time.perf_counter() - self.started) * 1000, 2)
+        return data
+
+    def header(self, total_ms: float) -> str:
+        parts = []
+        for name, seconds in self.spans.items():
+            part = f'{name};dur={seconds * 1000:.2f}'
+            if name == 'db':
+                part += f';desc="{self.queries} queries"'
+            parts.append(part)
+        parts.append(f'total;dur={total_ms:.2f}')
+        return ', '.join(parts)
+
+
+def current_timer() -> Optional[RequestTimer]:
+    return _current.get()
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Add the block's duration to span ``name`` of the current request, if timed.
+
+    Nested blocks of the same span (a schema dumping a nested schema) count once.
+    """
+    timer = _current.get()
+    if timer is None or name in timer._active:
+        yield
+        return
+    timer._active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer._active.discard(name)
+        timer.add(name, time.perf_counter() - started)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON encoding of responses counted as serialization."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        with timed('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+def init_request_timing(app: Flask) -> None:
+    """Register the hooks when ``REQUEST_TIMING_ENABLED``; call after ``db.init_app``."""
+    if not app.config.get('REQUEST_TIMING_ENABLED'):
+        return
+
+    app.json = TimedJSONProvider(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(engine, 'handle_error', _handle_error)
+
+    @app.before_request
+    def start_timer():
+        g._request_timer_token = _current.set(RequestTimer())
+
+    @app.after_request
+    def report_timings(response: Response) -> Response:
+        timer = _current.get()
+        if timer is not None:
+            summary = timer.summary()
+            response.headers['Server-Timing'] = timer.header(summary['total_ms'])
+            if summary['total_ms'] >= current_app.config.get('REQUEST_TIMING_LOG_MIN_MS', 0):
+                current_app.logger.info(
+                    json.dumps(
+                        {
+                            'event': 'request_timing',
+                            'method': request.method,
+                            'path': request.path,
+                            'endpoint': request.endpoint,
+                            'status': response.status_code,
+                            **summary,
+                        },
+                        separators=(',', ':'),
+                    )
+                )
+        return response
+
+    @app.teardown_request
+    def stop_timer(_exc):
+        token = g.pop('_request_timer_token', None)
+        if token is not None:
+            _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+    if _current.get() is not None:
+        conn.info.setdefault('_timing_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+    timer = _current.get()
+    started = conn.info.get('_timing_started')
+    if timer is not None and started:
+        timer.queries += 1
+        timer.add('db', time.perf_counter() - started.pop())
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute.
+    connection = context.connection
+    started = connection.info.get('_timing_started') if connection is not None else None
+    timer = _current.get()
+    if timer is not None and started:
+        timer.queries += 1
+        timer.add('db', time.perf_counter() - started.pop())
+
+
+__all__ = ['RequestTimer', 'TimedJSONProvider', 'current_timer', 'init_request_timing', 'timed']
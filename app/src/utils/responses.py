@@ -5,12 +5,21 @@ from typing import Any, Dict, Iterable, Optional
 
 
 class ApiError(Exception):
-    def __init__(self, code: str, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST, *, payload: Optional[Dict[str, Any]] = None) -> None:
+    def __init__(
+        self,
+        code: str,
+        message: str,
+        status: HTTPStatus = HTTPStatus.BAD_REQUEST,
+        *,
+        payload: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
         super().__init__(message)
         self.code = code
         self.message = message
         self.status = status
         self.payload = payload or {}
+        self.headers = headers or {}
 
     def to_response(self) -> Dict[str, Any]:
         return {
@@ -28,16 +37,25 @@ def success_response(data: Any, status: HTTPStatus = HTTPStatus.OK, **extra: Any
     return body, status
 
 
-def paginated_response(items: Iterable[Any], total: int, page: int, page_size: int, *, status: HTTPStatus = HTTPStatus.OK) -> tuple[Any, int]:
-    return (
-        {
-            'data': list(items),
-            'page': page,
-            'page_size': page_size,
-            'total': total,
-        },
-        status,
-    )
+def paginated_response(
+    items: Iterable[Any],
+    total: Optional[int],
+    page: int,
+    page_size: int,
+    *,
+    status: HTTPStatus = HTTPStatus.OK,
+    total_strategy: str = 'exact',
+    **extra: Any,
+) -> tuple[Any, int]:
+    body = {
+        'data': list(items),
+        'page': page,
+        'page_size': page_size,
+        'total': total,
+        'total_strategy': total_strategy,
+    }
+    body.update(extra)
+    return body, status
 
 
 def error_response(code: str, message: str, status: HTTPStatus, *, payload: Optional[Dict[str, Any]] = None) -> tuple[Any, int]:
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, Iterator, List, Mapping, Optional, Set
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fold(text: Optional[str]) -> str:
+    """Lowercase and strip accents so ``Ata`` matches ``atá`` and ``ATA``."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(fold(text))
+
+
+class InvertedIndex:
+    """In-memory inverted index with field weights, prefix matching and AND semantics.
+
+    Prefixes are looked up by bisecting a sorted copy of the vocabulary, built
+    on the first search and kept sorted by later ``add``/``remove`` calls.
+    """
+
+    FIELD_WEIGHTS = {'title': 3.0, 'excerpt': 2.0, 'content': 1.0}
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._documents: Dict[str, Set[str]] = {}
+        self._vocabulary: Optional[List[str]] = None
+        self._lock = threading.RLock()
+
+    def add(self, doc_id: str, fields: Mapping[str, Optional[str]]) -> None:
+        with self._lock:
+            self.remove(doc_id)
+            tokens: Set[str] = set()
+            for field, text in fields.items():
+                weight = self.FIELD_WEIGHTS.get(field, 1.0)
+                for token in tokenize(text):
+                    postings = self._postings.get(token)
+                    if postings is None:
+                        postings = self._postings[token] = {}
+                        if self._vocabulary is not None:
+                            insort(self._vocabulary, token)
+                    postings[doc_id] = postings.get(doc_id, 0.0) + weight
+                    tokens.add(token)
+            self._documents[doc_id] = tokens
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            for token in self._documents.pop(doc_id, ()):
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[token]
+                    if self._vocabulary is not None:
+                        del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+            self._vocabulary = None
+
+    def search(self, query: str) -> Dict[str, float]:
+        """Score documents containing every query token (as a word prefix)."""
+        terms = tokenize(query)
+        if not terms:
+            return {}
+        with self._lock:
+            total_docs = max(len(self._documents), 1)
+            scores: Optional[Dict[str, float]] = None
+            for term in terms:
+                term_scores: Dict[str, float] = defaultdict(float)
+                for token in self._with_prefix(term):
+                    postings = self._postings[token]
+                    idf = math.log(1 + total_docs / len(postings))
+                    for doc_id, weight in postings.items():
+                        term_scores[doc_id] += weight * idf
+                if scores is None:
+                    scores = dict(term_scores)
+                else:
+                    scores = {doc_id: score + term_scores[doc_id] for doc_id, score in scores.items() if doc_id in term_scores}
+                if not scores:
+                    return {}
+            return scores or {}
+
+    def _with_prefix(self, prefix: str) -> Iterator[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        position = bisect_left(vocabulary, prefix)
+        while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+            yield vocabulary[position]
+            position += 1
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+
+__all__ = ['InvertedIndex', 'fold', 'tokenize']
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+_MARKDOWN_PATTERNS = [
+    (re.compile(r'```.*?(```|$)', re.DOTALL), ' '),
+    (re.compile(r'!\[([^\]]*)\]\([^)]*\)'), r'\1'),
+    (re.compile(r'\[([^\]]*)\]\([^)]*\)'), r'\1'),
+    (re.compile(r'<[^>]+>'), ' '),
+    (re.compile(r'^\s{0,3}(#{1,6}|>|[-*+]|\d+\.)\s+', re.MULTILINE), ''),
+    (re.compile(r'[*_`~]+'), ''),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def strip_markdown(markdown: Optional[str]) -> str:
+    text = markdown or ''
+    for pattern, replacement in _MARKDOWN_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def make_excerpt(markdown: Optional[str], limit: int = 200) -> Optional[str]:
+    text = strip_markdown(markdown)
+    if not text:
+        return None
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(' ', 1)[0] or text[:limit]
+    return f"{cut.rstrip(' .,;:')}…"
+
+
+__all__ = ['strip_markdown', 'make_excerpt']
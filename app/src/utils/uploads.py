@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Callable, FrozenSet, List, Optional
+
+from flask import Request
+
+from .responses import ApiError
+
+# Magic numbers of the accepted image types; the declared Content-Type is
+# only a hint, the stored extension comes from the bytes.
+_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png', '.png'),
+    (b'GIF87a', 'image/gif', '.gif'),
+    (b'GIF89a', 'image/gif', '.gif'),
+)
+_SNIFF_BYTES = 12
+INCOMING_DIR = '.incoming'
+# Room for multipart boundaries and part headers around the file itself.
+MULTIPART_OVERHEAD = 64 * 1024
+_CONTENT_ADDRESSED = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]+$')
+
+
+def sniff_image_type(head: bytes) -> Optional[tuple]:
+    """``(content_type, extension)`` for the first bytes of an image, or ``None``."""
+    for signature, content_type, extension in _SIGNATURES:
+        if head.startswith(signature):
+            return content_type, extension
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp', '.webp'
+    return None
+
+
+def is_content_addressed(filename: str) -> bool:
+    """Whether ``filename`` is a ``<sha256>.<ext>`` upload, whose bytes can never change."""
+    return bool(_CONTENT_ADDRESSED.match(filename))
+
+
+def upload_cache_policy(filename: str, default: str = 'upload') -> str:
+    """HTTP_CACHE_POLICIES entry for an upload (or a variant of it)."""
+    return 'upload_immutable' if is_content_addressed(filename) else default
+
+
+@dataclass(frozen=True)
+class UploadLimits:
+    folder: str
+    max_bytes: int
+    allowed_types: FrozenSet[str]
+
+    @classmethod
+    def from_config(cls, config) -> 'UploadLimits':
+        return cls(
+            folder=config['UPLOAD_FOLDER'],
+            max_bytes=config['UPLOAD_MAX_BYTES'],
+            allowed_types=frozenset(config['UPLOAD_ALLOWED_TYPES']),
+        )
+
+    @property
+    def max_request_bytes(self) -> int:
+        return self.max_bytes + MULTIPART_OVERHEAD
+
+    def too_large(self) -> ApiError:
+        return ApiError(
+            'FILE_TOO_LARGE',
+            f'Arquivo maior que o limite de {round(self.max_bytes / (1024 * 1024), 1):g} MB',
+            status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+        )
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    filename: str
+    sha256: str
+    size: int
+    content_type: str
+    deduplicated: bool
+
+
+class UploadSpool:
+    """Writable file for one multipart part that hashes and checks bytes as they arrive.
+
+    The form parser writes each chunk straight to a temporary file next to
+    the upload folder. The size cap and the type sniff run on those chunks, so
+    an oversized or non-image upload is rejected without reading the rest of
+    the body; ``within_budget``, when given, is told every chunk's size and
+    caps the request as a whole. ``store`` moves the file to its
+    content-addressed name; if that never happens, closing the spool removes
+    the temporary file.
+    """
+
+    def __init__(
+        self,
+        limits: UploadLimits,
+        declared_type: Optional[str],
+        within_budget: Optional[Callable[[int], bool]] = None,
+    ) -> None:
+        if declared_type and declared_type not in limits.allowed_types and declared_type != 'application/octet-stream':
+            raise _unsupported(limits)
+        self.limits = limits
+        self._within_budget = within_budget
+        incoming = os.path.join(limits.folder, INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=incoming, suffix='.part')
+        self._file = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self._head = b''
+        self._kind: Optional[tuple] = None
+        self._stored = False
+        self.size = 0
+
+    # -- file protocol used by the form parser and FileStorage --------------------
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.size > self.limits.max_bytes:
+            self._reject(self.limits.too_large())
+        if self._within_budget is not None and not self._within_budget(len(data)):
+            self._reject(self.limits.too_large())
+        if self._kind is None and len(self._head) < _SNIFF_BYTES:
+            self._head += data[: _SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= _SNIFF_BYTES:
+                self._check_type()
+        self._hash.update(data)
+        return self._file.write(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._file.readline(size)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+        if not self._stored:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    # -- storage -------------------------------------------------------------------
+
+    def store(self) -> StoredUpload:
+        """Move the upload to ``<sha256><ext>``, reusing an identical file already stored."""
+        if self.size == 0:
+            raise ApiError('VALIDATION_ERROR', 'Arquivo vazio', status=HTTPStatus.UNPROCESSABLE_ENTITY)
+        if self._kind is None:
+            self._check_type()
+        content_type, extension = self._kind
+        digest = self._hash.hexdigest()
+        filename = f'{digest}{extension}'
+        destination = os.path.join(self.limits.folder, filename)
+
+        self._file.flush()
+        deduplicated = os.path.exists(destination)
+        if not deduplicated:
+            os.fsync(self._file.fileno())
+            # Same filesystem, so the rename is atomic; two concurrent uploads
+            # of the same bytes replace each other with identical content.
+            os.replace(self.path, destination)
+            self._stored = True
+        return StoredUpload(
+            filename=filename,
+            sha256=digest,
+            size=self.size,
+            content_type=content_type,
+            deduplicated=deduplicated,
+        )
+
+    def _check_type(self) -> None:
+        kind = sniff_image_type(self._head)
+        if kind is None or kind[0] not in self.limits.allowed_types:
+            self._reject(_unsupported(self.limits))
+        self._kind = kind
+
+    def _reject(self, error: ApiError) -> None:
+        self.close()
+        raise error
+
+
+class UploadRequest(Request):
+    """Request that spools file parts through ``UploadSpool`` once ``upload_limits`` is set.
+
+    Routes opt in before touching ``request.files``; every other request keeps
+    werkzeug's default in-memory/temporary-file streams. The request keeps
+    every spool it opens and closes them when it is closed: when a later part
+    is rejected, the parts already parsed never reach ``request.files``. The
+    file parts together may not exceed ``max_request_bytes``, the cap the
+    route applies to a declared Content-Length, so chunked bodies cannot get
+    past it by spreading the bytes over many parts.
+    """
+
+    upload_limits: Optional[UploadLimits] = None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.upload_limits is None:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        spool = UploadSpool(self.upload_limits, content_type, self._within_upload_budget)
+        self.__dict__.setdefault('_upload_spools', []).append(spool)
+        return spool
+
+    def _within_upload_budget(self, size: int) -> bool:
+        total = self.__dict__.get('_upload_bytes', 0) + size
+        self.__dict__['_upload_bytes'] = total
+        return total <= self.upload_limits.max_request_bytes
+
+    def close(self) -> None:
+        super().close()
+        spools: List[UploadSpool] = self.__dict__.pop('_upload_spools', [])
+        for spool in spools:
+            spool.close()
+
+
+def _unsupported(limits: UploadLimits) -> ApiError:
+    allowed = ', '.join(sorted(limits.allowed_types))
+    return ApiError(
+        'UNSUPPORTED_MEDIA_TYPE',
+        f'Tipo de arquivo não permitido (use {allowed})',
+        status=HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+    )
+
+
+__all__ = [
+    'StoredUpload',
+    'UploadLimits',
+    'UploadRequest',
+    'UploadSpool',
+    'is_content_addressed',
+    'sniff_image_type',
+    'upload_cache_policy',
+]
@@ -3,10 +3,14 @@ from __future__ import annotations
 from werkzeug.serving import run_simple
 
 from .app_factory import create_app
+from .services.scheduler_service import SchedulerService
 
 app = create_app()
 
 
 if __name__ == '__main__':
+    # Development server; production runs gunicorn with gunicorn.conf.py.
     port = app.config.get('APP_PORT', 8000)
-    run_simple('0.0.0.0', port, app, use_reloader=True)
+    if app.config.get('SCHEDULER_IN_PROCESS'):
+        SchedulerService.start_background(app)
+    run_simple('0.0.0.0', port, app, use_reloader=app.config.get('APP_RELOAD', False), threaded=True)
@@ -1,4 +1,5 @@
 import os
+from contextlib import contextmanager
 
 import sqlalchemy as sa
 from sqlalchemy.engine import make_url
@@ -59,6 +60,27 @@ def runner(app):
     return app.test_cli_runner()
 
 
+@pytest.fixture
+def count_queries(app):
+    """Context manager collecting every SQL statement sent to the database."""
+
+    @contextmanager
+    def _count():
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+            statements.append(statement)
+
+        engine = db.engine
+        sa.event.listen(engine, 'before_cursor_execute', _record)
+        try:
+            yield statements
+        finally:
+            sa.event.remove(engine, 'before_cursor_execute', _record)
+
+    return _count
+
+
 @pytest.fixture
 def seed_data(app):
     with app.app_context():
@@ -1,7 +1,17 @@
+import multiprocessing
 from http import HTTPStatus
 
+import pytest
+from werkzeug.security import generate_password_hash
+
+from src.app_factory import create_app
+from src.config import Config
 from src.extensions import db
 from src.models import User, UserRole
+from src.services.user_service import UserService
+from src.utils.passwords import PasswordHasher, hash_method, password_hasher
+from src.utils.responses import ApiError
+from src.utils import generations
 
 
 def create_user(email: str, password: str):
@@ -43,3 +53,146 @@ def test_me_success(client, app):
     assert response.status_code == HTTPStatus.OK
     data = response.get_json()['data']
     assert data['email'] == 'me@example.com'
+
+
+def test_deactivation_applies_to_cached_identity(client, seed_data):
+    admin_token = client.post('/api/v1/auth/login', json={'email': 'admin@example.com', 'password': 'password'})
+    admin_headers = {'Authorization': f"Bearer {admin_token.get_json()['data']['access_token']}"}
+    editor_login = client.post('/api/v1/auth/login', json={'email': 'editor@example.com', 'password': 'password'})
+    editor_headers = {'Authorization': f"Bearer {editor_login.get_json()['data']['access_token']}"}
+
+    assert client.get('/api/v1/auth/me', headers=editor_headers).status_code == HTTPStatus.OK
+
+    response = client.put(
+        f"/api/v1/users/{seed_data['editor'].id}",
+        headers=admin_headers,
+        json={'is_active': False},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert client.get('/api/v1/auth/me', headers=editor_headers).status_code == HTTPStatus.FORBIDDEN
+
+
+def _update_user_in_other_worker(database_url, user_id, changes):
+    app = create_app(config=Config(SQLALCHEMY_DATABASE_URI=database_url, DATABASE_REPLICA_URLS=[]))
+    with app.app_context():
+        UserService.update_user(user_id, changes)
+
+
+def test_user_changes_from_another_worker_apply_to_cached_identity(client, seed_data, app):
+    login = client.post('/api/v1/auth/login', json={'email': 'editor@example.com', 'password': 'password'})
+    headers = {'Authorization': f"Bearer {login.get_json()['data']['access_token']}"}
+    me = client.get('/api/v1/auth/me', headers=headers)
+    assert me.get_json()['data']['role'] == UserRole.EDITOR.value
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == HTTPStatus.OK
+
+    # The admin's request lands on another gunicorn worker: its cache
+    # invalidation never reaches this process, only the database does.
+    context = multiprocessing.get_context('spawn')
+    for changes in ({'role': UserRole.TJD.value}, {'is_active': False}):
+        process = context.Process(
+            target=_update_user_in_other_worker,
+            args=(app.config['SQLALCHEMY_DATABASE_URI'], seed_data['editor'].id, changes),
+        )
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        db.session.remove()
+        # As if CACHE_GENERATIONS_TTL had elapsed.
+        generations.forget()
+        if 'role' in changes:
+            assert client.get('/api/v1/auth/me', headers=headers).get_json()['data']['role'] == UserRole.TJD.value
+
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == HTTPStatus.FORBIDDEN
+
+
+def test_cached_identity_runs_no_query(client, seed_data, app, count_queries, monkeypatch):
+    monkeypatch.setitem(app.config, 'CACHE_GENERATIONS_TTL', 60)
+    login = client.post('/api/v1/auth/login', json={'email': 'editor@example.com', 'password': 'password'})
+    headers = {'Authorization': f"Bearer {login.get_json()['data']['access_token']}"}
+    client.get('/api/v1/auth/me', headers=headers)
+
+    with count_queries() as statements:
+        response = client.get('/api/v1/auth/me', headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    assert statements == []
+
+
+def test_cache_stats_report_identity_hits(client, seed_data):
+    login = client.post('/api/v1/auth/login', json={'email': 'admin@example.com', 'password': 'password'})
+    headers = {'Authorization': f"Bearer {login.get_json()['data']['access_token']}"}
+    client.get('/api/v1/auth/me', headers=headers)
+    client.get('/api/v1/auth/me', headers=headers)
+
+    response = client.get('/api/v1/health/caches', headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    identity = response.get_json()['data']['namespaces']['identity']
+    assert identity['hits'] >= 2
+
+
+def test_login_upgrades_outdated_password_hash(client, app):
+    with app.app_context():
+        user = User(name='Legado', email='legado@example.com', role=UserRole.EDITOR)
+        user.password_hash = generate_password_hash('123456', method='pbkdf2:sha256:1000')
+        db.session.add(user)
+        db.session.commit()
+        user_id, updated_at = user.id, user.updated_at
+
+    response = client.post('/api/v1/auth/login', json={'email': 'legado@example.com', 'password': '123456'})
+    assert response.status_code == HTTPStatus.OK
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        assert hash_method(user.password_hash) == app.config['PASSWORD_HASH_METHOD']
+        assert user.updated_at == updated_at
+        assert user.check_password('123456')
+    again = client.post('/api/v1/auth/login', json={'email': 'legado@example.com', 'password': '123456'})
+    assert again.status_code == HTTPStatus.OK
+
+
+def test_login_unknown_email_skips_hashing(client, app):
+    with app.app_context():
+        create_user('conhecido@example.com', '123456')
+        hasher = password_hasher()
+    client.post('/api/v1/auth/login', json={'email': 'conhecido@example.com', 'password': 'errada'})
+    verified = hasher.stats()['verified']
+
+    response = client.post('/api/v1/auth/login', json={'email': 'ninguem@example.com', 'password': '123456'})
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.get_json()['error']['code'] == 'INVALID_CREDENTIALS'
+    assert hasher.stats()['verified'] == verified
+
+
+def test_login_rejected_when_concurrency_limit_is_reached(client, app, monkeypatch):
+    hasher = PasswordHasher(app.config['PASSWORD_HASH_METHOD'], workers=1, max_concurrent=1, timeout=5)
+    monkeypatch.setitem(app.extensions, 'password_hasher', hasher)
+    with hasher.slot():
+        response = client.post('/api/v1/auth/login', json={'email': 'admin@example.com', 'password': 'password'})
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['Retry-After'] == '1'
+    assert hasher.stats()['rejected'] == 1
+    hasher.shutdown()
+
+
+def test_unknown_email_logins_are_admitted_like_known_ones(client, app, seed_data, monkeypatch):
+    hasher = PasswordHasher(app.config['PASSWORD_HASH_METHOD'], workers=1, max_concurrent=1, timeout=5)
+    monkeypatch.setitem(app.extensions, 'password_hasher', hasher)
+    # Calibrated: later unknown e-mails only sleep, but inside a slot.
+    hasher.verify(hasher.hash('calibragem'), 'errada')
+    with hasher.slot():
+        for email in ('admin@example.com', 'ninguem@example.com'):
+            response = client.post('/api/v1/auth/login', json={'email': email, 'password': 'errada'})
+            assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE, email
+            assert response.get_json()['error']['code'] == 'LOGIN_BUSY'
+    assert hasher.stats()['rejected'] == 2
+
+    response = client.post('/api/v1/auth/login', json={'email': 'ninguem@example.com', 'password': 'errada'})
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    hasher.shutdown()
+
+
+def test_slow_hash_for_new_password_is_not_reported_as_login_busy(app):
+    hasher = PasswordHasher('pbkdf2:sha256:2000000', workers=1, max_concurrent=1, timeout=0.001)
+    with pytest.raises(ApiError) as excinfo:
+        hasher.hash('nova-senha')
+    assert excinfo.value.code == 'PASSWORD_HASH_BUSY'
+    assert excinfo.value.status == HTTPStatus.SERVICE_UNAVAILABLE
+    hasher.shutdown()
@@ -0,0 +1,18 @@
+from src.boot import BootPlan, alembic_config, alembic_head, plan_boot, read_state, seed_fingerprint
+from src.extensions import db
+
+
+def test_boot_plan_skips_work_when_revision_and_seed_are_current():
+    head = alembic_head(alembic_config())
+    fingerprint = seed_fingerprint()
+
+    assert plan_boot((head, fingerprint), head, fingerprint) == BootPlan(migrate=False, seed=False)
+    assert plan_boot((head, 'antigo'), head, fingerprint) == BootPlan(migrate=False, seed=True)
+    assert plan_boot(('0001_initial', fingerprint), head, fingerprint).migrate
+    assert plan_boot((None, None), head, fingerprint).needed
+
+
+def test_read_state_tolerates_unmigrated_database(app):
+    # The test schema comes from create_all, so there is no alembic_version.
+    with app.app_context(), db.engine.connect() as connection:
+        assert read_state(connection) == (None, None)
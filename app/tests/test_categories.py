@@ -1,6 +1,12 @@
+import multiprocessing
 from http import HTTPStatus
 
-from src.models import UserRole
+from src.app_factory import create_app
+from src.config import Config
+from src.extensions import db
+from src.models import Category, User, UserRole
+from src.services.category_service import CategoryService
+from src.utils import generations
 
 
 def login(client, email, password):
@@ -38,3 +44,79 @@ def test_delete_category_requires_admin(client, seed_data):
     editor_token = login(client, 'editor@example.com', 'password')
     response = client.delete(f'/api/v1/categories/{category_id}', headers={'Authorization': f'Bearer {editor_token}'})
     assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_category_grants_update_tjd_scope(client, seed_data, app):
+    with app.app_context():
+        tjd = User(name='Auditor', email='tjd@example.com', role=UserRole.TJD)
+        tjd.set_password('password')
+        db.session.add(tjd)
+        db.session.commit()
+        tjd_id = tjd.id
+    admin_token = login(client, 'admin@example.com', 'password')
+    tjd_headers = {'Authorization': f"Bearer {login(client, 'tjd@example.com', 'password')}"}
+
+    response = client.get('/api/v1/posts/', headers=tjd_headers)
+    assert response.get_json()['total'] == 0
+
+    draft = {
+        'slug': 'nota-tjd',
+        'title': 'Nota do TJD',
+        'content_markdown': 'Conteúdo',
+        'category_id': seed_data['category'].id,
+        'author_id': tjd_id,
+        'status': 'DRAFT',
+    }
+    assert client.post('/api/v1/posts/', headers=tjd_headers, json=draft).status_code == HTTPStatus.FORBIDDEN
+
+    response = client.put(
+        f"/api/v1/categories/{seed_data['category'].id}",
+        headers={'Authorization': f'Bearer {admin_token}'},
+        json={'allowed_roles': ['tjd']},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    assert client.post('/api/v1/posts/', headers=tjd_headers, json=draft).status_code == HTTPStatus.CREATED
+    response = client.get('/api/v1/posts/', headers=tjd_headers)
+    assert response.get_json()['total'] == 2
+
+
+def _grant_in_other_worker(database_url, category_id, roles):
+    app = create_app(config=Config(SQLALCHEMY_DATABASE_URI=database_url, DATABASE_REPLICA_URLS=[]))
+    with app.app_context():
+        CategoryService.update_category(category_id, {'allowed_roles': roles})
+
+
+def test_grants_changed_by_another_worker_apply_after_generations_refresh(app, seed_data):
+    category = Category(name='Restrita', slug='restrita', allowed_roles=['editor'])
+    db.session.add(category)
+    db.session.commit()
+    category_id = category.id
+    with app.test_request_context():
+        assert CategoryService.permissions().role_allows(UserRole.EDITOR, category_id)
+
+    # The revocation commits in another process; this one's cache is only
+    # told through the database.
+    process = multiprocessing.get_context('spawn').Process(
+        target=_grant_in_other_worker, args=(app.config['SQLALCHEMY_DATABASE_URI'], category_id, ['tjd'])
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    db.session.remove()
+    # As if CACHE_GENERATIONS_TTL had elapsed.
+    generations.forget()
+
+    with app.test_request_context():
+        assert not CategoryService.permissions().role_allows(UserRole.EDITOR, category_id)
+
+
+def test_permission_lookups_share_one_index_per_request(app, seed_data, count_queries, monkeypatch):
+    monkeypatch.setitem(app.config, 'CACHE_GENERATIONS_TTL', 60)
+    with app.test_request_context():
+        CategoryService.permissions()
+
+    with app.test_request_context(), count_queries() as statements:
+        first = CategoryService.permissions()
+        assert CategoryService.permissions() is first
+    assert statements == []
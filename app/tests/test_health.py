@@ -5,3 +5,16 @@ def test_health_endpoint(client):
     response = client.get('/api/v1/health')
     assert response.status_code == HTTPStatus.OK
     assert response.get_json() == {'status': 'ok'}
+
+
+def test_pool_stats_require_admin_and_count_checkouts(client, seed_data):
+    assert client.get('/api/v1/health/pool').status_code == HTTPStatus.UNAUTHORIZED
+
+    login = client.post('/api/v1/auth/login', json={'email': 'admin@example.com', 'password': 'password'})
+    headers = {'Authorization': f"Bearer {login.get_json()['data']['access_token']}"}
+    response = client.get('/api/v1/health/pool', headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    stats = response.get_json()['data']['default']
+    assert stats['checkouts'] >= 1
+    assert stats['checkouts'] >= stats['checkins']
+    assert 'checkout_wait_ms' in stats
@@ -0,0 +1,94 @@
+import multiprocessing
+import re
+
+from src.app_factory import create_app
+from src.config import Config
+from src.utils import metrics
+from src.utils.metrics import ARCHIVE_FILE, Counter, Gauge, MultiprocessValues, mark_process_dead
+
+
+def _value(text, sample):
+    match = re.search(rf'^{re.escape(sample)} ([\d.e+-]+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_metrics_report_requests_latency_and_logins(client, seed_data):  # noqa: ARG001
+    before = client.get('/metrics').get_data(as_text=True)
+    failed = 'laf_login_attempts_total{result="invalid_credentials"}'
+    succeeded = 'laf_login_attempts_total{result="success"}'
+
+    assert client.get('/api/v1/public/feed').status_code == 200
+    client.post('/api/v1/auth/login', json={'email': 'admin@example.com', 'password': 'wrong'})
+    client.post('/api/v1/auth/login', json={'email': 'admin@example.com', 'password': 'password'})
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+    feed = 'laf_http_requests_total{method="GET",route="/api/v1/public/feed",status="200"}'
+    assert _value(text, feed) == _value(before, feed) + 1
+    assert _value(text, failed) == _value(before, failed) + 1
+    assert _value(text, succeeded) == _value(before, succeeded) + 1
+    latency = 'laf_http_request_duration_seconds_{}{{method="GET",route="/api/v1/public/feed"{}}}'
+    assert _value(text, latency.format('bucket', ',le="+Inf"')) == _value(text, latency.format('count', ''))
+    assert '# TYPE laf_db_pool_connections gauge' in text
+
+
+def test_metrics_token_is_required_when_configured(app):
+    config = Config(
+        SQLALCHEMY_DATABASE_URI=app.config['SQLALCHEMY_DATABASE_URI'],
+        DATABASE_REPLICA_URLS=[],
+        JWT_SECRET_KEY=app.config['JWT_SECRET_KEY'],
+        METRICS_TOKEN='scrape-secret',
+    )
+    client = create_app(testing=True, config=config).test_client()
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
+
+
+def test_metrics_require_a_token_in_production(app):
+    config = Config(
+        SQLALCHEMY_DATABASE_URI=app.config['SQLALCHEMY_DATABASE_URI'],
+        DATABASE_REPLICA_URLS=[],
+        JWT_SECRET_KEY=app.config['JWT_SECRET_KEY'],
+        FLASK_ENV='production',
+        METRICS_TOKEN='',
+    )
+    assert config.METRICS_REQUIRE_TOKEN is True
+    client = create_app(testing=True, config=config).test_client()
+
+    assert client.get('/metrics').status_code == 401
+
+
+def _record(directory, amount):
+    metrics.configure(str(directory))
+    Counter('test_jobs_total', 'Jobs.', ('queue',)).inc(amount, queue='default')
+    Gauge('test_busy', 'Busy workers.').set(1)
+
+
+def test_multiprocess_values_sum_processes_and_drop_dead_gauges(tmp_path):
+    context = multiprocessing.get_context('spawn')
+    pids = []
+    for amount in (2, 3):
+        process = context.Process(target=_record, args=(tmp_path, amount))
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        pids.append(process.pid)
+
+    totals = MultiprocessValues(str(tmp_path)).collect()
+    assert totals['["test_jobs_total",[["queue","default"]]]'] == 5
+    assert totals['["test_busy",[]]'] == 2
+
+    mark_process_dead(str(tmp_path), pids[0])
+    totals = MultiprocessValues(str(tmp_path)).collect()
+    assert totals['["test_jobs_total",[["queue","default"]]]'] == 5
+    assert totals['["test_busy",[]]'] == 1
+
+    # Dead workers' counters are compacted into one archive file.
+    mark_process_dead(str(tmp_path), pids[1])
+    assert sorted(path.name for path in tmp_path.iterdir()) == [ARCHIVE_FILE]
+    totals = MultiprocessValues(str(tmp_path)).collect()
+    assert totals == {'["test_jobs_total",[["queue","default"]]]': 5}
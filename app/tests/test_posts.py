@@ -2,6 +2,12 @@ from http import HTTPStatus
 
 from src.extensions import db
 from src.models import Category, Post, PostStatus, User, UserRole
+from src.services.post_service import PostService
+from src.utils import generations
+from src.utils.clock import ensure_tz
+from src.utils.http_cache import fingerprint
+from src.utils.markdown import RENDER_VERSION
+from src.utils.pagination import CountCache, encode_cursor
 
 from .test_categories import login
 
@@ -58,3 +64,242 @@ def test_public_feed_returns_published(client, seed_data):
     assert data['total'] >= 1
     for post in data['data']:
         assert post['status'] == PostStatus.PUBLISHED.value
+
+
+def test_public_feed_cursor_pagination(client, seed_data, app):
+    with app.app_context():
+        for index in range(5):
+            db.session.add(
+                Post(
+                    title=f'Post {index}',
+                    slug=f'post-cursor-{index}',
+                    content_markdown='Conteúdo',
+                    status=PostStatus.PUBLISHED,
+                    category_id=seed_data['category'].id,
+                    author_id=seed_data['admin'].id,
+                )
+            )
+        db.session.commit()
+
+    expected = [post['id'] for post in client.get('/api/v1/public/feed?page_size=50').get_json()['data']]
+    collected = []
+    cursor = None
+    while True:
+        params = {'page_size': 2}
+        if cursor:
+            params['cursor'] = cursor
+        data = client.get('/api/v1/public/feed', query_string=params).get_json()
+        collected.extend(post['id'] for post in data['data'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    assert collected == expected
+
+
+def test_count_cache_is_bounded_and_keeps_one_generation():
+    cache = CountCache(max_entries=2)
+    for key in range(3):
+        cache.set(1, key, key * 10, ttl=60)
+    assert len(cache) == 2
+    assert cache.get(1, 0) is None
+    assert cache.get(1, 2) == 20
+
+    # A newer generation drops every total counted before it.
+    assert cache.get(2, 2) is None
+    assert len(cache) == 0
+    cache.set(1, 'antigo', 5, ttl=60)
+    assert cache.get(2, 'antigo') is None
+
+
+def test_public_feed_rejects_invalid_cursor(client, seed_data):
+    response = client.get('/api/v1/public/feed?cursor=invalido')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.get_json()['error']['code'] == 'INVALID_CURSOR'
+
+
+def test_public_feed_rejects_cursor_with_invalid_date(client, seed_data):
+    cursor = encode_cursor('published_at:desc', {'dt': 'ontem'}, seed_data['post'].id)
+    response = client.get('/api/v1/public/feed', query_string={'cursor': cursor})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.get_json()['error']['code'] == 'INVALID_CURSOR'
+
+
+def test_public_feed_count_strategy_none_reports_has_more(client, seed_data, app):
+    strategies = app.config['COUNT_STRATEGIES']
+    app.config['COUNT_STRATEGIES'] = {'public_feed': 'none'}
+    try:
+        response = client.get('/api/v1/public/feed?page_size=1')
+    finally:
+        app.config['COUNT_STRATEGIES'] = strategies
+    data = response.get_json()
+    assert response.status_code == HTTPStatus.OK
+    assert data['total'] is None
+    assert data['total_strategy'] == 'none'
+    assert data['has_more'] is False
+
+
+def test_public_feed_uses_list_projection(client, seed_data, app):
+    with app.app_context():
+        db.session.add(
+            Post(
+                title='Post sem resumo',
+                slug='post-sem-resumo',
+                excerpt=None,
+                content_markdown='## Pauta\n\nA **assembleia** aprovou o [calendário](/calendario).',
+                status=PostStatus.PUBLISHED,
+                category_id=seed_data['category'].id,
+                author_id=seed_data['admin'].id,
+            )
+        )
+        db.session.commit()
+
+    data = client.get('/api/v1/public/feed?page_size=50').get_json()['data']
+    assert all('content_markdown' not in post for post in data)
+    post = next(item for item in data if item['slug'] == 'post-sem-resumo')
+    assert post['excerpt'] == 'Pauta A assembleia aprovou o calendário.'
+
+
+def test_post_endpoints_run_fixed_number_of_queries(app, client, seed_data, count_queries, monkeypatch):
+    token = login(client, 'admin@example.com', 'password')
+    headers = {'Authorization': f'Bearer {token}'}
+    post_id = seed_data['post'].id
+    monkeypatch.setitem(app.config, 'CACHE_GENERATIONS_TTL', 60)
+    generations.forget()
+
+    expectations = [
+        # cache generations + page query; a short first page yields the
+        # total without COUNT(*)
+        ('get', '/api/v1/public/feed', 2),
+        # the generations snapshot is reused within CACHE_GENERATIONS_TTL
+        ('get', '/api/v1/public/posts/post-publicado', 1),
+        ('get', '/api/v1/public/feed', 0),
+        # current user, loaded once into the identity cache + page
+        ('get', '/api/v1/posts/', 2),
+        ('get', f'/api/v1/posts/{post_id}', 1),
+        # post + UPDATE + generation bump + reload with relationships
+        ('post', f'/api/v1/posts/{post_id}/publish', 4),
+    ]
+    for method, url, expected in expectations:
+        with count_queries() as statements:
+            response = getattr(client, method)(url, headers=headers)
+        assert response.status_code == HTTPStatus.OK, url
+        assert len(statements) == expected, (url, statements)
+
+
+def test_public_feed_conditional_get(client, seed_data):
+    response = client.get('/api/v1/public/feed')
+    etag = response.headers['ETag']
+    assert response.status_code == HTTPStatus.OK
+    assert 'max-age' in response.headers['Cache-Control']
+
+    revalidated = client.get('/api/v1/public/feed', headers={'If-None-Match': etag})
+    assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+    assert revalidated.data == b''
+
+
+def test_public_post_etag_changes_after_update(client, seed_data):
+    token = login(client, 'admin@example.com', 'password')
+    etag = client.get('/api/v1/public/posts/post-publicado').headers['ETag']
+    client.put(
+        f"/api/v1/posts/{seed_data['post'].id}",
+        headers={'Authorization': f'Bearer {token}'},
+        json={'title': 'Post publicado (editado)'},
+    )
+
+    response = client.get('/api/v1/public/posts/post-publicado', headers={'If-None-Match': etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] != etag
+
+
+def test_etag_changes_when_edits_share_updated_at(seed_data, app):
+    posts = Post.__table__
+    with app.test_request_context():
+        post = db.session.get(Post, seed_data['post'].id)
+        first, _ = fingerprint([post])
+        stamp = post.updated_at
+        # A second edit within the same second of a whole-second DATETIME.
+        db.session.execute(
+            posts.update()
+            .where(posts.c.id == post.id)
+            .values(title='Post publicado (editado)', updated_at=posts.c.updated_at)
+        )
+        db.session.commit()
+        second, last_modified = fingerprint([post])
+
+    assert second != first
+    assert last_modified == ensure_tz(stamp)
+
+
+def test_public_cache_invalidated_by_post_writes(app, client, seed_data, count_queries, monkeypatch):
+    token = login(client, 'admin@example.com', 'password')
+    headers = {'Authorization': f'Bearer {token}'}
+    monkeypatch.setitem(app.config, 'CACHE_GENERATIONS_TTL', 60)
+
+    client.get('/api/v1/public/posts/post-publicado')
+    with count_queries() as statements:
+        cached = client.get('/api/v1/public/posts/post-publicado')
+    assert statements == []
+
+    client.put(f"/api/v1/posts/{seed_data['post'].id}", headers=headers, json={'title': 'Título atualizado'})
+    refreshed = client.get('/api/v1/public/posts/post-publicado')
+    assert cached.get_json()['data']['title'] == 'Post publicado'
+    assert refreshed.get_json()['data']['title'] == 'Título atualizado'
+
+
+def test_post_markdown_is_rendered_on_write(client, seed_data, app):
+    token = login(client, 'admin@example.com', 'password')
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.post(
+        '/api/v1/posts/',
+        headers=headers,
+        json={
+            'slug': 'post-renderizado',
+            'title': 'Post renderizado',
+            'content_markdown': '## Pauta\n\nA **assembleia** <script>alert(1)</script> [aprovou](javascript:alert(1)).',
+            'category_id': seed_data['category'].id,
+            'author_id': seed_data['admin'].id,
+            'status': 'PUBLISHED',
+        },
+    )
+    assert response.status_code == HTTPStatus.CREATED
+
+    data = client.get('/api/v1/public/posts/post-renderizado').get_json()['data']
+    assert 'content_markdown' not in data
+    assert '<h2>Pauta</h2>' in data['content_html']
+    assert '<strong>assembleia</strong>' in data['content_html']
+    assert '<script>' not in data['content_html']
+    assert 'javascript:' not in data['content_html']
+    # Escaped markup stays as text: Pauta A assembleia script alert 1 script aprovou.
+    assert data['word_count'] == 8
+
+    client.put(
+        f"/api/v1/posts/{data['id']}", headers=headers, json={'content_markdown': 'Texto *novo* com quatro palavras'}
+    )
+    with app.app_context():
+        post = db.session.get(Post, data['id'])
+        assert post.content_html == '<p>Texto <em>novo</em> com quatro palavras</p>\n'
+        assert post.content_text == 'Texto novo com quatro palavras'
+        assert post.word_count == 5
+        assert post.content_render_version == RENDER_VERSION
+
+
+def test_rerender_content_fills_pending_posts(seed_data, app):
+    with app.app_context():
+        post = db.session.get(Post, seed_data['post'].id)
+        assert post.content_html is None
+        # Pending rows are still served rendered, once per instance.
+        assert post.rendered().html == '<p>Conteúdo</p>\n'
+        assert post.rendered() is post.rendered()
+
+        before = generations.current()
+        assert PostService.rerender_content(workers=1) == 1
+        after = generations.current()
+        assert after['public_feed'] > before['public_feed']
+        assert after['public_post'] > before['public_post']
+        db.session.expire_all()
+        post = db.session.get(Post, seed_data['post'].id)
+        assert post.content_html == '<p>Conteúdo</p>\n'
+        assert post.word_count == 1
+
+        assert PostService.rerender_content(workers=1) == 0
+        assert PostService.rerender_content(everything=True, workers=1) == 1
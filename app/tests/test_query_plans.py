@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+import pytest
+import sqlalchemy as sa
+
+from src.extensions import db
+from src.models import Category, Post, PostStatus
+from src.utils.clock import utcnow
+from src.utils.query_plan import supports_explain
+
+from .test_categories import login
+
+
+@pytest.fixture
+def plan_dataset(app, seed_data):
+    """A few hundred posts spread over categories and statuses, with fresh statistics."""
+    with app.app_context():
+        categories = [seed_data['category'].id]
+        for index in range(3):
+            category = Category(name=f'Plano {index}', slug=f'plano-{index}')
+            db.session.add(category)
+            db.session.flush()
+            categories.append(category.id)
+        authors = [seed_data['admin'].id, seed_data['editor'].id]
+        statuses = [PostStatus.PUBLISHED, PostStatus.PUBLISHED, PostStatus.DRAFT, PostStatus.SCHEDULED]
+        now = utcnow()
+        db.session.execute(
+            sa.insert(Post),
+            [
+                {
+                    'slug': f'plano-{index}',
+                    'title': f'Plano {index}',
+                    'excerpt': 'Resumo',
+                    'content_markdown': 'Conteúdo',
+                    'status': statuses[index % len(statuses)],
+                    'category_id': categories[index % len(categories)],
+                    'author_id': authors[index % len(authors)],
+                    'published_at': now - timedelta(hours=index),
+                    'created_at': now - timedelta(minutes=index),
+                    'updated_at': now,
+                }
+                for index in range(400)
+            ],
+        )
+        db.session.commit()
+        db.session.execute(sa.text('ANALYZE TABLE posts, categories, users'))
+    return seed_data
+
+
+@pytest.fixture
+def capture_statements(app):
+    captured = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+        if statement.lstrip().upper().startswith('SELECT') and 'posts' in statement:
+            captured.append((statement, parameters))
+
+    sa.event.listen(db.engine, 'before_cursor_execute', _record)
+    yield captured
+    sa.event.remove(db.engine, 'before_cursor_execute', _record)
+
+
+def _plan_problems(statement, parameters):
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN {statement}', parameters).mappings().all()
+    problems = []
+    for row in rows:
+        if row['table'] == 'posts' and row['type'] == 'ALL':
+            problems.append('full scan of posts')
+        if 'filesort' in (row['Extra'] or ''):
+            problems.append(f"filesort on {row['table']}")
+    return problems
+
+
+@pytest.mark.parametrize(
+    'path, params, admin',
+    [
+        ('/api/v1/public/feed', {}, False),
+        ('/api/v1/public/feed', {'category': 'plano-1'}, False),
+        ('/api/v1/public/feed', {'order': 'published_at:asc'}, False),
+        ('/api/v1/posts/', {}, True),
+        ('/api/v1/posts/', {'status': 'DRAFT'}, True),
+        ('/api/v1/posts/', {'category': 'plano-2'}, True),
+        ('/api/v1/posts/', {'order': 'published_at:desc'}, True),
+    ],
+)
+def test_listing_queries_use_indexes(client, app, plan_dataset, capture_statements, path, params, admin):
+    with app.app_context():
+        if not supports_explain():
+            pytest.skip('EXPLAIN checks require MySQL')
+
+    headers = {}
+    if admin:
+        headers['Authorization'] = f"Bearer {login(client, 'admin@example.com', 'password')}"
+    response = client.get(path, headers=headers, query_string=params)
+    assert response.status_code == 200
+    assert capture_statements
+
+    with app.app_context():
+        for statement, parameters in capture_statements:
+            assert _plan_problems(statement, parameters) == [], statement
+
+
+def test_author_listing_uses_index(client, app, plan_dataset, capture_statements):
+    with app.app_context():
+        if not supports_explain():
+            pytest.skip('EXPLAIN checks require MySQL')
+        author_id = plan_dataset['editor'].id
+
+    token = login(client, 'admin@example.com', 'password')
+    capture_statements.clear()
+    response = client.get('/api/v1/posts/', headers={'Authorization': f'Bearer {token}'}, query_string={'author': author_id})
+    assert response.status_code == 200
+
+    with app.app_context():
+        for statement, parameters in capture_statements:
+            assert _plan_problems(statement, parameters) == [], statement
@@ -0,0 +1,155 @@
+import os
+from http import HTTPStatus
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+import src.app_factory as app_factory
+from src.config import Config
+from src.extensions import db, response_cache
+from src.models import CacheGeneration, Category, Post, PostStatus, User, UserRole
+from src.utils import generations
+from src.utils.db_routing import STICKY_COOKIE
+
+
+@pytest.fixture
+def replica_app(app, seed_data, monkeypatch):
+    """Second app reading from a separate database that plays the replica."""
+    primary_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if primary_url.get_backend_name() != 'mysql':
+        pytest.skip('Os testes de réplica usam dois bancos MySQL locais')
+    replica_url = primary_url.set(database=f'{primary_url.database}_replica')
+    admin_engine = sa.create_engine(primary_url.set(database=None), isolation_level='AUTOCOMMIT', future=True)
+    with admin_engine.connect() as conn:
+        conn.execute(sa.text(f"DROP DATABASE IF EXISTS `{replica_url.database}`"))
+        conn.execute(
+            sa.text(f"CREATE DATABASE `{replica_url.database}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+        )
+
+    config = Config(
+        SQLALCHEMY_DATABASE_URI=primary_url.render_as_string(hide_password=False),
+        DATABASE_REPLICA_URLS=[replica_url.render_as_string(hide_password=False)],
+    )
+    monkeypatch.setattr(app_factory, 'get_config', lambda: config)
+    application = app_factory.create_app(testing=True)
+    with application.app_context():
+        replica_engine = db.engines['replica_0']
+        db.metadata.create_all(replica_engine)
+        # Only the replica has this category, so listings show which database answered.
+        with Session(replica_engine) as session:
+            session.add(Category(name='Somente réplica', slug='somente-replica'))
+            session.commit()
+        # Replicas stay out of rotation until probed; don't wait for the thread.
+        application.extensions['replica_router'].check('replica_0')
+    response_cache.clear()
+
+    yield application
+
+    with application.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    with admin_engine.connect() as conn:
+        conn.execute(sa.text(f"DROP DATABASE IF EXISTS `{replica_url.database}`"))
+    admin_engine.dispose()
+    # Restore the main app's cache settings and drop this app's entries.
+    response_cache.init_app(app)
+
+
+def _public_slugs(client):
+    response = client.get('/api/v1/public/categories')
+    assert response.status_code == HTTPStatus.OK
+    return {category['slug'] for category in response.get_json()['data']}
+
+
+def test_get_requests_read_from_replica(replica_app):
+    assert _public_slugs(replica_app.test_client()) == {'somente-replica'}
+
+
+def test_reads_stick_to_primary_after_a_write(replica_app):
+    client = replica_app.test_client()
+    login = client.post('/api/v1/auth/login', json={'email': 'admin@example.com', 'password': 'password'})
+    headers = {'Authorization': f"Bearer {login.get_json()['data']['access_token']}"}
+
+    created = client.post('/api/v1/categories', json={'name': 'Nova', 'slug': 'nova'}, headers=headers)
+    assert created.status_code == HTTPStatus.CREATED
+    assert STICKY_COOKIE in created.headers['Set-Cookie']
+    assert _public_slugs(client) == {'geral', 'nova'}
+
+    # Only the writer is pinned to the primary.
+    assert _public_slugs(replica_app.test_client()) == {'somente-replica'}
+
+    client.delete_cookie(STICKY_COOKIE)
+    assert _public_slugs(client) == {'somente-replica'}
+
+
+def test_lagging_or_failed_replica_falls_back_to_primary(replica_app, monkeypatch):
+    client = replica_app.test_client()
+    router = replica_app.extensions['replica_router']
+
+    # Probes normally run on the background thread; run them inline here.
+    monkeypatch.setattr('src.utils.db_routing._replication_lag', lambda connection: router.max_lag + 60)
+    router.check('replica_0')
+    assert _public_slugs(client) == {'geral'}
+    assert router.stats()['replicas']['replica_0']['healthy'] is False
+
+    monkeypatch.setattr('src.utils.db_routing._replication_lag', lambda connection: 0.0)
+    router.check('replica_0')
+    assert _public_slugs(client) == {'somente-replica'}
+
+    router.mark_failed('replica_0', 'OperationalError')
+    assert _public_slugs(client) == {'geral'}
+
+
+def test_routing_a_read_never_probes_the_replica(replica_app, monkeypatch):
+    router = replica_app.extensions['replica_router']
+    monkeypatch.setattr(router, 'check', lambda key: pytest.fail('probe ran on the request path'))
+    router._states['replica_0'].checked_at = float('-inf')
+    # The probe thread of this process is already running (or not needed).
+    router._prober_pid = os.getpid()
+
+    assert _public_slugs(replica_app.test_client()) == {'somente-replica'}
+
+
+def _feed_slugs(client):
+    response = client.get('/api/v1/public/feed')
+    assert response.status_code == HTTPStatus.OK
+    return {post['slug'] for post in response.get_json()['data']}
+
+
+def test_public_cache_fills_from_a_replica_that_replayed_the_generation(replica_app):
+    with replica_app.app_context():
+        replica_engine = db.engines['replica_0']
+        primary_generations = {row.name: row.value for row in db.session.query(CacheGeneration)}
+        with Session(replica_engine) as session:
+            author = User(name='Autor', email='autor@example.com', role=UserRole.ADMIN, password_hash='x')
+            category = session.query(Category).filter_by(slug='somente-replica').one()
+            session.add(author)
+            session.flush()
+            session.add(
+                Post(
+                    title='Post da réplica',
+                    slug='post-da-replica',
+                    content_markdown='Conteúdo',
+                    status=PostStatus.PUBLISHED,
+                    category_id=category.id,
+                    author_id=author.id,
+                )
+            )
+            session.commit()
+        with Session(replica_engine) as session:
+            # The replica has replayed every bump the primary committed so far.
+            for name, value in primary_generations.items():
+                session.merge(CacheGeneration(name=name, value=value))
+            session.commit()
+        generations.forget()
+
+    assert _feed_slugs(replica_app.test_client()) == {'post-da-replica'}
+
+    with replica_app.app_context():
+        # A write the replica has not replayed yet: the next fill needs the primary.
+        generations.bump(db.session, ['public_feed'])
+        db.session.commit()
+    response_cache.clear()
+    assert _feed_slugs(replica_app.test_client()) == {'post-publicado'}
@@ -0,0 +1,61 @@
+import json
+import logging
+import re
+
+import pytest
+
+from src.app_factory import create_app
+from src.config import Config
+
+
+@pytest.fixture
+def timed_client(app):
+    config = Config(
+        SQLALCHEMY_DATABASE_URI=app.config['SQLALCHEMY_DATABASE_URI'],
+        DATABASE_REPLICA_URLS=[],
+        JWT_SECRET_KEY=app.config['JWT_SECRET_KEY'],
+        CACHE_ENABLED=False,
+        REQUEST_TIMING_ENABLED=True,
+    )
+    timed_app = create_app(testing=True, config=config)
+    return timed_app, timed_app.test_client()
+
+
+def _spans(header):
+    return {match.group(1): float(match.group(2)) for match in re.finditer(r'(\w+);dur=([\d.]+)', header)}
+
+
+def test_timings_are_off_by_default(client, seed_data):  # noqa: ARG001
+    response = client.get('/api/v1/public/feed')
+    assert response.status_code == 200
+    assert 'Server-Timing' not in response.headers
+
+
+def test_public_feed_reports_sql_and_serialization(timed_client, seed_data, caplog):  # noqa: ARG001
+    timed_app, client = timed_client
+    with caplog.at_level(logging.INFO, logger=timed_app.logger.name):
+        response = client.get('/api/v1/public/feed')
+
+    assert response.status_code == 200
+    header = response.headers['Server-Timing']
+    spans = _spans(header)
+    assert {'db', 'serialize', 'total'} <= set(spans)
+    assert spans['total'] >= spans['db']
+    queries = int(re.search(r'desc="(\d+) queries"', header).group(1))
+    assert queries >= 1
+
+    lines = [json.loads(record.getMessage()) for record in caplog.records if 'request_timing' in record.getMessage()]
+    assert lines[-1]['path'] == '/api/v1/public/feed'
+    assert lines[-1]['status'] == 200
+    assert lines[-1]['queries'] == queries
+
+
+def test_authenticated_requests_report_auth(timed_client, seed_data):  # noqa: ARG001
+    _timed_app, client = timed_client
+    login = client.post('/api/v1/auth/login', json={'email': 'admin@example.com', 'password': 'password'})
+    headers = {'Authorization': f"Bearer {login.get_json()['data']['access_token']}"}
+
+    response = client.get('/api/v1/posts', headers=headers)
+
+    assert response.status_code == 200
+    assert 'auth' in _spans(response.headers['Server-Timing'])
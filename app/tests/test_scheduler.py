@@ -0,0 +1,104 @@
+import multiprocessing
+from datetime import timedelta
+from http import HTTPStatus
+
+from src.app_factory import create_app
+from src.config import Config
+from src.extensions import db
+from src.models import Post, PostStatus
+from src.services.scheduler_service import SchedulerService
+from src.utils.clock import utcnow
+from src.utils import generations
+
+from .test_categories import login
+
+
+def _feed_slugs(client):
+    return [item['slug'] for item in client.get('/api/v1/public/feed?page_size=50').get_json()['data']]
+
+
+def test_scheduler_promotes_due_posts(client, seed_data, app):
+    with app.app_context():
+        for index, delta in enumerate((timedelta(minutes=-5), timedelta(minutes=-1), timedelta(hours=1))):
+            db.session.add(
+                Post(
+                    title=f'Agendado {index}',
+                    slug=f'agendado-{index}',
+                    content_markdown='Conteúdo',
+                    status=PostStatus.SCHEDULED,
+                    published_at=utcnow() + delta,
+                    category_id=seed_data['category'].id,
+                    author_id=seed_data['admin'].id,
+                )
+            )
+        db.session.commit()
+
+    assert 'agendado-0' not in _feed_slugs(client)
+
+    with app.app_context():
+        assert SchedulerService.promote_due(batch_size=1) == 2
+        assert SchedulerService.promote_due() == 0
+
+    slugs = _feed_slugs(client)
+    assert {'agendado-0', 'agendado-1'} <= set(slugs)
+    assert 'agendado-2' not in slugs
+    assert client.get('/api/v1/public/posts/agendado-1').status_code == HTTPStatus.OK
+
+
+def _promote_in_scheduler_process(database_url):
+    app = create_app(config=Config(SQLALCHEMY_DATABASE_URI=database_url, DATABASE_REPLICA_URLS=[]))
+    with app.app_context():
+        assert SchedulerService.promote_due() == 1
+
+
+def test_scheduler_process_invalidates_cached_feed(client, seed_data, app):
+    with app.app_context():
+        db.session.add(
+            Post(
+                title='Agendado em outro processo',
+                slug='agendado-outro-processo',
+                content_markdown='Conteúdo',
+                status=PostStatus.SCHEDULED,
+                published_at=utcnow() - timedelta(minutes=1),
+                category_id=seed_data['category'].id,
+                author_id=seed_data['admin'].id,
+            )
+        )
+        db.session.commit()
+
+    assert 'agendado-outro-processo' not in _feed_slugs(client)
+
+    # `python -m src.scheduler` commits in its own process, out of reach of
+    # this process's session listeners; only the database generation tells.
+    process = multiprocessing.get_context('spawn').Process(
+        target=_promote_in_scheduler_process, args=(app.config['SQLALCHEMY_DATABASE_URI'],)
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    # A new request starts a new transaction (tests share one app context).
+    db.session.remove()
+    # As if CACHE_GENERATIONS_TTL had elapsed.
+    generations.forget()
+
+    assert 'agendado-outro-processo' in _feed_slugs(client)
+
+
+def test_future_published_post_is_stored_as_scheduled(client, seed_data):
+    token = login(client, 'admin@example.com', 'password')
+    response = client.post(
+        '/api/v1/posts/',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'slug': 'publicacao-futura',
+            'title': 'Publicação futura',
+            'content_markdown': 'Conteúdo',
+            'category_id': seed_data['category'].id,
+            'author_id': seed_data['admin'].id,
+            'status': 'PUBLISHED',
+            'published_at': (utcnow() + timedelta(days=1)).isoformat(),
+        },
+    )
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.get_json()['data']['status'].endswith('SCHEDULED')
+    assert client.get('/api/v1/public/posts/publicacao-futura').status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,180 @@
+from http import HTTPStatus
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from src.extensions import db
+from src.models import Post, PostStatus
+from src.services.search_service import SearchService
+from src.utils import generations
+from src.utils.pagination import encode_cursor
+from src.utils.search_index import InvertedIndex
+
+from .test_categories import login
+
+
+def test_inverted_index_folds_accents_and_matches_prefixes():
+    index = InvertedIndex()
+    index.add('a', {'title': 'Sessão extraordinária', 'content': 'Julgamento do recurso'})
+    index.add('b', {'title': 'Ata da sessão', 'content': 'Reunião ordinária'})
+
+    assert set(index.search('SESSAO')) == {'a', 'b'}
+    assert set(index.search('extraord')) == {'a'}
+    assert set(index.search('sessao julg')) == {'a'}
+    assert index.search('sessao inexistente') == {}
+
+    index.remove('a')
+    assert set(index.search('sessao')) == {'b'}
+
+
+def test_inverted_index_keeps_prefix_lookup_current_after_searches():
+    index = InvertedIndex()
+    index.add('a', {'title': 'Regulamento'})
+    assert set(index.search('reg')) == {'a'}
+
+    index.add('b', {'title': 'Registro geral'})
+    index.add('c', {'title': 'Recurso'})
+    assert set(index.search('reg')) == {'a', 'b'}
+    index.remove('a')
+    assert set(index.search('reg')) == {'b'}
+    assert set(index.search('re')) == {'b', 'c'}
+
+
+def test_inverted_index_weights_title_above_content():
+    index = InvertedIndex()
+    index.add('title', {'title': 'Regulamento geral', 'content': 'Texto'})
+    index.add('body', {'title': 'Aviso', 'content': 'Consulte o regulamento'})
+
+    scores = index.search('regulamento')
+    assert scores['title'] > scores['body']
+
+
+def test_public_feed_search_ignores_accents_and_orders_by_relevance(client, seed_data, app):
+    with app.app_context():
+        category_id = seed_data['category'].id
+        author_id = seed_data['admin'].id
+        db.session.add_all(
+            [
+                Post(
+                    title='Assembleia extraordinária convocada',
+                    slug='assembleia-extraordinaria',
+                    excerpt='Convocação da assembleia',
+                    content_markdown='Pauta da assembleia extraordinária.',
+                    status=PostStatus.PUBLISHED,
+                    category_id=category_id,
+                    author_id=author_id,
+                ),
+                Post(
+                    title='Calendário da temporada',
+                    slug='calendario-temporada',
+                    excerpt='Datas dos jogos',
+                    content_markdown='Após a reunião extraordinária, o calendário foi aprovado.',
+                    status=PostStatus.PUBLISHED,
+                    category_id=category_id,
+                    author_id=author_id,
+                ),
+            ]
+        )
+        db.session.commit()
+
+    response = client.get('/api/v1/public/feed', query_string={'q': 'extraordinaria', 'order': 'relevance'})
+    assert response.status_code == HTTPStatus.OK
+    slugs = [item['slug'] for item in response.get_json()['data']]
+    assert slugs == ['assembleia-extraordinaria', 'calendario-temporada']
+
+    response = client.get('/api/v1/public/feed', query_string={'q': 'calend'})
+    slugs = [item['slug'] for item in response.get_json()['data']]
+    assert slugs == ['calendario-temporada']
+
+
+def test_relevance_cursor_offset_is_validated(client, seed_data, app, monkeypatch):
+    monkeypatch.setitem(app.config, 'SEARCH_MAX_OFFSET', 100)
+    post_id = seed_data['post'].id
+    params = {'q': 'publicado', 'order': 'relevance'}
+    for value in (-1, 101, '5', True, 1.5):
+        cursor = encode_cursor('relevance:desc', value, post_id)
+        response = client.get('/api/v1/public/feed', query_string={**params, 'cursor': cursor})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, value
+        assert response.get_json()['error']['code'] == 'INVALID_CURSOR'
+
+    cursor = encode_cursor('relevance:desc', 100, post_id)
+    response = client.get('/api/v1/public/feed', query_string={**params, 'cursor': cursor})
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_admin_search_matches_posts_or_their_category(client, seed_data):
+    headers = {'Authorization': f"Bearer {login(client, 'admin@example.com', 'password')}"}
+    for term in ('geral', 'publicado'):
+        response = client.get('/api/v1/posts/', headers=headers, query_string={'q': term})
+        assert response.status_code == HTTPStatus.OK
+        assert [item['slug'] for item in response.get_json()['data']] == ['post-publicado'], term
+
+    response = client.get('/api/v1/posts/', headers=headers, query_string={'q': 'inexistente'})
+    assert response.get_json()['data'] == []
+
+
+def _publish(seed_data, slug, title):
+    return Post(
+        title=title,
+        slug=slug,
+        excerpt='Resumo',
+        content_markdown='Texto.',
+        status=PostStatus.PUBLISHED,
+        category_id=seed_data['category'].id,
+        author_id=seed_data['admin'].id,
+    )
+
+
+def test_python_search_passes_only_the_best_candidates_to_sql(client, seed_data, app, monkeypatch):
+    with app.app_context():
+        db.session.add_all(
+            [
+                _publish(seed_data, 'torneio-torneio', 'Torneio torneio regional'),
+                _publish(seed_data, 'torneio-aberto', 'Torneio aberto'),
+                _publish(seed_data, 'torneio-juvenil', 'Torneio juvenil'),
+            ]
+        )
+        db.session.commit()
+    monkeypatch.setitem(app.config, 'SEARCH_MAX_CANDIDATES', 1)
+
+    response = client.get('/api/v1/public/feed', query_string={'q': 'torneio'})
+    assert response.status_code == HTTPStatus.OK
+    assert [item['slug'] for item in response.get_json()['data']] == ['torneio-torneio']
+
+
+def test_python_search_applies_local_writes_without_rebuilding(client, seed_data, app):
+    # Settle the index on the current generation.
+    for _ in range(2):
+        client.get('/api/v1/public/feed', query_string={'q': 'qualquer'})
+        SearchService.wait_for_rebuild(timeout=10)
+    rebuild = SearchService._rebuild
+
+    with app.app_context():
+        db.session.add(_publish(seed_data, 'resolucao-nova', 'Resolução da diretoria'))
+        db.session.commit()
+    slugs = [item['slug'] for item in client.get('/api/v1/public/feed', query_string={'q': 'resolucao'}).get_json()['data']]
+    assert slugs == ['resolucao-nova']
+    assert SearchService._rebuild is rebuild
+
+
+def test_python_search_sees_writes_committed_by_other_processes(client, seed_data, app):
+    with app.app_context():
+        db.session.add(_publish(seed_data, 'edital-antigo', 'Edital de chamamento'))
+        db.session.commit()
+    assert [item['slug'] for item in client.get('/api/v1/public/feed', query_string={'q': 'edital'}).get_json()['data']] == [
+        'edital-antigo'
+    ]
+
+    # Another worker renames the post; nothing runs in this process.
+    with app.app_context(), Session(db.engine) as other:
+        other.execute(update(Post.__table__).where(Post.slug == 'edital-antigo').values(title='Portaria de chamamento'))
+        generations.bump(other, [SearchService.GENERATION])
+        other.commit()
+    db.session.remove()
+
+    # The next search starts a rebuild and answers from the previous index meanwhile.
+    client.get('/api/v1/public/feed', query_string={'q': 'edital'})
+    SearchService.wait_for_rebuild(timeout=10)
+    assert client.get('/api/v1/public/feed', query_string={'q': 'edital'}).get_json()['data'] == []
+    slugs = [item['slug'] for item in client.get('/api/v1/public/feed', query_string={'q': 'portaria'}).get_json()['data']]
+    assert slugs == ['edital-antigo']
@@ -0,0 +1,62 @@
+import pytest
+
+from src.extensions import db
+from src.models import Category, Post, User
+from src.seed import SCALE_PASSWORD, USERS, parse_volume, seed_scale, seed_users
+from src.utils.markdown import render_markdown
+
+
+@pytest.fixture
+def clean_tables(app):
+    yield
+    with app.app_context():
+        db.session.query(Post).delete()
+        db.session.query(Category).delete()
+        db.session.query(User).delete()
+        db.session.commit()
+
+
+def _snapshot():
+    return [
+        (post.slug, post.title, post.content_markdown, post.status, post.category.slug, post.author.email)
+        for post in Post.query.order_by(Post.slug)
+    ]
+
+
+def test_parse_volume_accepts_suffixes():
+    assert parse_volume('5000') == 5000
+    assert parse_volume('100k') == 100_000
+    assert parse_volume('1.5m') == 1_500_000
+
+
+def test_seed_scale_is_deterministic_and_stores_rendered_content(app, clean_tables):
+    with app.app_context():
+        assert seed_scale(60, users=8, categories=5, seed=3, batch_size=25) == (5, 8, 60)
+        first = _snapshot()
+        assert len(first) == 60
+        assert len({user.password_hash for user in User.query}) == 1
+        assert User.query.first().check_password(SCALE_PASSWORD)
+        for post in Post.query.limit(10):
+            rendered = render_markdown(post.content_markdown)
+            assert (post.content_html, post.content_text, post.word_count) == (
+                rendered.html,
+                rendered.text,
+                rendered.word_count,
+            )
+
+        with pytest.raises(SystemExit):
+            seed_scale(10, seed=3)
+
+        db.session.query(Post).delete()
+        db.session.query(Category).delete()
+        db.session.query(User).delete()
+        db.session.commit()
+        seed_scale(60, users=8, categories=5, seed=3, batch_size=25)
+        assert _snapshot() == first
+
+
+def test_seed_users_hashes_each_password_once(app, clean_tables):
+    with app.app_context():
+        seed_users()
+        hashes = {user.password_hash for user in User.query}
+        assert len(hashes) == len({password for _name, _email, password, _role, _slugs in USERS})
@@ -0,0 +1,207 @@
+import hashlib
+import io
+from http import HTTPStatus
+
+import pytest
+from PIL import Image
+from werkzeug.test import EnvironBuilder
+
+from src.services.image_service import ImageService
+from src.utils.responses import ApiError
+from src.utils.uploads import UploadLimits, UploadRequest
+
+
+@pytest.fixture
+def image_folders(app, tmp_path, monkeypatch):
+    uploads = tmp_path / 'uploads'
+    uploads.mkdir()
+    Image.new('RGB', (1600, 900), (200, 40, 40)).save(uploads / 'capa.jpg', quality=90)
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(uploads))
+    monkeypatch.setitem(app.config, 'IMAGE_CACHE_FOLDER', str(tmp_path / 'cache'))
+    app.extensions.pop('image_cache', None)
+    yield uploads
+    app.extensions.pop('image_cache', None)
+    ImageService.shutdown()
+
+
+def test_image_variant_is_resized_cached_and_revalidated(client, image_folders):  # noqa: ARG001
+    response = client.get('/api/v1/uploads/image/capa.jpg?w=320&fm=webp')
+    assert response.status_code == HTTPStatus.OK
+    assert response.mimetype == 'image/webp'
+    assert Image.open(io.BytesIO(response.data)).size == (320, 180)
+    assert 'max-age' in response.headers['Cache-Control']
+
+    again = client.get('/api/v1/uploads/image/capa.jpg?w=320&fm=webp')
+    assert again.data == response.data
+    assert ImageService.cache().stats()['hits'] == 1
+
+    revalidated = client.get(
+        '/api/v1/uploads/image/capa.jpg?w=320&fm=webp', headers={'If-None-Match': response.headers['ETag']}
+    )
+    assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+
+    cover = client.get('/api/v1/uploads/image/capa.jpg?w=320&h=320&fit=cover')
+    assert cover.mimetype == 'image/jpeg'
+    assert Image.open(io.BytesIO(cover.data)).size == (320, 320)
+
+    original = client.get('/api/v1/uploads/image/capa.jpg')
+    assert Image.open(io.BytesIO(original.data)).size == (1600, 900)
+
+
+@pytest.mark.parametrize('query', ['w=321', 'w=320&fm=gif', 'w=320&q=99', 'w=320&fit=cover', 'fm=webp'])
+def test_image_variant_rejects_values_outside_whitelist(client, image_folders, query):  # noqa: ARG001
+    response = client.get(f'/api/v1/uploads/image/capa.jpg?{query}')
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.get_json()['error']['code'] == 'VALIDATION_ERROR'
+
+
+def test_image_cache_evicts_least_recently_used(client, image_folders):  # noqa: ARG001
+    cache = ImageService.cache()
+    first = client.get('/api/v1/uploads/image/capa.jpg?w=640&fm=png')
+    cache.max_bytes = len(first.data) + 1
+
+    client.get('/api/v1/uploads/image/capa.jpg?w=960&fm=png')
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    # The evicted variant is rendered again on demand.
+    assert client.get('/api/v1/uploads/image/capa.jpg?w=640&fm=png').data == first.data
+
+
+def _auth_headers(client):
+    login = client.post('/api/v1/auth/login', json={'email': 'admin@example.com', 'password': 'password'})
+    return {'Authorization': f"Bearer {login.get_json()['data']['access_token']}"}
+
+
+def _upload(client, headers, payload, name='foto.png', content_type='image/png'):
+    return client.post(
+        '/api/v1/uploads/image',
+        data={'file': (io.BytesIO(payload), name, content_type)},
+        headers=headers,
+        content_type='multipart/form-data',
+    )
+
+
+def test_upload_is_content_addressed_and_deduplicated(client, seed_data, image_folders):  # noqa: ARG001
+    headers = _auth_headers(client)
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), (10, 20, 30)).save(buffer, 'PNG')
+    payload = buffer.getvalue()
+    digest = hashlib.sha256(payload).hexdigest()
+
+    first = _upload(client, headers, payload)
+    assert first.status_code == HTTPStatus.CREATED
+    assert first.get_json()['data']['url'] == f'/static/uploads/{digest}.png'
+    assert first.get_json()['data']['deduplicated'] is False
+
+    again = _upload(client, headers, payload, name='outro-nome.jpg', content_type='image/jpeg')
+    assert again.status_code == HTTPStatus.OK
+    assert again.get_json()['data']['url'] == f'/static/uploads/{digest}.png'
+    assert again.get_json()['data']['deduplicated'] is True
+    assert sorted(path.name for path in image_folders.glob('*.png')) == [f'{digest}.png']
+    assert not list((image_folders / '.incoming').iterdir())
+
+
+def test_upload_rejects_oversized_and_non_image_files(client, seed_data, image_folders, app, monkeypatch):  # noqa: ARG001
+    headers = _auth_headers(client)
+    monkeypatch.setitem(app.config, 'UPLOAD_MAX_BYTES', 1024)
+
+    too_large = _upload(client, headers, b'\x89PNG\r\n\x1a\n' + b'\0' * 4096)
+    assert too_large.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert too_large.get_json()['error']['code'] == 'FILE_TOO_LARGE'
+
+    disguised = _upload(client, headers, b'<script>alert(1)</script>', name='foto.png')
+    assert disguised.status_code == HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+
+    declared = _upload(client, headers, b'\x89PNG\r\n\x1a\n' + b'\0' * 16, name='page.html', content_type='text/html')
+    assert declared.status_code == HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+    assert not list((image_folders / '.incoming').iterdir())
+
+
+def test_rejected_part_discards_the_parts_spooled_before_it(client, seed_data, image_folders):  # noqa: ARG001
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8)).save(buffer, 'PNG')
+    response = client.post(
+        '/api/v1/uploads/image',
+        data={
+            'file': (io.BytesIO(buffer.getvalue()), 'foto.png', 'image/png'),
+            'extra': (io.BytesIO(b'<script>alert(1)</script>'), 'foto2.png', 'image/png'),
+        },
+        headers=_auth_headers(client),
+        content_type='multipart/form-data',
+    )
+    assert response.status_code == HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+    assert not list((image_folders / '.incoming').iterdir())
+
+
+def test_chunked_upload_is_capped_across_parts(app, image_folders, monkeypatch):
+    monkeypatch.setattr('src.utils.uploads.MULTIPART_OVERHEAD', 0)
+    monkeypatch.setitem(app.config, 'UPLOAD_MAX_BYTES', 1000)
+    part = b'\x89PNG\r\n\x1a\n' + b'\0' * 592
+    parts = {f'file{index}': (io.BytesIO(part), f'foto{index}.png', 'image/png') for index in range(3)}
+    environ = EnvironBuilder(method='POST', data=parts).get_environ()
+    # A chunked body: no Content-Length for the route to check up front.
+    del environ['CONTENT_LENGTH']
+    environ['wsgi.input_terminated'] = True
+
+    request = UploadRequest(environ)
+    request.upload_limits = UploadLimits.from_config(app.config)
+    with pytest.raises(ApiError) as error:
+        request.files
+    request.close()
+    assert error.value.code == 'FILE_TOO_LARGE'
+    assert not list((image_folders / '.incoming').iterdir())
+
+
+def test_image_variants_are_never_rendered_from_hidden_paths(client, image_folders):
+    incoming = image_folders / '.incoming'
+    incoming.mkdir(exist_ok=True)
+    Image.new('RGB', (64, 64)).save(incoming / 'pendente.png')
+    (image_folders / 'album').mkdir()
+    Image.new('RGB', (64, 64)).save(image_folders / 'album' / '.oculta.png')
+
+    for name in ('.incoming/pendente.png', 'album/.oculta.png'):
+        response = client.get(f'/api/v1/uploads/image/{name}?w=80')
+        assert response.status_code == HTTPStatus.NOT_FOUND, name
+
+
+def test_content_addressed_upload_supports_ranges_and_immutable_caching(client, image_folders):
+    data = (image_folders / 'capa.jpg').read_bytes()
+    name = f'{hashlib.sha256(data).hexdigest()}.jpg'
+    (image_folders / name).write_bytes(data)
+
+    response = client.get(f'/static/uploads/{name}')
+    assert response.status_code == HTTPStatus.OK
+    assert 'immutable' in response.headers['Cache-Control']
+    assert response.headers['Accept-Ranges'] == 'bytes'
+
+    partial = client.get(f'/static/uploads/{name}', headers={'Range': 'bytes=0-99'})
+    assert partial.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert partial.data == data[:100]
+
+    variant = client.get(f'/api/v1/uploads/image/{name}?w=320')
+    assert 'immutable' in variant.headers['Cache-Control']
+
+    legacy = client.get('/static/uploads/capa.jpg')
+    assert 'immutable' not in legacy.headers['Cache-Control']
+    assert client.get('/static/uploads/.incoming/x.part').status_code == HTTPStatus.NOT_FOUND
+
+
+def test_upload_serving_offloads_to_front_proxy(client, image_folders, app, monkeypatch):  # noqa: ARG001
+    monkeypatch.setitem(app.config, 'UPLOAD_SERVE_MODE', 'x-accel')
+
+    response = client.get('/static/uploads/capa.jpg')
+    assert response.status_code == HTTPStatus.OK
+    assert response.data == b''
+    assert response.headers['X-Accel-Redirect'] == '/_protected/uploads/capa.jpg'
+
+    revalidated = client.get('/static/uploads/capa.jpg', headers={'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+    assert 'X-Accel-Redirect' not in revalidated.headers
+
+    variant = client.get('/api/v1/uploads/image/capa.jpg?w=320')
+    assert variant.headers['X-Accel-Redirect'].startswith('/_protected/image_cache/')
+    assert variant.mimetype == 'image/jpeg'
+
+    monkeypatch.setitem(app.config, 'UPLOAD_SERVE_MODE', 'x-sendfile')
+    sendfile = client.get('/static/uploads/capa.jpg')
+    assert sendfile.headers['X-Sendfile'] == str(image_folders / 'capa.jpg')
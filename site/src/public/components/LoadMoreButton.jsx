@@ -1,4 +1,4 @@
-const LoadMoreButton = ({ onClick, hasMore }) => {
+const LoadMoreButton = ({ onClick, hasMore, loading = false }) => {
   if (!hasMore) return null;
 
   return (
@@ -6,9 +6,10 @@ const LoadMoreButton = ({ onClick, hasMore }) => {
       <button
         type="button"
         onClick={onClick}
-        className="rounded-full bg-primary-600 px-5 py-2 text-sm font-semibold text-white transition hover:bg-primary-700 focus:outline-none focus:ring-2 focus:ring-primary-200"
+        disabled={loading}
+        className="rounded-full bg-primary-600 px-5 py-2 text-sm font-semibold text-white transition hover:bg-primary-700 focus:outline-none focus:ring-2 focus:ring-primary-200 disabled:cursor-wait disabled:opacity-70"
       >
-        Carregar mais
+        {loading ? 'Carregando...' : 'Carregar mais'}
       </button>
     </div>
   );
@@ -1,5 +1,8 @@
 import { Link } from 'react-router-dom';
 import { formatDate } from '../../utils/dates';
+import { imageSrcSet, imageVariantUrl } from '../../utils/images';
+
+const CARD_WIDTHS = [320, 480, 640, 960];
 
 const PostCard = ({ post }) => {
   const publishedLabel = post.publicadoEm ? formatDate(post.publicadoEm) : '—';
@@ -9,7 +12,9 @@ const PostCard = ({ post }) => {
       {post.capaUrl && (
         <div className="relative h-48 w-full overflow-hidden">
           <img
-            src={post.capaUrl}
+            src={imageVariantUrl(post.capaUrl, { width: 480 })}
+            srcSet={imageSrcSet(post.capaUrl, CARD_WIDTHS)}
+            sizes="(min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw"
             alt={post.titulo}
             className="h-full w-full object-cover"
             loading="lazy"
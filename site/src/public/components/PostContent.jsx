@@ -0,0 +1,9 @@
+// The API renders posts to sanitized HTML when they are saved, so the page
+// does not need a Markdown parser.
+const PostContent = ({ html }) => {
+  if (!html) return null;
+
+  return <div className="prose prose-slate max-w-none" dangerouslySetInnerHTML={{ __html: html }} />;
+};
+
+export default PostContent;
@@ -4,13 +4,23 @@ import LoadMoreButton from './LoadMoreButton';
 
 const DEFAULT_PAGE_SIZE = 6;
 
-const PostFeed = ({ posts = [], itemsPerPage = DEFAULT_PAGE_SIZE }) => {
+// With `onLoadMore` the server paginates (cursor-based); otherwise the received
+// posts are revealed locally in blocks of `itemsPerPage`.
+const PostFeed = ({ posts = [], itemsPerPage = DEFAULT_PAGE_SIZE, onLoadMore, hasMore: remoteHasMore = false, loading = false }) => {
   const [visible, setVisible] = useState(itemsPerPage);
+  const serverPaged = typeof onLoadMore === 'function';
 
-  const hasMore = visible < posts.length;
-  const visiblePosts = useMemo(() => posts.slice(0, visible), [posts, visible]);
+  const hasMore = serverPaged ? remoteHasMore : visible < posts.length;
+  const visiblePosts = useMemo(
+    () => (serverPaged ? posts : posts.slice(0, visible)),
+    [posts, visible, serverPaged],
+  );
 
   const handleLoadMore = () => {
+    if (serverPaged) {
+      onLoadMore();
+      return;
+    }
     setVisible((current) => current + itemsPerPage);
   };
 
@@ -29,7 +39,7 @@ const PostFeed = ({ posts = [], itemsPerPage = DEFAULT_PAGE_SIZE }) => {
           <PostCard key={post.id} post={post} />
         ))}
       </div>
-      <LoadMoreButton onClick={handleLoadMore} hasMore={hasMore} />
+      <LoadMoreButton onClick={handleLoadMore} hasMore={hasMore} loading={loading} />
     </div>
   );
 };
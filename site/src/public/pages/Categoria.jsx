@@ -6,12 +6,16 @@ import { setCanonicalLink, setDocumentTitle, setMetaDescription } from '../../ut
 import { fetchPublicCategoryBySlug } from '../../services/categoriesService';
 import { fetchPublicFeed } from '../../services/postsService';
 
+const FEED_PAGE_SIZE = 12;
+
 const Categoria = () => {
   const { slug } = useParams();
   const navigate = useNavigate();
   const [category, setCategory] = useState(null);
   const [posts, setPosts] = useState([]);
   const [searchTerm, setSearchTerm] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const loadCategory = async () => {
@@ -30,12 +34,29 @@ const Categoria = () => {
 
   useEffect(() => {
     const loadPosts = async () => {
-      const { data } = await fetchPublicFeed({ category: slug, page_size: 50 });
+      const { data, nextCursor: cursor } = await fetchPublicFeed({ category: slug, page_size: FEED_PAGE_SIZE });
       setPosts(data);
+      setNextCursor(cursor);
     };
     loadPosts();
   }, [slug]);
 
+  const handleLoadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const { data, nextCursor: cursor } = await fetchPublicFeed({
+        category: slug,
+        page_size: FEED_PAGE_SIZE,
+        cursor: nextCursor,
+      });
+      setPosts((current) => [...current, ...data]);
+      setNextCursor(cursor);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const filteredPosts = posts.filter((post) => {
     if (!searchTerm) return true;
     const term = searchTerm.toLowerCase();
@@ -57,7 +78,12 @@ const Categoria = () => {
           <h2 className="text-2xl font-semibold text-slate-900">{category.nome}</h2>
           {category.descricao && <p className="text-sm text-slate-500">{category.descricao}</p>}
         </div>
-        <PostFeed posts={filteredPosts} />
+        <PostFeed
+          posts={filteredPosts}
+          onLoadMore={handleLoadMore}
+          hasMore={Boolean(nextCursor)}
+          loading={loadingMore}
+        />
       </main>
     </div>
   );
@@ -4,10 +4,14 @@ import PostFeed from '../components/PostFeed';
 import { setCanonicalLink, setDocumentTitle, setMetaDescription } from '../../utils/seo';
 import { fetchPublicFeed } from '../../services/postsService';
 
+const FEED_PAGE_SIZE = 12;
+
 const Home = () => {
   const [searchTerm, setSearchTerm] = useState('');
   const [posts, setPosts] = useState([]);
   const [filteredPosts, setFilteredPosts] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     setDocumentTitle('Últimas publicações | Portal LAF');
@@ -17,13 +21,26 @@ const Home = () => {
 
   useEffect(() => {
     const load = async () => {
-      const { data } = await fetchPublicFeed({ page_size: 50 });
+      const { data, nextCursor: cursor } = await fetchPublicFeed({ page_size: FEED_PAGE_SIZE });
       setPosts(data);
       setFilteredPosts(data);
+      setNextCursor(cursor);
     };
     load();
   }, []);
 
+  const handleLoadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const { data, nextCursor: cursor } = await fetchPublicFeed({ page_size: FEED_PAGE_SIZE, cursor: nextCursor });
+      setPosts((current) => [...current, ...data]);
+      setNextCursor(cursor);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     if (!searchTerm) {
       setFilteredPosts(posts);
@@ -49,7 +66,12 @@ const Home = () => {
             Atualizado automaticamente com os posts publicados mais recentes.
           </p>
         </div>
-        <PostFeed posts={filteredPosts} />
+        <PostFeed
+          posts={filteredPosts}
+          onLoadMore={handleLoadMore}
+          hasMore={Boolean(nextCursor)}
+          loading={loadingMore}
+        />
       </main>
     </div>
   );
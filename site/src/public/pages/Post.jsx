@@ -1,11 +1,14 @@
 import { useEffect, useMemo, useState } from 'react';
 import { Link, useNavigate, useParams } from 'react-router-dom';
 import PublicHeader from '../components/PublicHeader';
-import MarkdownViewer from '../components/MarkdownViewer';
+import PostContent from '../components/PostContent';
 import PostCard from '../components/PostCard';
+import { imageSrcSet, imageVariantUrl } from '../../utils/images';
 import { setCanonicalLink, setDocumentTitle, setMetaDescription } from '../../utils/seo';
 import { fetchPublicPost, fetchPublicFeed } from '../../services/postsService';
 
+const COVER_WIDTHS = [640, 960, 1280, 1920];
+
 const Post = () => {
   const { slug } = useParams();
   const navigate = useNavigate();
@@ -75,13 +78,15 @@ const Post = () => {
 
           {post.capaUrl && (
             <img
-              src={post.capaUrl}
+              src={imageVariantUrl(post.capaUrl, { width: 1280 })}
+              srcSet={imageSrcSet(post.capaUrl, COVER_WIDTHS)}
+              sizes="(min-width: 1024px) 896px, 100vw"
               alt="Capa da publicação"
               className="w-full rounded-3xl border border-slate-200 object-cover"
             />
           )}
 
-          <MarkdownViewer content={post.conteudoMarkdown} />
+          <PostContent html={post.conteudoHtml} />
         </article>
 
         <section className="mt-12">
@@ -1,10 +1,13 @@
 import axios from 'axios';
 
-const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000/api/v1';
+export const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000/api/v1';
 const SESSION_KEY = 'laf_session';
 
 const api = axios.create({
   baseURL: API_BASE_URL,
+  // Sends the cookie that keeps this browser's reads on the primary database
+  // right after it saves something.
+  withCredentials: true,
 });
 
 api.interceptors.request.use((config) => {
@@ -73,6 +73,7 @@ const mapPost = (post) => ({
   resumo: post.excerpt,
   capaUrl: post.cover_image_url,
   conteudoMarkdown: post.content_markdown,
+  conteudoHtml: post.content_html,
   status: normalizeFrontendStatus(post.status),
   categoria: mapCategory(post.category),
   categoriaId: post.category?.id,
@@ -99,12 +100,13 @@ const toPayload = (data) => ({
 
 export const fetchPosts = async (params = {}) => {
   const response = await api.get('/posts', { params });
-  const { data, page, page_size: pageSize, total } = response.data;
+  const { data, page, page_size: pageSize, total, next_cursor: nextCursor } = response.data;
   return {
     data: data.map(mapPost),
     page,
     pageSize,
     total,
+    nextCursor,
   };
 };
 
@@ -139,12 +141,13 @@ export const schedulePost = async (id, publishedAt) => {
 
 export const fetchPublicFeed = async (params = {}) => {
   const response = await api.get('/public/feed', { params });
-  const { data, page, page_size: pageSize, total } = response.data;
+  const { data, page, page_size: pageSize, total, next_cursor: nextCursor } = response.data;
   return {
     data: data.map(mapPost),
     page,
     pageSize,
     total,
+    nextCursor,
   };
 };
 
@@ -0,0 +1,22 @@
+import { API_BASE_URL } from '../services/apiClient';
+
+const UPLOAD_PATH = '/static/uploads/';
+
+// Resized variant of an uploaded image served by the API. Other URLs are
+// returned unchanged. Widths must be in the API's IMAGE_SIZES list.
+export const imageVariantUrl = (url, { width, height, fit, format = 'webp' } = {}) => {
+  if (!url) return url;
+  const index = url.indexOf(UPLOAD_PATH);
+  if (index === -1) return url;
+
+  const params = new URLSearchParams();
+  if (width) params.set('w', width);
+  if (height) params.set('h', height);
+  if (fit) params.set('fit', fit);
+  if (format) params.set('fm', format);
+  const filename = url.slice(index + UPLOAD_PATH.length);
+  return `${API_BASE_URL}/uploads/image/${filename}?${params.toString()}`;
+};
+
+export const imageSrcSet = (url, widths, options = {}) =>
+  widths.map((width) => `${imageVariantUrl(url, { ...options, width })} ${width}w`).join(', ');